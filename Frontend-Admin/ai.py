@@ -2,13 +2,41 @@ import requests
 import json
 import os
 import sys
-import tempfile
-from datetime import datetime
-from typing import Dict, Any, List
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Any
+
+from chat_history import DEFAULT_SESSION_ID, get_chat_history_store, normalize_session_id
+from intent_router import SIMPLE_CONFIRMATIONS, get_intent_router
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+OPENROUTER_URL = "https://openrouter.ai/api/v1/chat/completions"
+
+# System prompts keyed by mode: (file mtime, content); re-read only when the file changes
+_prompt_cache: Dict[str, tuple] = {}
+# Shared keep-alive session so a long-running worker reuses its TLS connection to OpenRouter
+_http_session = None
+_http_session_lock = threading.Lock()
+
+
+def get_http_session() -> requests.Session:
+    """
+    Get the process-wide pooled HTTP session.
+    
+    Returns:
+        requests.Session: Session with a keep-alive connection pool
+    """
+    global _http_session
+    with _http_session_lock:
+        if _http_session is None:
+            _http_session = requests.Session()
+            adapter = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=16)
+            _http_session.mount("https://", adapter)
+        return _http_session
 
 def read_system_prompt(mode: str = "chat") -> str:
     """
-    Read system prompt from the corresponding mode file.
+    Read system prompt from the corresponding mode file (cached until the file changes).
     
     Args:
         mode (str): Either "chat" or "detect"
@@ -29,11 +57,18 @@ def read_system_prompt(mode: str = "chat") -> str:
     }
     
     filename = mode_files.get(mode, "ai_system_prompt_chat.txt")
+    path = os.path.join(SCRIPT_DIR, filename)
     
     try:
-        with open(filename, 'r', encoding='utf-8') as file:
+        mtime = os.path.getmtime(path)
+        cached = _prompt_cache.get(mode)
+        if cached and cached[0] == mtime:
+            return cached[1]
+        
+        with open(path, 'r', encoding='utf-8') as file:
             content = file.read().strip()
             if content:  # Only return file content if it's not empty
+                _prompt_cache[mode] = (mtime, content)
                 return content
             else:
                 print(f"Warning: {filename} is empty, using default prompt")
@@ -78,169 +113,89 @@ def detect_input_type_and_format(user_input: str, specified_mode: str = None) ->
     except json.JSONDecodeError:
         pass
     
-    # Check for environmental keywords in text
-    env_keywords = ['weather', 'storm', 'flood', 'earthquake', 'landslide', 'typhoon', 'rainfall', 
-                   'wind', 'temperature', 'humidity', 'disaster', 'emergency', 'evacuation',
-                   'climate', 'hazard', 'risk assessment', 'environmental']
-    
-    # Check for follow-up confirmation keywords that should stay in detect mode
-    followup_keywords = ['yes', 'okay', 'sure', 'what should i do next', 'what to do next', 
-                        'next steps', 'recommendations', 'protocol', 'emergency', 'cdrrmo',
-                        'evacuation', 'flood warning', 'disaster response']
-    
     user_input_lower = user_input.lower().strip()
+    # Environmental / follow-up / next-step / data-pattern keywords in one pass (see intent_router.py)
+    intents = get_intent_router().match(user_input_lower)
     
     # If it's a simple confirmation (yes/okay/sure) or asking for next steps, use detect mode
-    simple_confirmations = ['yes', 'okay', 'sure', 'ok', 'yep', 'yeah']
-    if user_input_lower in simple_confirmations or any(phrase in user_input_lower for phrase in ['what should i do next', 'what to do next', 'next steps']):
+    if user_input_lower in SIMPLE_CONFIRMATIONS or "next_step" in intents:
         print(f"DEBUG: Simple confirmation detected: '{user_input_lower}' -> DETECT mode", file=sys.stderr)
         return user_input, "detect"
     
     # If it's a follow-up confirmation, use detect mode
-    if any(keyword in user_input_lower for keyword in followup_keywords):
+    if "followup" in intents:
         print(f"DEBUG: Follow-up keyword detected: '{user_input_lower}' -> DETECT mode", file=sys.stderr)
         return user_input, "detect"
     
     # If it contains multiple environmental keywords or specific data patterns, use detect mode
-    env_keyword_count = sum(1 for keyword in env_keywords if keyword in user_input_lower)
+    env_keyword_count = len(intents.get("environment", ()))
     
-    if env_keyword_count >= 2 or any(pattern in user_input_lower for pattern in 
-                                   ['km/h', 'mm/hr', 'degrees celsius', 'coordinates', 'latitude', 'longitude']):
+    if env_keyword_count >= 2 or "data_pattern" in intents:
         return user_input, "detect"
     
     # Otherwise, use chat mode for normal conversation
     print(f"DEBUG: No special detection -> CHAT mode for: '{user_input_lower}'", file=sys.stderr)
     return user_input, "chat"
 
-def get_chat_history_file() -> str:
-    """
-    Get the path to the temporary chat history file.
-    
-    Returns:
-        str: Path to the chat history file
-    """
-    # Use current directory instead of temp directory for reliability
-    current_dir = os.path.dirname(os.path.abspath(__file__))
-    history_file = os.path.join(current_dir, "climatech_ai_chat_history.txt")
-    
-    # Ensure the file exists
-    if not os.path.exists(history_file):
-        try:
-            with open(history_file, 'w', encoding='utf-8') as f:
-                f.write(f"# ClimatechAI Chat History - Created {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-            print(f"DEBUG: Created chat history file at: {history_file}", file=sys.stderr)
-        except Exception as e:
-            print(f"ERROR: Could not create chat history file: {e}", file=sys.stderr)
-    
-    return history_file
-
-def save_chat_message(role: str, content: str, mode: str = "chat") -> None:
+def save_chat_message(role: str, content: str, mode: str = "chat", session_id: str = DEFAULT_SESSION_ID) -> None:
     """
-    Save a chat message to the temporary history file.
+    Save a chat message to the session's history (bounded, see chat_history.py).
     
     Args:
         role (str): Either "user" or "assistant"
         content (str): The message content
         mode (str): The AI mode used ("chat" or "detect")
+        session_id (str): Chat session the message belongs to
     """
     try:
-        history_file = get_chat_history_file()
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        
-        # Create entry
-        entry = f"[{timestamp}] {role.upper()} ({mode}): {content[:200]}{'...' if len(content) > 200 else ''}\n"
-        
-        print(f"DEBUG: Saving to history: {role.upper()} message ({len(content)} chars)", file=sys.stderr)
+        print(f"DEBUG: Saving to history: {role.upper()} message ({len(content)} chars) for session {session_id}", file=sys.stderr)
         
-        # Append to file
-        with open(history_file, 'a', encoding='utf-8') as f:
-            f.write(entry)
-            f.flush()  # Ensure it's written immediately
-            
-        print(f"DEBUG: Successfully saved message to {history_file}", file=sys.stderr)
-            
-        # Keep only last 10 messages to prevent file from growing too large
-        trim_chat_history()
+        get_chat_history_store().append(
+            session_id, role, f"{content[:200]}{'...' if len(content) > 200 else ''}", mode
+        )
         
     except Exception as e:
         print(f"ERROR: Could not save chat history: {e}", file=sys.stderr)
         import traceback
         traceback.print_exc(file=sys.stderr)
 
-def trim_chat_history(max_messages: int = 10) -> None:
+def trim_chat_history(max_messages: int = 10, session_id: str = DEFAULT_SESSION_ID) -> None:
     """
-    Keep only the last N messages in the chat history file.
+    Keep only the last N messages in a session's history.
     
     Args:
         max_messages (int): Maximum number of messages to keep
+        session_id (str): Chat session to trim
     """
     try:
-        history_file = get_chat_history_file()
-        
-        if not os.path.exists(history_file):
-            return
-            
-        # Read all lines
-        with open(history_file, 'r', encoding='utf-8') as f:
-            lines = f.readlines()
-        
-        # Keep only the last max_messages lines
-        if len(lines) > max_messages:
-            lines = lines[-max_messages:]
-            
-            # Write back to file
-            with open(history_file, 'w', encoding='utf-8') as f:
-                f.writelines(lines)
-                
+        get_chat_history_store().trim(session_id, max_messages)
     except Exception as e:
         print(f"Warning: Could not trim chat history: {e}", file=sys.stderr)
 
-def get_recent_chat_history(max_messages: int = 6) -> str:
+def get_recent_chat_history(max_messages: int = 6, session_id: str = DEFAULT_SESSION_ID) -> str:
     """
     Get recent chat history formatted for AI context.
     
     Args:
         max_messages (int): Maximum number of recent messages to include
+        session_id (str): Chat session to read
         
     Returns:
         str: Formatted chat history or empty string if none available
     """
     try:
-        history_file = get_chat_history_file()
+        recent = get_chat_history_store().recent(session_id, max_messages)
         
-        if not os.path.exists(history_file):
-            print(f"DEBUG: Chat history file does not exist: {history_file}", file=sys.stderr)
+        if not recent:
+            print(f"DEBUG: No chat history for session {session_id}", file=sys.stderr)
             return ""
-            
-        # Read recent lines
-        with open(history_file, 'r', encoding='utf-8') as f:
-            lines = f.readlines()
-        
-        print(f"DEBUG: Read {len(lines)} lines from chat history", file=sys.stderr)
-        
-        if not lines:
-            print("DEBUG: No lines in chat history file", file=sys.stderr)
-            return ""
-        
-        # Filter out comment lines and empty lines
-        message_lines = [line for line in lines if line.strip() and not line.startswith('#')]
         
-        if not message_lines:
-            print("DEBUG: No message lines found in chat history", file=sys.stderr)
-            return ""
-            
-        # Get last max_messages lines
-        recent_lines = message_lines[-max_messages:] if len(message_lines) > max_messages else message_lines
-        
-        print(f"DEBUG: Using {len(recent_lines)} recent messages for context", file=sys.stderr)
-        
-        if not recent_lines:
-            return ""
+        print(f"DEBUG: Using {len(recent)} recent messages for context", file=sys.stderr)
             
         # Format for AI context
         history_context = "\n--- Recent Chat History ---\n"
-        for line in recent_lines:
-            history_context += line
+        for message in recent:
+            history_context += f"[{message['created_at']}] {message['role'].upper()} ({message['mode']}): {message['content']}\n"
         history_context += "--- End History ---\n\n"
         
         print(f"DEBUG: Generated history context ({len(history_context)} chars)", file=sys.stderr)
@@ -253,25 +208,24 @@ def get_recent_chat_history(max_messages: int = 6) -> str:
         traceback.print_exc(file=sys.stderr)
         return ""
 
-def clear_chat_history() -> None:
+def clear_chat_history(session_id: str = DEFAULT_SESSION_ID) -> None:
     """
-    Clear the chat history file.
+    Clear a session's chat history.
     """
     try:
-        history_file = get_chat_history_file()
-        if os.path.exists(history_file):
-            os.remove(history_file)
-            print("Chat history cleared.", file=sys.stderr)
+        get_chat_history_store().clear(session_id)
+        print("Chat history cleared.", file=sys.stderr)
     except Exception as e:
         print(f"Warning: Could not clear chat history: {e}", file=sys.stderr)
 
-def call_openrouter(user_input: str, mode: str = "chat") -> Dict[str, Any]:
+def call_openrouter(user_input: str, mode: str = "chat", session_id: str = DEFAULT_SESSION_ID) -> Dict[str, Any]:
     """
     OpenRouter AI call with mode-specific system prompt and user input.
     
     Args:
         user_input (str): The user's input/prompt
         mode (str): Either "chat" or "detect" mode
+        session_id (str): Chat session whose history is used and extended
         
     Returns:
         Dict[str, Any]: JSON response from the AI model
@@ -281,7 +235,7 @@ def call_openrouter(user_input: str, mode: str = "chat") -> Dict[str, Any]:
         return {"error": f"Invalid mode '{mode}'. Use 'chat' or 'detect'"}
     
     # Save user message to history
-    save_chat_message("user", user_input, mode)
+    save_chat_message("user", user_input, mode, session_id)
     
     # Get API key from environment variable
     api_key = os.getenv('OPENROUTER_API_KEY')
@@ -289,7 +243,7 @@ def call_openrouter(user_input: str, mode: str = "chat") -> Dict[str, Any]:
         return {"error": "OPENROUTER_API_KEY not found in environment variables"}
     
     # OpenRouter API endpoint
-    url = "https://openrouter.ai/api/v1/chat/completions"
+    url = OPENROUTER_URL
     
     # Headers for the request
     headers = {
@@ -306,11 +260,12 @@ def call_openrouter(user_input: str, mode: str = "chat") -> Dict[str, Any]:
     system_prompt = read_system_prompt(mode)
     
     # Get recent chat history for context
-    chat_history = get_recent_chat_history()
+    chat_history = get_recent_chat_history(session_id=session_id)
     
     # Add chat history to system prompt if available
     if chat_history:
-        print(f"DEBUG: Including chat history ({len(chat_history.split('\\n')) - 4} messages)", file=sys.stderr)
+        history_count = len(chat_history.split('\n')) - 4
+        print(f"DEBUG: Including chat history ({history_count} messages)", file=sys.stderr)
         print(f"DEBUG: Chat history content: {chat_history[:300]}{'...' if len(chat_history) > 300 else ''}", file=sys.stderr)
         system_prompt_with_history = system_prompt + "\n\n" + chat_history + "Use this chat history to maintain context and provide appropriate follow-up responses."
     else:
@@ -339,7 +294,7 @@ def call_openrouter(user_input: str, mode: str = "chat") -> Dict[str, Any]:
     
     try:
         # Make the API call
-        response = requests.post(url, headers=headers, json=payload, timeout=30)
+        response = get_http_session().post(url, headers=headers, json=payload, timeout=30)
         response.raise_for_status()
         
         # Parse the response
@@ -350,7 +305,7 @@ def call_openrouter(user_input: str, mode: str = "chat") -> Dict[str, Any]:
             content = result["choices"][0]["message"]["content"]
             
             # Save AI response to history
-            save_chat_message("assistant", content, mode)
+            save_chat_message("assistant", content, mode, session_id)
             
             return {
                 "success": True,
@@ -363,25 +318,115 @@ def call_openrouter(user_input: str, mode: str = "chat") -> Dict[str, Any]:
             }
         else:
             error_msg = "No response content found"
-            save_chat_message("assistant", f"ERROR: {error_msg}", mode)
+            save_chat_message("assistant", f"ERROR: {error_msg}", mode, session_id)
             return {"error": error_msg}
             
     except requests.exceptions.RequestException as e:
         error_msg = f"API request failed: {str(e)}"
-        save_chat_message("assistant", f"ERROR: {error_msg}", mode)
+        save_chat_message("assistant", f"ERROR: {error_msg}", mode, session_id)
         return {"error": error_msg}
     except json.JSONDecodeError as e:
         error_msg = f"Invalid JSON response: {str(e)}"
-        save_chat_message("assistant", f"ERROR: {error_msg}", mode)
+        save_chat_message("assistant", f"ERROR: {error_msg}", mode, session_id)
         return {"error": error_msg}
     except Exception as e:
         error_msg = f"Unexpected error: {str(e)}"
-        save_chat_message("assistant", f"ERROR: {error_msg}", mode)
+        save_chat_message("assistant", f"ERROR: {error_msg}", mode, session_id)
         return {"error": error_msg}
 
+def handle_prompt(raw_input: str, specified_mode: str = None, session_id: str = None) -> Dict[str, Any]:
+    """
+    Route one prompt: detect the mode, then call OpenRouter.
+    
+    Args:
+        raw_input (str): The raw user input
+        specified_mode (str): Explicitly specified mode, if any
+        session_id (str): Chat session id from the client, if any
+        
+    Returns:
+        Dict[str, Any]: JSON response from the AI model
+    """
+    formatted_input, determined_mode = detect_input_type_and_format(raw_input, specified_mode)
+    print(f"DEBUG: Input: '{raw_input}' -> Mode: {determined_mode}", file=sys.stderr)
+    return call_openrouter(formatted_input, determined_mode, normalize_session_id(session_id))
+
+class AIWorkerHandler(BaseHTTPRequestHandler):
+    """
+    HTTP handler for the persistent worker: POST /chat {"prompt", "mode", "session_id"}, GET /health.
+    """
+    def _send_json(self, status: int, body: Dict[str, Any]) -> None:
+        data = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+    
+    def do_GET(self):
+        if self.path == "/health":
+            self._send_json(200, {"status": "ok"})
+        else:
+            self._send_json(404, {"error": "Not found"})
+    
+    def do_POST(self):
+        if self.path != "/chat":
+            self._send_json(404, {"error": "Not found"})
+            return
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            data = json.loads(self.rfile.read(length) or b"{}")
+        except (ValueError, json.JSONDecodeError):
+            self._send_json(400, {"error": "Invalid JSON body"})
+            return
+        
+        prompt = data.get("prompt") if isinstance(data, dict) else None
+        if not prompt:
+            self._send_json(400, {"error": "Prompt is required"})
+            return
+        mode = str(data.get("mode") or "").lower()
+        self._send_json(200, handle_prompt(prompt, mode if mode in ["chat", "detect"] else None,
+                                           data.get("session_id")))
+    
+    def log_message(self, format, *args):
+        print(f"DEBUG: worker {self.address_string()} {format % args}", file=sys.stderr)
+
+def serve(host: str = None, port: int = None) -> None:
+    """
+    Run as a long-lived local HTTP worker.
+    
+    The interpreter, imports, cached system prompts, the keep-alive OpenRouter session and the
+    history store connection stay warm between messages.
+    
+    Args:
+        host (str): Bind address (AI_WORKER_HOST, default 127.0.0.1)
+        port (int): Port (AI_WORKER_PORT, default 8765)
+    """
+    host = host or os.getenv("AI_WORKER_HOST", "127.0.0.1")
+    port = port or int(os.getenv("AI_WORKER_PORT", "8765"))
+    
+    # Warm up the prompt cache and history store before the first request
+    for mode in ["chat", "detect"]:
+        read_system_prompt(mode)
+    get_chat_history_store()
+    
+    server = ThreadingHTTPServer((host, port), AIWorkerHandler)
+    print(f"AI worker listening on http://{host}:{port}", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
 # Example usage with mode selection
 if __name__ == "__main__":
-    import sys
+    # Persistent worker: python ai.py --serve [port]
+    if len(sys.argv) > 1 and sys.argv[1] == "--serve":
+        serve(port=int(sys.argv[2]) if len(sys.argv) > 2 else None)
+        sys.exit(0)
+    
+    # Session for spawned runs: AI_CHAT_SESSION env var, or "session_id" in JSON stdin
+    session_id = os.getenv("AI_CHAT_SESSION")
     
     # Read input from command line arguments or stdin
     if len(sys.argv) > 1:
@@ -412,6 +457,7 @@ if __name__ == "__main__":
                         if 'prompt' in data:
                             raw_input = data.get('prompt', '')
                             specified_mode = data.get('mode', None)
+                            session_id = data.get('session_id', session_id)
                         else:
                             # It's environmental data
                             raw_input = json.dumps(data)
@@ -421,8 +467,5 @@ if __name__ == "__main__":
             raw_input = "What are the current weather conditions in Iloilo City?"
     
     # Use smart detection to determine input type and mode
-    formatted_input, determined_mode = detect_input_type_and_format(raw_input, specified_mode)
-    
-    print(f"DEBUG: Input: '{raw_input}' -> Mode: {determined_mode}", file=sys.stderr)
-    result = call_openrouter(formatted_input, determined_mode)
+    result = handle_prompt(raw_input, specified_mode, session_id)
     print(json.dumps(result, indent=2))
\ No newline at end of file
@@ -2,74 +2,114 @@ import { NextRequest, NextResponse } from 'next/server';
 import { spawn } from 'child_process';
 import path from 'path';
 
-export async function POST(request: NextRequest) {
+// Persistent AI worker started with `python ai.py --serve` (e.g. http://127.0.0.1:8765)
+const AI_WORKER_URL = process.env.AI_WORKER_URL;
+const AI_WORKER_TIMEOUT_MS = 60000;
+
+async function callAiWorker(prompt: string, mode: string, sessionId?: string): Promise<any | null> {
+  if (!AI_WORKER_URL) {
+    return null;
+  }
+  const controller = new AbortController();
+  const timeout = setTimeout(() => controller.abort(), AI_WORKER_TIMEOUT_MS);
   try {
-    const { prompt, mode } = await request.json();
-    
-    if (!prompt) {
-      return NextResponse.json({ error: 'Prompt is required' }, { status: 400 });
-    }
-    if (!mode) {
-      return NextResponse.json({ error: 'Mode is required' }, { status: 400 });
+    const response = await fetch(`${AI_WORKER_URL}/chat`, {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify({ prompt, mode, session_id: sessionId }),
+      signal: controller.signal,
+    });
+    if (!response.ok) {
+      console.error('AI worker error:', response.status);
+      return null;
     }
+    return await response.json();
+  } catch (error) {
+    console.error('AI worker unavailable, falling back to spawning ai.py:', error);
+    return null;
+  } finally {
+    clearTimeout(timeout);
+  }
+}
 
-    // Path to your Python script
-    const pythonScriptPath = path.join(process.cwd(), 'ai.py');
-    
-    // Spawn Python process with the prompt as argument
-    const pythonProcess = spawn('python', [pythonScriptPath, mode, prompt], {
-      stdio: ['pipe', 'pipe', 'pipe'],
-      cwd: process.cwd() // Ensure we're in the right directory
-    });
+function runAiScript(prompt: string, mode: string, sessionId?: string): Promise<NextResponse> {
+  // Path to your Python script
+  const pythonScriptPath = path.join(process.cwd(), 'ai.py');
+  
+  // Spawn Python process with the prompt as argument
+  const pythonProcess = spawn('python', [pythonScriptPath, mode, prompt], {
+    stdio: ['pipe', 'pipe', 'pipe'],
+    cwd: process.cwd(), // Ensure we're in the right directory
+    env: sessionId ? { ...process.env, AI_CHAT_SESSION: sessionId } : process.env
+  });
 
-    // Collect output
-    let output = '';
-    let errorOutput = '';
+  // Collect output
+  let output = '';
+  let errorOutput = '';
 
-    pythonProcess.stdout.on('data', (data) => {
-      output += data.toString();
-    });
+  pythonProcess.stdout.on('data', (data) => {
+    output += data.toString();
+  });
 
-    pythonProcess.stderr.on('data', (data) => {
-      errorOutput += data.toString();
-    });
+  pythonProcess.stderr.on('data', (data) => {
+    errorOutput += data.toString();
+  });
 
-    // Wait for process to complete
-    return new Promise((resolve) => {
-      pythonProcess.on('close', (code) => {
-        if (code !== 0) {
-          console.error('Python script error:', errorOutput);
+  // Wait for process to complete
+  return new Promise((resolve) => {
+    pythonProcess.on('close', (code) => {
+      if (code !== 0) {
+        console.error('Python script error:', errorOutput);
+        resolve(NextResponse.json({ 
+          error: `Python script failed with code ${code}: ${errorOutput}` 
+        }, { status: 500 }));
+      } else {
+        try {
+          const jsonStart = output.indexOf("{");
+          if (jsonStart !== -1) {
+            const clean = output.slice(jsonStart);
+            const result = JSON.parse(clean);
+            resolve(NextResponse.json(result));
+          } else {
+            throw new Error("No JSON found in output");
+          }
+        } catch (parseError) {
+          console.error('Parse error:', parseError, 'Raw output:', output);
           resolve(NextResponse.json({ 
-            error: `Python script failed with code ${code}: ${errorOutput}` 
+            error: 'Failed to parse Python output', 
+            rawOutput: output 
           }, { status: 500 }));
-        } else {
-          try {
-            const jsonStart = output.indexOf("{");
-            if (jsonStart !== -1) {
-              const clean = output.slice(jsonStart);
-              const result = JSON.parse(clean);
-              resolve(NextResponse.json(result));
-            } else {
-              throw new Error("No JSON found in output");
-            }
-          } catch (parseError) {
-            console.error('Parse error:', parseError, 'Raw output:', output);
-            resolve(NextResponse.json({ 
-              error: 'Failed to parse Python output', 
-              rawOutput: output 
-            }, { status: 500 }));
-          }
         }
-      });
+      }
+    });
 
-      // Handle process errors
-      pythonProcess.on('error', (error) => {
-        console.error('Process error:', error);
-        resolve(NextResponse.json({ 
-          error: `Failed to start Python process: ${error.message}` 
-        }, { status: 500 }));
-      });
+    // Handle process errors
+    pythonProcess.on('error', (error) => {
+      console.error('Process error:', error);
+      resolve(NextResponse.json({ 
+        error: `Failed to start Python process: ${error.message}` 
+      }, { status: 500 }));
     });
+  });
+}
+
+export async function POST(request: NextRequest) {
+  try {
+    const { prompt, mode, sessionId } = await request.json();
+    
+    if (!prompt) {
+      return NextResponse.json({ error: 'Prompt is required' }, { status: 400 });
+    }
+    if (!mode) {
+      return NextResponse.json({ error: 'Mode is required' }, { status: 400 });
+    }
+
+    // Prefer the long-lived worker (python ai.py --serve); spawn the script if it is unavailable
+    const workerResult = await callAiWorker(prompt, mode, sessionId);
+    if (workerResult) {
+      return NextResponse.json(workerResult);
+    }
+    return runAiScript(prompt, mode, sessionId);
 
   } catch (error) {
     console.error('API route error:', error);
@@ -10,6 +10,7 @@ import { EmergencyAlerts } from "@/components/emergency-alerts"
 import { Button } from "@/components/ui/button"
 import { CloudUpload, Cpu } from "lucide-react"
 import EmergencyChat, { EmergencyChatRef } from "@/components/EmergencyChat"
+import { getAiSessionId } from "@/lib/ai-session"
 
 // Fix the BACKEND_BASE_URL constant
 const BACKEND_BASE_URL = process.env.NEXT_PUBLIC_BACKEND_BASE_URL || 'http://localhost:5000'
@@ -45,7 +46,8 @@ export default function DashboardPage() {
         headers: { 'Content-Type': 'application/json' },
         body: JSON.stringify({
           prompt: JSON.stringify(environmentalData), // Convert object to JSON string
-          mode: "detect"
+          mode: "detect",
+          sessionId: getAiSessionId()
         })
       })
       if (!resp.ok) throw new Error(`HTTP ${resp.status}`)
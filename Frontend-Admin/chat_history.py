@@ -0,0 +1,142 @@
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Dict, List
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+CHAT_HISTORY_DB = os.getenv("CHAT_HISTORY_DB", os.path.join(SCRIPT_DIR, "climatech_ai_chat_history.sqlite3"))
+CHAT_HISTORY_MAX_MESSAGES = int(os.getenv("CHAT_HISTORY_MAX_MESSAGES", "10"))
+DEFAULT_SESSION_ID = "default"
+MAX_SESSION_ID_LENGTH = 64
+
+
+def normalize_session_id(session_id: str = None) -> str:
+    """
+    Clamp a client-supplied session id to a safe, bounded key.
+
+    Args:
+        session_id (str): Session id from the request, if any
+
+    Returns:
+        str: The session id, or DEFAULT_SESSION_ID when missing
+    """
+    session_id = (session_id or "").strip()[:MAX_SESSION_ID_LENGTH]
+    return session_id or DEFAULT_SESSION_ID
+
+
+class ChatHistoryStore:
+    """
+    Per-session chat history in an SQLite table (WAL mode).
+
+    Each append is one short write transaction that also drops the session's messages beyond
+    max_messages, so a session never holds more than that. Reading the last N turns is an index
+    range scan on (session_id, id). WAL lets the worker and spawned scripts read while one writes.
+    """
+
+    def __init__(self, path: str = CHAT_HISTORY_DB, max_messages: int = CHAT_HISTORY_MAX_MESSAGES):
+        self.path = path
+        self.max_messages = max(1, max_messages)
+        self._local = threading.local()
+        conn = self._connection()
+        with conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS chat_messages (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    session_id TEXT NOT NULL,
+                    role TEXT NOT NULL,
+                    mode TEXT NOT NULL,
+                    content TEXT NOT NULL,
+                    created_at TEXT NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS ix_chat_messages_session ON chat_messages (session_id, id)")
+
+    def _connection(self) -> sqlite3.Connection:
+        # sqlite3 connections must not be shared between threads
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _delete_older(conn: sqlite3.Connection, session_id: str, keep: int) -> None:
+        # Everything at or below the (keep + 1)-th newest id goes
+        conn.execute("""
+            DELETE FROM chat_messages
+            WHERE session_id = ? AND id <= (
+                SELECT id FROM chat_messages WHERE session_id = ?
+                ORDER BY id DESC LIMIT 1 OFFSET ?
+            )
+        """, (session_id, session_id, keep))
+
+    def append(self, session_id: str, role: str, content: str, mode: str = "chat") -> None:
+        """
+        Add a message and trim the session to max_messages.
+
+        Args:
+            session_id (str): Chat session
+            role (str): Either "user" or "assistant"
+            content (str): The message content
+            mode (str): The AI mode used ("chat" or "detect")
+        """
+        conn = self._connection()
+        with conn:
+            conn.execute(
+                "INSERT INTO chat_messages (session_id, role, mode, content, created_at) VALUES (?, ?, ?, ?, ?)",
+                (session_id, role, mode, content, datetime.now().strftime("%Y-%m-%d %H:%M:%S")),
+            )
+            self._delete_older(conn, session_id, self.max_messages)
+
+    def recent(self, session_id: str, limit: int) -> List[Dict[str, str]]:
+        """
+        Get the last `limit` messages of a session, oldest first.
+
+        Returns:
+            List[Dict[str, str]]: Messages with role, mode, content and created_at
+        """
+        rows = self._connection().execute("""
+            SELECT role, mode, content, created_at FROM chat_messages
+            WHERE session_id = ? ORDER BY id DESC LIMIT ?
+        """, (session_id, limit)).fetchall()
+        return [
+            {"role": role, "mode": mode, "content": content, "created_at": created_at}
+            for role, mode, content, created_at in reversed(rows)
+        ]
+
+    def trim(self, session_id: str, max_messages: int) -> None:
+        """
+        Keep only the last N messages of a session.
+        """
+        conn = self._connection()
+        with conn:
+            self._delete_older(conn, session_id, max(0, max_messages))
+
+    def clear(self, session_id: str) -> None:
+        """
+        Delete every message of a session.
+        """
+        conn = self._connection()
+        with conn:
+            conn.execute("DELETE FROM chat_messages WHERE session_id = ?", (session_id,))
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_chat_history_store() -> ChatHistoryStore:
+    """
+    Get the process-wide history store.
+
+    Returns:
+        ChatHistoryStore: Store backed by CHAT_HISTORY_DB
+    """
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = ChatHistoryStore()
+        return _store
@@ -7,6 +7,7 @@ import { Textarea } from "@/components/ui/textarea"
 import { Badge } from "@/components/ui/badge"
 import { Send, Loader2, Mic, Square } from "lucide-react"
 import VoiceOrb from "@/components/VoiceOrb"
+import { getAiSessionId } from "@/lib/ai-session"
 
 type ChatMessage = {
   id: string
@@ -209,7 +210,8 @@ const EmergencyChat = forwardRef<EmergencyChatRef, {}>((_, ref) => {
         headers: { 'Content-Type': 'application/json' },
         body: JSON.stringify({
           prompt: input.trim(),
-          mode: "chat"
+          mode: "chat",
+          sessionId: getAiSessionId()
         })
       })
 
@@ -0,0 +1,117 @@
+"""
+Single-pass keyword intent routing for the admin assistant script
+
+Same IntentRouter as backend/ai/intent_router.py: all keyword sets are compiled once into one
+trie-shaped regular expression and every intent is found in a single scan of the message, with the
+same substring semantics as the `keyword in text` checks it replaces.
+"""
+
+import re
+from typing import Dict, Iterable, Optional, Set
+
+
+def _trie_regex(keywords: Iterable[str]) -> str:
+    """Regex matching the longest keyword that starts at the current position"""
+    trie: Dict = {}
+    for keyword in keywords:
+        node = trie
+        for char in keyword:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def build(node: Dict) -> str:
+        is_end = "" in node
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        if len(branches) == 1 and not is_end:
+            return branches[0]
+        body = "(?:" + "|".join(branches) + ")"
+        return body + "?" if is_end else body
+
+    return build(trie)
+
+
+class IntentRouter:
+    """Compiled matcher for named keyword sets"""
+
+    def __init__(self, keyword_sets: Dict[str, Iterable[str]]):
+        self._keyword_intents: Dict[str, Set[str]] = {}
+        for intent, keywords in keyword_sets.items():
+            for keyword in keywords:
+                self._keyword_intents.setdefault(keyword.lower(), set()).add(intent)
+
+        keywords = sorted(self._keyword_intents, key=len, reverse=True)
+        # The scan reports the longest keyword at each position; shorter keywords inside it
+        # (e.g. "flood" in "flood warning") are credited from this table of (intent, keyword) pairs
+        self._credits = {
+            keyword: [(intent, other) for other in keywords if other in keyword
+                      for intent in self._keyword_intents[other]]
+            for keyword in keywords
+        }
+        self._pattern = re.compile(_trie_regex(keywords)) if keywords else None
+
+    def match(self, text: str) -> Dict[str, Set[str]]:
+        """
+        Every intent whose keywords occur in text (case-insensitive)
+
+        Returns:
+            intent -> set of distinct keywords found for it
+        """
+        found: Dict[str, Set[str]] = {}
+        if self._pattern is None:
+            return found
+        text = text.lower()
+        seen = set()
+        position = 0
+        # Resume one character after each match start so overlapping keywords are found too;
+        # the regex engine skips ahead to the next possible first character in C
+        while True:
+            match = self._pattern.search(text, position)
+            if match is None:
+                return found
+            position = match.start() + 1
+            keyword = match.group()
+            if keyword in seen:
+                continue
+            seen.add(keyword)
+            for intent, credited in self._credits[keyword]:
+                if intent in found:
+                    found[intent].add(credited)
+                else:
+                    found[intent] = {credited}
+
+
+ENV_KEYWORDS = ['weather', 'storm', 'flood', 'earthquake', 'landslide', 'typhoon', 'rainfall',
+                'wind', 'temperature', 'humidity', 'disaster', 'emergency', 'evacuation',
+                'climate', 'hazard', 'risk assessment', 'environmental']
+# Follow-up keywords that should stay in detect mode
+FOLLOWUP_KEYWORDS = ['yes', 'okay', 'sure', 'what should i do next', 'what to do next',
+                     'next steps', 'recommendations', 'protocol', 'emergency', 'cdrrmo',
+                     'evacuation', 'flood warning', 'disaster response']
+NEXT_STEP_PHRASES = ['what should i do next', 'what to do next', 'next steps']
+DATA_PATTERNS = ['km/h', 'mm/hr', 'degrees celsius', 'coordinates', 'latitude', 'longitude']
+# Whole-message confirmations (exact match, not substring)
+SIMPLE_CONFIRMATIONS = frozenset(['yes', 'okay', 'sure', 'ok', 'yep', 'yeah'])
+
+INPUT_INTENTS = {
+    "environment": ENV_KEYWORDS,
+    "followup": FOLLOWUP_KEYWORDS,
+    "next_step": NEXT_STEP_PHRASES,
+    "data_pattern": DATA_PATTERNS,
+}
+
+_router: Optional[IntentRouter] = None
+
+
+def get_intent_router() -> IntentRouter:
+    """
+    Get the process-wide router for the input keyword sets (compiled on first use).
+
+    Returns:
+        IntentRouter: Router over INPUT_INTENTS
+    """
+    global _router
+    if _router is None:
+        _router = IntentRouter(INPUT_INTENTS)
+    return _router
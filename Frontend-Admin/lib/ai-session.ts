@@ -0,0 +1,16 @@
+const AI_SESSION_KEY = "climatech-ai-session"
+
+// Per-browser id for the assistant's chat history, shared by the dashboard and the chat panel
+export function getAiSessionId(): string {
+  if (typeof window === "undefined") return "default"
+  try {
+    let sessionId = window.localStorage.getItem(AI_SESSION_KEY)
+    if (!sessionId) {
+      sessionId = crypto.randomUUID()
+      window.localStorage.setItem(AI_SESSION_KEY, sessionId)
+    }
+    return sessionId
+  } catch {
+    return "default"
+  }
+}
@@ -16,6 +16,7 @@ from dotenv import load_dotenv
 
 from database import SessionLocal
 from models import WeatherData
+from weather_cache import get_weather_cache, mark_weather_stored
 
 # Load environment variables
 load_dotenv()
@@ -191,19 +192,53 @@ class GoogleWeatherAPI:
             'Accept': 'application/json'
         })
     
-    def get_weather_data(self, lat: float, lng: float) -> Dict:
+    @property
+    def uses_live_api(self) -> bool:
+        return bool(self.api_key) and self.api_key != "mock_key"
+    
+    def is_cacheable(self, weather_data: Dict) -> bool:
+        """Don't cache mock fallbacks for a failed live request, so the next call retries upstream"""
+        return not (self.uses_live_api and 'mock' in weather_data.get('source', ''))
+    
+    def get_weather_data(self, lat: float, lng: float, use_cache: bool = True,
+                         allow_stale: bool = True) -> Dict:
         """
         Get weather data for a specific location using Google's Weather API
         
+        Observations are served from the location-quantized cache while fresh (see weather_cache.py);
+        a cached observation that was already stored carries its row id as "weather_data_id".
+        
         Args:
             lat: Latitude
             lng: Longitude
+            use_cache: Set False to always call upstream
+            allow_stale: Set False to never get a stale entry (collectors recording history)
             
         Returns:
             Dictionary containing weather data with Filipino conditions
         """
+        cache = get_weather_cache() if use_cache else None
+        if cache is None:
+            return self._get_weather_data_uncached(lat, lng)
+        
+        weather_data = cache.get_or_fetch(
+            lat, lng, lambda: self._get_weather_data_uncached(lat, lng), should_cache=self.is_cacheable,
+            allow_stale=allow_stale
+        )
+        if weather_data:
+            weather_data['location'] = {
+                **weather_data.get('location', {}),
+                "lat": lat,
+                "lng": lng,
+                "name": f"Weather Station at ({lat:.4f}, {lng:.4f})"
+            }
+            weather_data['station_name'] = f"Station_{int(lat*1000)}_{int(lng*1000)}"
+        return weather_data
+    
+    def _get_weather_data_uncached(self, lat: float, lng: float) -> Dict:
+        """Fetch from Google, falling back to mock data"""
         try:
-            if self.api_key and self.api_key != "mock_key":
+            if self.uses_live_api:
                 # Try Google Weather API first
                 try:
                     return self._fetch_from_google_api(lat, lng)
@@ -459,6 +494,7 @@ class WeatherDatabaseManager:
             self.db.add(weather_record)
             self.db.commit()
             self.db.refresh(weather_record)
+            mark_weather_stored(weather_data, weather_record.id)
             
             print(f"✅ Raw weather data saved to database:")
             print(f"   📍 Location: {lat:.4f}, {lng:.4f}")
@@ -492,13 +528,18 @@ class WeatherDatabaseManager:
         try:
             print(f"🌤️ Collecting weather data for ({lat:.4f}, {lng:.4f})...")
             
-            # Get weather data from Google API
-            weather_data = self.weather_api.get_weather_data(lat, lng)
+            # Fresh observations only: this records history
+            weather_data = self.weather_api.get_weather_data(lat, lng, allow_stale=False)
             
             if not weather_data:
                 print(f"❌ Failed to get weather data for location ({lat}, {lng})")
                 return False
             
+            # A cached observation that is already stored is not stored again
+            if weather_data.get('weather_data_id'):
+                print(f"🗃️ Reusing weather_data {weather_data['weather_data_id']} for ({lat:.4f}, {lng:.4f})")
+                return True
+            
             # Override station name if provided
             if station_name:
                 weather_data['station_name'] = station_name
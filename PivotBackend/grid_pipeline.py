@@ -0,0 +1,397 @@
+#!/usr/bin/env python3
+"""
+Staged grid risk assessment for Pivot Backend
+
+Instead of walking the grid point by point (fetch, insert, query, LLM, sleep), each stage runs
+over the whole grid:
+
+1. weather  - fetched concurrently through one GoogleWeatherAPI client, reusing fresh cache entries
+2. hazards  - one spatial join per hazard layer for the whole grid (get_hazard_zones_batch)
+3. storage  - new weather rows inserted in one transaction; cached observations that are already
+              stored are referenced by id instead
+4. rules    - vectorized rule-based scores (risk_scoring.py); clear low-risk points stop here
+5. LLM      - bounded number of concurrent OpenRouter calls, several points per prompt, fed the
+              results of stages 1 and 2
+6. storage  - all risk assessment rows inserted in one transaction
+
+The weather and LLM stages each have their own concurrency and rate limit, so a grid takes about
+as long as the LLM request budget allows.
+"""
+
+import json
+import math
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from dotenv import load_dotenv
+from sqlalchemy.orm import Session
+
+from google_weather_api import GoogleWeatherAPI
+from weather_cache import get_weather_cache, mark_weather_stored
+from models import WeatherData, RiskAssessmentData
+from risk_assessment import RiskAssessmentEngine, get_hazard_zones_batch
+from risk_scoring import score_points, needs_llm, rule_based_assessments
+
+load_dotenv()
+
+GRID_WEATHER_CONCURRENCY = int(os.getenv("GRID_WEATHER_CONCURRENCY", "8"))
+GRID_WEATHER_RATE = float(os.getenv("GRID_WEATHER_RATE", "10"))  # requests per second
+GRID_LLM_CONCURRENCY = int(os.getenv("GRID_LLM_CONCURRENCY", "4"))
+GRID_LLM_RATE = float(os.getenv("GRID_LLM_RATE", "0.33"))  # OpenRouter free models allow ~20 requests/min
+GRID_LLM_BATCH_SIZE = int(os.getenv("GRID_LLM_BATCH_SIZE", "20"))  # points per LLM request
+GRID_LLM_SCORE_THRESHOLD = float(os.getenv("GRID_LLM_SCORE_THRESHOLD", "40"))  # rule score from which the LLM is asked
+GRID_LLM_UNCERTAINTY_MARGIN = float(os.getenv("GRID_LLM_UNCERTAINTY_MARGIN", "10"))  # also ask this far below it
+GRID_LLM_CALL_SECONDS = 5.0  # typical LLM latency per request, only used for time estimates
+
+
+class RateLimiter:
+    """Thread-safe token bucket: `rate` acquisitions per second, bursts up to `burst`"""
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.tokens = float(self.burst)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        if self.rate <= 0:
+            return
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            # Reserve a token; a negative balance is the wait for this caller's turn
+            self.tokens -= 1
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+        if wait > 0:
+            time.sleep(wait)
+
+
+def generate_grid_points(min_lat: float, max_lat: float, min_lng: float, max_lng: float, spacing: float):
+    """
+    Generate a grid of points within the specified bounds
+    """
+    points = []
+    lat = min_lat
+    while lat <= max_lat:
+        lng = min_lng
+        while lng <= max_lng:
+            points.append((lat, lng))
+            lng += spacing
+        lat += spacing
+    return points
+
+
+def estimate_grid_seconds(total_points: int) -> float:
+    """Rough upper bound on wall-clock time for a grid (as if every point needed the LLM)"""
+    weather_seconds = total_points / GRID_WEATHER_RATE if GRID_WEATHER_RATE > 0 else 0.0
+    llm_requests = math.ceil(total_points / max(1, GRID_LLM_BATCH_SIZE))
+    llm_seconds = llm_requests * GRID_LLM_CALL_SECONDS / max(1, GRID_LLM_CONCURRENCY)
+    if GRID_LLM_RATE > 0:
+        llm_seconds = max(llm_seconds, llm_requests / GRID_LLM_RATE)
+    return round(weather_seconds + llm_seconds, 1)
+
+
+def summarize_weather(weather_data: Optional[Dict]) -> Optional[Dict]:
+    """Flatten a GoogleWeatherAPI result into the weather_data table columns"""
+    if not weather_data or 'current' not in weather_data:
+        return None
+    current = weather_data['current']
+    return {
+        "temperature": current["temperature"],
+        "humidity": current["humidity"],
+        "pressure": current["pressure"],
+        "wind_speed": current["wind_speed"],
+        "wind_direction": current["wind_direction"],
+        "precipitation": current["rainfall"],
+        "weather_condition": current["description"]
+    }
+
+
+def _run_limited(func, items: Sequence, concurrency: int, limiter: RateLimiter) -> List:
+    """Map func over items with at most `concurrency` calls in flight, each one rate limited"""
+    def call(item):
+        limiter.acquire()
+        return func(item)
+
+    if not items:
+        return []
+    with ThreadPoolExecutor(max_workers=max(1, min(concurrency, len(items)))) as executor:
+        return list(executor.map(call, items))
+
+
+def fetch_weather_batch(points: Sequence[Tuple[float, float]], api_key: str) -> List[Optional[Dict]]:
+    """
+    GoogleWeatherAPI observations for each (lat, lng), in input order; None where the fetch failed
+
+    Fresh cache entries are reused (never stale ones: the rows are history); an entry that was
+    already stored carries its row id as "weather_data_id".
+    """
+    weather_api = GoogleWeatherAPI(api_key)
+    limiter = RateLimiter(GRID_WEATHER_RATE, GRID_WEATHER_CONCURRENCY)
+
+    def fetch(point):
+        lat, lng = point
+        try:
+            weather_data = weather_api.get_weather_data(lat, lng, allow_stale=False)
+            if summarize_weather(weather_data) is None:
+                print(f"Error: Invalid weather data format for ({lat}, {lng})")
+                return None
+            return weather_data
+        except Exception as e:
+            print(f"Error fetching weather for ({lat}, {lng}): {e}")
+            return None
+
+    return _run_limited(fetch, points, GRID_WEATHER_CONCURRENCY, limiter)
+
+
+def _insert_rows(db: Session, rows: List, commit: bool) -> None:
+    """
+    Insert rows in their own transaction, or with commit=False inside a savepoint of the caller's
+    transaction (flushed for ids; a failure rolls back only these rows, the caller commits)
+    """
+    if commit:
+        try:
+            db.add_all(rows)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+    else:
+        with db.begin_nested():
+            db.add_all(rows)
+
+
+def _observation_key(index: int, lat: float, lng: float, weather_data: Dict):
+    """Same key for points served the same cached observation (one row for all of them)"""
+    cache = get_weather_cache()
+    if cache is None:
+        return index
+    return cache.key(lat, lng), json.dumps(weather_data.get("current"), sort_keys=True, default=str)
+
+
+def save_weather_batch(db: Session, points: Sequence[Tuple[float, float]], fetched: Sequence[Optional[Dict]],
+                       commit: bool = True) -> Tuple[Optional[List[Optional[int]]], List[Tuple[Dict, int]]]:
+    """
+    Insert the fetched weather rows in one transaction
+
+    Observations that are already stored (weather_data_id) are referenced instead, and points
+    served the same cached observation share one new row.
+
+    Returns:
+        weather_data ids per point (None if the insert failed), and (observation, id) for each new
+        row, to tag the cache entries with once the rows are committed (remember_stored_weather)
+    """
+    ids: List[Optional[int]] = [weather_data.get("weather_data_id") if weather_data else None
+                                for weather_data in fetched]
+    records = {}  # observation key -> (observation, WeatherData)
+    keys = {}  # point index -> observation key
+    for index, ((lat, lng), weather_data) in enumerate(zip(points, fetched)):
+        if not weather_data or ids[index]:
+            continue
+        key = keys[index] = _observation_key(index, lat, lng, weather_data)
+        if key not in records:
+            records[key] = (weather_data, WeatherData(location=f"POINT({lng} {lat})", **summarize_weather(weather_data)))
+
+    if not records:
+        return ids, []
+    try:
+        _insert_rows(db, [record for _, record in records.values()], commit)
+    except Exception as e:
+        print(f"  ⚠️ Error saving weather data to database: {e}")
+        return None, []
+
+    for index, key in keys.items():
+        ids[index] = records[key][1].id
+    reused = sum(1 for weather_data in fetched if weather_data) - len(records)
+    print(f"  💾 Saved {len(records)} weather observations ({reused} points reuse a stored one)")
+    return ids, [(weather_data, record.id) for weather_data, record in records.values()]
+
+
+def remember_stored_weather(stored: Sequence[Tuple[Dict, int]]) -> None:
+    """Tag the cache entries of committed observations with their rows, so later hits reference them"""
+    for weather_data, weather_data_id in stored:
+        mark_weather_stored(weather_data, weather_data_id)
+
+
+def assess_points_with_llm(points: Sequence[Tuple[float, float]], weather: Sequence[Optional[Dict]],
+                           hazards: Sequence[Dict]) -> Tuple[List[Optional[Dict]], int]:
+    """
+    Run RiskAssessmentEngine for each point with bounded concurrency
+
+    Returns:
+        One assessment per point (None where its request raised) and the number of failed
+        requests: requests the model answered for none of their points (their points get
+        rule-based fallbacks) or that raised
+
+    The engine gets the weather and hazard zones computed by the earlier stages, so this stage
+    makes no database queries. Points are sent GRID_LLM_BATCH_SIZE per request (each batch is one
+    rate-limited call); a batch size of 1 assesses points individually.
+    """
+    engine = RiskAssessmentEngine()
+    limiter = RateLimiter(GRID_LLM_RATE, GRID_LLM_CONCURRENCY)
+    recorded = datetime.now().isoformat()
+    weather = [{**w, "timestamp": recorded} if w else None for w in weather]
+    batch_size = max(1, GRID_LLM_BATCH_SIZE)
+
+    def assess(start):
+        batch = range(start, min(start + batch_size, len(points)))
+        try:
+            if batch_size == 1:
+                lat, lng = points[start]
+                assessment = engine.assess_location_risk(lat, lng, None, weather_data=weather[start], hazard_zones=hazards[start])
+                risk = assessment.get('risk_assessment')
+                # A failed request falls back to a rule-based score
+                return [assessment], int(bool(risk) and risk.get('method') != 'rules')
+            return engine.assess_locations_batch([points[i] for i in batch], [weather[i] for i in batch],
+                                                 [hazards[i] for i in batch])
+        except Exception as e:
+            print(f"Error in AI assessment for points {batch.start}-{batch.stop - 1}: {e}")
+            return [None] * len(batch), 0
+
+    batches = _run_limited(assess, range(0, len(points), batch_size), GRID_LLM_CONCURRENCY, limiter)
+    failed = sum(1 for _, answered in batches if answered == 0)
+    return [assessment for batch, _ in batches for assessment in batch], failed
+
+
+def _risk_record(lat: float, lng: float, flood_risk: Optional[str], landslide_risk: Optional[str],
+                 ai_assessment: Dict, weather_data_id: Optional[int]) -> RiskAssessmentData:
+    risk = ai_assessment.get('risk_assessment') or {}
+    factors = risk.get('contributing_factors', '')
+    if isinstance(factors, (dict, list)):
+        factors = json.dumps(factors)
+    return RiskAssessmentData(
+        location=f"POINT({lng} {lat})",
+        weather_data_id=weather_data_id,
+        flood_risk=flood_risk,
+        landslide_risk=landslide_risk,
+        ai_risk_score=risk.get('risk_score'),
+        ai_risk_level=risk.get('risk_level', 'unknown'),
+        ai_assessment_summary=risk.get('description', ''),
+        ai_recommendations=risk.get('recommendations', ''),
+        ai_factors=factors,
+        # Rule-based scores (settled points and LLM fallbacks) are marked by risk_scoring.py
+        assessment_method=risk.get('method', 'llm')
+    )
+
+
+def save_risk_assessments(db: Session, records: List[RiskAssessmentData], commit: bool = True) -> int:
+    """Insert risk assessment rows in one transaction; returns the number saved"""
+    if not records:
+        return 0
+    try:
+        _insert_rows(db, records, commit)
+    except Exception as e:
+        print(f"  ⚠️ Error saving risk assessments to database: {e}")
+        return 0
+    print(f"  💾 Saved {len(records)} risk assessments")
+    return len(records)
+
+
+def run_grid_pipeline(points: Sequence[Tuple[float, float]], api_key: str, db: Session,
+                      commit: bool = True) -> Dict:
+    """
+    Assess every grid point through the staged pipeline
+
+    Args:
+        commit: False when db is a grid job's session: weather and risk rows are only flushed and
+            the job commits them together with its progress, then passes `stored_weather` to
+            remember_stored_weather()
+
+    Returns:
+        Summary counters, one result dict per point (GridPointAssessment fields) and stored_weather
+        (see save_weather_batch). `errors` counts failed weather fetches, failed LLM requests and
+        failed inserts.
+    """
+    started = time.perf_counter()
+    total_points = len(points)
+    print(f"Processing risk assessment for {total_points} grid points "
+          f"(weather {GRID_WEATHER_CONCURRENCY}x @ {GRID_WEATHER_RATE}/s, "
+          f"LLM {GRID_LLM_CONCURRENCY}x @ {GRID_LLM_RATE}/s)...")
+
+    stage_started = time.perf_counter()
+    fetched = fetch_weather_batch(points, api_key)
+    weather = [summarize_weather(weather_data) for weather_data in fetched]
+    errors = sum(1 for w in weather if w is None)
+    print(f"  🌤️ Weather stage: {sum(1 for w in weather if w)}/{total_points} points in {time.perf_counter() - stage_started:.1f}s")
+
+    # Before any insert: a failed hazard query rolls the session back
+    stage_started = time.perf_counter()
+    hazards = get_hazard_zones_batch(db, list(points))
+    print(f"  🚨 Hazard stage: {sum(1 for h in hazards if h['flood_risk'] or h['landslide_risk'])} points "
+          f"in hazard zones in {time.perf_counter() - stage_started:.1f}s")
+
+    weather_ids, stored_weather = save_weather_batch(db, points, fetched, commit)
+    if commit:
+        remember_stored_weather(stored_weather)
+    if weather_ids is None:
+        errors += 1
+        weather_ids = [None] * total_points
+
+    # Assess only where there is some data; the rule-based scorer settles clear low-risk points
+    to_assess = [i for i in range(total_points)
+                 if weather[i] or hazards[i]['flood_risk'] or hazards[i]['landslide_risk']]
+    stage_started = time.perf_counter()
+    assessments: List[Optional[Dict]] = [None] * total_points
+    for_llm = []
+    if to_assess:
+        assess_weather = [weather[i] for i in to_assess]
+        assess_hazards = [hazards[i] for i in to_assess]
+        scored = score_points(assess_weather, assess_hazards)
+        gate = needs_llm(scored, assess_hazards, GRID_LLM_SCORE_THRESHOLD, GRID_LLM_UNCERTAINTY_MARGIN)
+        recorded = datetime.now().isoformat()
+        for index, risk, send in zip(to_assess, rule_based_assessments(assess_weather, assess_hazards, scored), gate):
+            if send:
+                for_llm.append(index)
+            else:
+                assessments[index] = {
+                    "location": {"lat": points[index][0], "lng": points[index][1]},
+                    "weather_data": weather[index],
+                    "hazard_zones": hazards[index],
+                    "risk_assessment": risk,
+                    "assessment_timestamp": recorded
+                }
+    print(f"  📏 Rule-based stage: {len(to_assess) - len(for_llm)} points settled, {len(for_llm)} sent to the LLM")
+
+    llm_assessments, llm_errors = assess_points_with_llm(
+        [points[i] for i in for_llm], [weather[i] for i in for_llm], [hazards[i] for i in for_llm])
+    errors += llm_errors
+    for index, assessment in zip(for_llm, llm_assessments):
+        assessments[index] = assessment
+    print(f"  🤖 Assessment stage: {len(to_assess)} points in {time.perf_counter() - stage_started:.1f}s")
+
+    results = []
+    records = []
+    for index, (lat, lng) in enumerate(points):
+        flood_risk, landslide_risk = hazards[index]['flood_risk'], hazards[index]['landslide_risk']
+        results.append({
+            "latitude": lat,
+            "longitude": lng,
+            "weather_data": weather[index],
+            "flood_risk": flood_risk,
+            "landslide_risk": landslide_risk,
+            "ai_assessment": assessments[index],
+        })
+        if assessments[index]:
+            records.append(_risk_record(lat, lng, flood_risk, landslide_risk, assessments[index], weather_ids[index]))
+    if records and not save_risk_assessments(db, records, commit):
+        errors += 1
+
+    print(f"✅ Grid risk assessment finished: {total_points} points in {time.perf_counter() - started:.1f}s")
+    return {
+        "grid_points": total_points,
+        "points_processed": total_points,
+        "points_with_weather": sum(1 for w in weather if w),
+        "points_with_flood_risk": sum(1 for h in hazards if h['flood_risk']),
+        "points_with_landslide_risk": sum(1 for h in hazards if h['landslide_risk']),
+        "points_with_ai_assessment": sum(1 for record in records if record.assessment_method == 'llm'),
+        "points_with_rule_assessment": sum(1 for record in records if record.assessment_method == 'rules'),
+        "errors": errors,
+        "results": results,
+        "stored_weather": stored_weather
+    }
@@ -17,6 +17,8 @@ from tqdm import tqdm
 
 from database import engine, SessionLocal
 from models import FloodData, LandslideData
+from hazard_raster import refresh_hazard_raster
+from subdivided_hazards import refresh_subdivided_table
 
 load_dotenv()
 
@@ -129,6 +131,10 @@ def import_flood_geojson(geojson_path, risk_column='VAR', batch_size=100, max_re
         if imported_count > 0:
             print(f"   Average: {elapsed_time/imported_count:.3f} seconds per record")
         
+        if imported_count > 0:
+            refresh_subdivided_table("flood")
+            refresh_hazard_raster("flood")
+        
         return imported_count, error_count
         
     except Exception as e:
@@ -246,6 +252,10 @@ def import_landslide_geojson(geojson_path, risk_column='LH', batch_size=100, max
         if imported_count > 0:
             print(f"   Average: {elapsed_time/imported_count:.3f} seconds per record")
         
+        if imported_count > 0:
+            refresh_subdivided_table("landslide")
+            refresh_hazard_raster("landslide")
+        
         return imported_count, error_count
         
     except Exception as e:
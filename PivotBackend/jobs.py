@@ -0,0 +1,360 @@
+#!/usr/bin/env python3
+"""
+Background jobs for grid risk assessments
+
+Jobs are rows in grid_assessment_jobs; each finished chunk of points is written to
+grid_assessment_job_points in the same transaction as the job's progress counters. A local
+thread pool runs the jobs. On startup, jobs interrupted by a restart are requeued, and the pool
+polls for queued jobs every GRID_JOB_POLL_SECONDS (claimed with FOR UPDATE SKIP LOCKED), so jobs
+created by other API processes are picked up too. Jobs resume from the points already stored.
+
+Only one API process should run the pool: start extra workers with GRID_JOB_WORKERS=0. A
+per-request API key only lives in the memory of the process that received it; the job stores a
+fingerprint of it, and fails with an error (resume it with the key) where the key is unavailable.
+"""
+
+import hashlib
+import os
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Dict, Optional, Set
+
+from dotenv import load_dotenv
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from database import SessionLocal
+from grid_pipeline import generate_grid_points, run_grid_pipeline, estimate_grid_seconds, remember_stored_weather
+from models import GridAssessmentJob, GridAssessmentJobPoint
+
+load_dotenv()
+
+GRID_JOB_WORKERS = int(os.getenv("GRID_JOB_WORKERS", "2"))
+GRID_JOB_CHUNK_SIZE = int(os.getenv("GRID_JOB_CHUNK_SIZE", "25"))  # points committed per progress update
+GRID_JOB_POLL_SECONDS = float(os.getenv("GRID_JOB_POLL_SECONDS", "5"))  # how often the pool looks for queued jobs
+
+JOB_ACTIVE_STATUSES = ("queued", "running")
+JOB_COUNTERS = (
+    "points_with_weather", "points_with_flood_risk", "points_with_landslide_risk",
+    "points_with_ai_assessment", "points_with_rule_assessment", "errors",
+)
+
+
+def api_key_fingerprint(api_key: Optional[str]) -> Optional[str]:
+    """Short hash identifying an API key without storing it"""
+    return hashlib.sha256(api_key.encode()).hexdigest()[:16] if api_key else None
+
+
+def create_job(db: Session, min_lat: float, max_lat: float, min_lng: float, max_lng: float,
+               grid_spacing: float, total_points: int, api_key: Optional[str] = None) -> GridAssessmentJob:
+    """Insert a queued job (api_key: per-request key, recorded by fingerprint only)"""
+    job = GridAssessmentJob(
+        id=str(uuid.uuid4()),
+        status="queued",
+        min_lat=min_lat,
+        max_lat=max_lat,
+        min_lng=min_lng,
+        max_lng=max_lng,
+        grid_spacing=grid_spacing,
+        total_points=total_points,
+        points_processed=0,
+        cancel_requested=False,
+        api_key_fingerprint=api_key_fingerprint(api_key),
+    )
+    db.add(job)
+    db.commit()
+    return job
+
+
+def _eta_seconds(job: GridAssessmentJob) -> Optional[float]:
+    """Remaining time from this run's throughput, or the configured-rate estimate before the first chunk"""
+    remaining = job.total_points - job.points_processed
+    if job.status not in JOB_ACTIVE_STATUSES:
+        return None
+    done_this_run = job.points_processed - (job.run_start_points or 0)
+    if job.status == "running" and job.started_at and done_this_run > 0:
+        elapsed = (datetime.now(timezone.utc) - job.started_at).total_seconds()
+        return round(elapsed / done_this_run * remaining, 1)
+    return estimate_grid_seconds(remaining)
+
+
+def job_summary(job: GridAssessmentJob) -> Dict:
+    """Job status, counters, progress and ETA"""
+    return {
+        "job_id": job.id,
+        "status": job.status,
+        "bounds": {
+            "min_lat": job.min_lat,
+            "max_lat": job.max_lat,
+            "min_lng": job.min_lng,
+            "max_lng": job.max_lng,
+        },
+        "grid_spacing": job.grid_spacing,
+        "grid_points": job.total_points,
+        "points_processed": job.points_processed,
+        **{counter: getattr(job, counter) for counter in JOB_COUNTERS},
+        "progress_percent": round(100.0 * job.points_processed / job.total_points, 1) if job.total_points else 100.0,
+        "eta_seconds": _eta_seconds(job),
+        "cancel_requested": job.cancel_requested,
+        "error": job.error,
+        "created_at": job.created_at.isoformat() if job.created_at else None,
+        "started_at": job.started_at.isoformat() if job.started_at else None,
+        "finished_at": job.finished_at.isoformat() if job.finished_at else None,
+    }
+
+
+def get_job_results(db: Session, job_id: str, since: int = -1, limit: int = 500) -> Dict:
+    """
+    Per-point results stored after point_index `since`, for incremental polling
+
+    Returns:
+        results (ordered by point_index) and next_since to pass on the next poll
+    """
+    rows = (
+        db.query(GridAssessmentJobPoint)
+        .filter(GridAssessmentJobPoint.job_id == job_id, GridAssessmentJobPoint.point_index > since)
+        .order_by(GridAssessmentJobPoint.point_index)
+        .limit(limit)
+        .all()
+    )
+    return {
+        "results": [{"point_index": row.point_index, **row.result} for row in rows],
+        "next_since": rows[-1].point_index if rows else since,
+    }
+
+
+class GridJobRunner:
+    """Local worker pool that runs grid assessment jobs chunk by chunk"""
+
+    def __init__(self, workers: int = GRID_JOB_WORKERS, chunk_size: int = GRID_JOB_CHUNK_SIZE,
+                 poll_seconds: float = GRID_JOB_POLL_SECONDS):
+        self.workers = workers
+        self.chunk_size = max(1, chunk_size)
+        self.poll_seconds = poll_seconds
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="grid-job") if workers > 0 else None
+        self._api_keys: Dict[str, str] = {}  # per-request key overrides, kept in memory only
+        self._active: Set[str] = set()  # jobs submitted to the executor and not finished yet
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._poller: Optional[threading.Thread] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self._executor is not None
+
+    def submit(self, job_id: str, api_key: Optional[str] = None):
+        """Wake the poller for a newly queued job (a no-op here when the pool is disabled; the pool process polls for it)"""
+        if self._executor is None:
+            return
+        if api_key:
+            with self._lock:
+                self._api_keys[job_id] = api_key
+        self._start_poller()
+        self._wakeup.set()
+
+    def _start_poller(self):
+        with self._lock:
+            if self._poller is None:
+                self._poller = threading.Thread(target=self._poll, name="grid-job-poller", daemon=True)
+                self._poller.start()
+
+    def resume_pending(self) -> int:
+        """
+        Requeue jobs interrupted by a restart and start polling for queued jobs
+
+        Returns:
+            Number of interrupted jobs requeued
+        """
+        if self._executor is None:
+            return 0
+        with SessionLocal() as db:
+            requeued = db.execute(text("""
+                UPDATE grid_assessment_jobs
+                SET status = CASE WHEN cancel_requested THEN 'cancelled' ELSE 'queued' END,
+                    finished_at = CASE WHEN cancel_requested THEN now() ELSE finished_at END,
+                    updated_at = now()
+                WHERE status = 'running'
+                RETURNING status
+            """)).fetchall()
+            db.commit()
+        requeued = sum(1 for row in requeued if row.status == 'queued')
+        if requeued:
+            print(f"🔁 Resuming {requeued} interrupted grid assessment job(s)")
+        self._start_poller()
+        return requeued
+
+    def _poll(self):
+        """Claim queued jobs every poll_seconds, or sooner when woken by submit() or a finished job"""
+        while not self._stopped.is_set():
+            try:
+                self.claim_queued()
+            except Exception as e:
+                print(f"⚠️ Could not poll for queued grid assessment jobs: {e}")
+            self._wakeup.wait(self.poll_seconds)
+            self._wakeup.clear()
+
+    def claim_queued(self) -> int:
+        """Move up to one queued job per free worker to running and start them; returns the number claimed"""
+        with self._lock:
+            free = self.workers - len(self._active)
+        if free <= 0:
+            return 0
+        with SessionLocal() as db:
+            # SKIP LOCKED: concurrent claimers never take the same job or wait on each other
+            job_ids = [row.id for row in db.execute(text("""
+                UPDATE grid_assessment_jobs
+                SET status = 'running', started_at = now(), run_start_points = points_processed,
+                    updated_at = now(), error = NULL
+                WHERE id IN (
+                    SELECT id FROM grid_assessment_jobs
+                    WHERE status = 'queued' AND NOT cancel_requested
+                    ORDER BY created_at
+                    LIMIT :limit
+                    FOR UPDATE SKIP LOCKED
+                )
+                RETURNING id
+            """), {"limit": free})]
+            db.commit()
+        for job_id in job_ids:
+            print(f"📥 Claimed grid assessment job {job_id}")
+            with self._lock:
+                self._active.add(job_id)
+            self._executor.submit(self._run, job_id)
+        return len(job_ids)
+
+    def shutdown(self):
+        self._stopped.set()
+        self._wakeup.set()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+
+    def _finish(self, db: Session, job: GridAssessmentJob, status: str, error: Optional[str] = None):
+        job.status = status
+        job.error = error
+        job.finished_at = datetime.now(timezone.utc)
+        job.updated_at = job.finished_at
+        db.commit()
+
+    def _job_api_key(self, job: GridAssessmentJob, api_key: Optional[str]) -> Optional[str]:
+        """
+        The key the job was started with: GOOGLE_MAPS_API_KEY, or the per-request key held in memory
+
+        Raises:
+            ValueError: if the job's per-request key is not available in this process
+        """
+        if job.api_key_fingerprint is None:
+            return os.getenv("GOOGLE_MAPS_API_KEY")
+        for candidate in (api_key, os.getenv("GOOGLE_MAPS_API_KEY")):
+            if candidate and api_key_fingerprint(candidate) == job.api_key_fingerprint:
+                return candidate
+        raise ValueError("The API key given with this job is not available in this process "
+                         "(per-request keys are kept in memory only); resume the job with api_key")
+
+    def _run(self, job_id: str):
+        """Run a job claimed by claim_queued(), then wake the poller for the freed worker"""
+        with self._lock:
+            api_key = self._api_keys.pop(job_id, None)
+        try:
+            self._run_job(job_id, api_key)
+        finally:
+            with self._lock:
+                self._active.discard(job_id)
+            self._wakeup.set()
+
+    def _run_job(self, job_id: str, api_key: Optional[str]):
+        with SessionLocal() as db:
+            job = db.get(GridAssessmentJob, job_id)
+            if job is None:
+                return
+            try:
+                api_key = self._job_api_key(job, api_key)
+                points = generate_grid_points(job.min_lat, job.max_lat, job.min_lng, job.max_lng, job.grid_spacing)
+                done = {index for (index,) in db.query(GridAssessmentJobPoint.point_index)
+                        .filter(GridAssessmentJobPoint.job_id == job_id)}
+                pending = [index for index in range(len(points)) if index not in done]
+                print(f"🧮 Grid job {job_id}: {len(pending)} of {len(points)} points to assess")
+
+                for start in range(0, len(pending), self.chunk_size):
+                    db.refresh(job)
+                    if job.cancel_requested:
+                        self._finish(db, job, "cancelled")
+                        print(f"🛑 Grid job {job_id} cancelled after {job.points_processed} points")
+                        return
+
+                    chunk = pending[start:start + self.chunk_size]
+                    result = run_grid_pipeline([points[index] for index in chunk], api_key, db, commit=False)
+
+                    # Weather/risk rows, results and progress commit together, so a restart resumes
+                    # after the last stored chunk without storing any of its rows twice
+                    db.add_all(
+                        GridAssessmentJobPoint(
+                            job_id=job_id,
+                            point_index=index,
+                            latitude=point["latitude"],
+                            longitude=point["longitude"],
+                            result=point,
+                        )
+                        for index, point in zip(chunk, result["results"])
+                    )
+                    job.points_processed += len(chunk)
+                    for counter in JOB_COUNTERS:
+                        setattr(job, counter, getattr(job, counter) + result[counter])
+                    job.updated_at = datetime.now(timezone.utc)
+                    db.commit()
+                    remember_stored_weather(result["stored_weather"])
+
+                self._finish(db, job, "completed")
+                print(f"✅ Grid job {job_id} completed: {job.points_processed} points")
+            except Exception as e:
+                print(f"❌ Grid job {job_id} failed: {e}")
+                db.rollback()
+                self._finish(db, db.get(GridAssessmentJob, job_id), "failed", str(e))
+
+
+job_runner = GridJobRunner()
+
+
+def request_cancel(db: Session, job_id: str) -> Optional[GridAssessmentJob]:
+    """
+    Cancel a job: queued jobs stop immediately, running jobs after their current chunk
+
+    Returns:
+        The job, or None if it does not exist
+    """
+    job = db.get(GridAssessmentJob, job_id)
+    if job is None:
+        return None
+    if job.status in JOB_ACTIVE_STATUSES:
+        job.cancel_requested = True
+        if job.status == "queued":
+            job.status = "cancelled"
+            job.finished_at = datetime.now(timezone.utc)
+        job.updated_at = datetime.now(timezone.utc)
+        db.commit()
+    return job
+
+
+def resume_job(db: Session, job_id: str, api_key: Optional[str] = None) -> Optional[GridAssessmentJob]:
+    """
+    Requeue a failed or cancelled job; it continues from the points already stored
+
+    Returns:
+        The job, or None if it does not exist
+    """
+    job = db.get(GridAssessmentJob, job_id)
+    if job is None:
+        return None
+    if job.status in ("failed", "cancelled"):
+        job.status = "queued"
+        job.cancel_requested = False
+        job.error = None
+        job.finished_at = None
+        if api_key:
+            job.api_key_fingerprint = api_key_fingerprint(api_key)
+        job.updated_at = datetime.now(timezone.utc)
+        db.commit()
+        job_runner.submit(job_id, api_key)
+    return job
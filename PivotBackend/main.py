@@ -1,17 +1,19 @@
-from fastapi import FastAPI, Depends, HTTPException, BackgroundTasks
+from fastapi import FastAPI, Depends, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from sqlalchemy.orm import Session
-from sqlalchemy import inspect, text
+from sqlalchemy import inspect
 from pydantic import BaseModel
 from typing import Optional, List, Dict, Any
 import os
-import time
 from dotenv import load_dotenv
 
 from database import engine, get_db
-from models import Base, WeatherData, FloodData, LandslideData, RiskAssessmentData
-from google_weather_api import WeatherDatabaseManager
-from risk_assessment import RiskAssessmentEngine
+from models import Base, WeatherData, FloodData, LandslideData, RiskAssessmentData, GridAssessmentJob
+from weather_cache import get_weather_cache
+from grid_pipeline import generate_grid_points, run_grid_pipeline, estimate_grid_seconds
+from jobs import job_runner, create_job, job_summary, get_job_results, request_cancel, resume_job
+from subdivided_hazards import populate_stale_subdivided_tables
+from schema_version import check_schema_version, upgrade_to_head, drop_version_table
 
 # Load environment variables
 load_dotenv()
@@ -20,8 +22,9 @@ load_dotenv()
 print(f"🔍 Debug: OPENROUTER_API_KEY loaded: {'Yes' if os.getenv('OPENROUTER_API_KEY') else 'No'}")
 print(f"🔍 Debug: GOOGLE_MAPS_API_KEY loaded: {'Yes' if os.getenv('GOOGLE_MAPS_API_KEY') else 'No'}")
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
+# Schema is managed by migrations (alembic upgrade head / setup_tables.py); only verify it here
+check_schema_version()
+populate_stale_subdivided_tables()
 
 app = FastAPI(
     title="Pivot Backend",
@@ -38,6 +41,18 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.on_event("startup")
+def start_grid_jobs():
+    # Requeue jobs interrupted by the last shutdown and poll for queued ones
+    try:
+        job_runner.resume_pending()
+    except Exception as e:
+        print(f"⚠️ Could not resume grid assessment jobs: {e}")
+
+@app.on_event("shutdown")
+def stop_grid_jobs():
+    job_runner.shutdown()
+
 # Pydantic models
 class HealthResponse(BaseModel):
     status: str
@@ -97,8 +112,10 @@ class GridRiskAssessmentResponse(BaseModel):
     points_with_flood_risk: int
     points_with_landslide_risk: int
     points_with_ai_assessment: int
+    points_with_rule_assessment: int = 0
     errors: int
     estimated_time: Optional[float] = None
+    job_id: Optional[str] = None
     results: Optional[List[GridPointAssessment]] = None
 
 # Health check endpoint
@@ -184,7 +201,7 @@ async def get_table_info(db: Session = Depends(get_db)):
 async def create_tables():
     """Create all database tables"""
     try:
-        Base.metadata.create_all(bind=engine)
+        upgrade_to_head()
         
         # Verify tables were created
         inspector = inspect(engine)
@@ -204,6 +221,7 @@ async def drop_tables():
     """Drop all database tables (use with caution!)"""
     try:
         Base.metadata.drop_all(bind=engine)
+        drop_version_table()
         
         return {
             "status": "success",
@@ -219,9 +237,10 @@ async def reset_tables():
     try:
         # Drop all tables
         Base.metadata.drop_all(bind=engine)
+        drop_version_table()
         
         # Create all tables
-        Base.metadata.create_all(bind=engine)
+        upgrade_to_head()
         
         # Verify tables were recreated
         inspector = inspect(engine)
@@ -239,152 +258,6 @@ async def reset_tables():
 
 # GRID RISK ASSESSMENT FUNCTIONS
 
-def generate_grid_points(min_lat: float, max_lat: float, min_lng: float, max_lng: float, spacing: float):
-    """
-    Generate a grid of points within the specified bounds
-    """
-    points = []
-    lat = min_lat
-    while lat <= max_lat:
-        lng = min_lng
-        while lng <= max_lng:
-            points.append((lat, lng))
-            lng += spacing
-        lat += spacing
-    return points
-
-def fetch_weather_data(lat: float, lng: float, api_key: str):
-    """
-    Fetch weather data for a single point using Google Weather API
-    """
-    try:
-        # Use the local Google Weather API
-        with WeatherDatabaseManager(api_key) as weather_manager:
-            # Get weather data
-            weather_data = weather_manager.weather_api.get_weather_data(lat, lng)
-            
-            if weather_data and 'current' in weather_data:
-                current = weather_data['current']
-                return {
-                    "temperature": current["temperature"],
-                    "humidity": current["humidity"],
-                    "pressure": current["pressure"],
-                    "wind_speed": current["wind_speed"],
-                    "wind_direction": current["wind_direction"],
-                    "precipitation": current["rainfall"],
-                    "weather_condition": current["description"]
-                }
-            else:
-                print(f"Error: Invalid weather data format for ({lat}, {lng})")
-                return None
-                
-    except Exception as e:
-        print(f"Error fetching weather for ({lat}, {lng}): {e}")
-        return None
-
-def check_hazard_zones(lat: float, lng: float, db: Session):
-    """
-    Check if a point is within flood or landslide hazard zones
-    """
-    try:
-        point_geom = f"POINT({lng} {lat})"
-        
-        # Check flood zones
-        flood_query = text("""
-            SELECT risk_value 
-            FROM flood_data 
-            WHERE ST_Contains(geometry, ST_GeomFromText(:point_geom, 4326))
-            ORDER BY risk_value DESC
-            LIMIT 1
-        """)
-        
-        flood_result = db.execute(flood_query, {"point_geom": point_geom}).fetchone()
-        flood_risk = flood_result.risk_value if flood_result else None
-        
-        # Check landslide zones
-        landslide_query = text("""
-            SELECT risk_value 
-            FROM landslide_data 
-            WHERE ST_Contains(geometry, ST_GeomFromText(:point_geom, 4326))
-            ORDER BY risk_value DESC
-            LIMIT 1
-        """)
-        
-        landslide_result = db.execute(landslide_query, {"point_geom": point_geom}).fetchone()
-        landslide_risk = landslide_result.risk_value if landslide_result else None
-        
-        # Debug output
-        if flood_risk or landslide_risk:
-            print(f"  🚨 Found hazard zones for ({lat}, {lng}): flood={flood_risk}, landslide={landslide_risk}")
-        else:
-            print(f"  ✅ No hazard zones found for ({lat}, {lng})")
-        
-        return flood_risk, landslide_risk
-        
-    except Exception as e:
-        print(f"Error checking hazard zones for ({lat}, {lng}): {e}")
-        return None, None
-
-def assess_point_risk(lat: float, lng: float, weather_data: Dict, flood_risk: str, landslide_risk: str, db: Session):
-    """
-    Use AI to assess risk for a specific point
-    """
-    try:
-        risk_engine = RiskAssessmentEngine()
-        
-        # Perform AI assessment using the database session
-        assessment = risk_engine.assess_location_risk(lat, lng, db)
-        
-        return assessment
-        
-    except Exception as e:
-        print(f"Error in AI assessment for ({lat}, {lng}): {e}")
-        return None
-
-def save_risk_assessment_to_db(lat: float, lng: float, weather_data: Dict, flood_risk: str, landslide_risk: str, ai_assessment: Dict, weather_data_id: int, db: Session):
-    """
-    Save risk assessment results to database
-    """
-    try:
-        point_geom = f"POINT({lng} {lat})"
-        
-        # Extract AI assessment data
-        ai_risk_score = ai_assessment.get('risk_score')
-        ai_risk_level = ai_assessment.get('risk_level', 'unknown')
-        ai_assessment_summary = ai_assessment.get('assessment_summary', '')
-        ai_recommendations = ai_assessment.get('recommendations', '')
-        ai_factors = ai_assessment.get('contributing_factors', '')
-        
-        # Convert factors to JSON string if it's a dict
-        if isinstance(ai_factors, dict):
-            import json
-            ai_factors = json.dumps(ai_factors)
-        
-        # Create risk assessment record
-        risk_record = RiskAssessmentData(
-            location=point_geom,
-            weather_data_id=weather_data_id,
-            flood_risk=flood_risk,
-            landslide_risk=landslide_risk,
-            ai_risk_score=ai_risk_score,
-            ai_risk_level=ai_risk_level,
-            ai_assessment_summary=ai_assessment_summary,
-            ai_recommendations=ai_recommendations,
-            ai_factors=ai_factors
-        )
-        
-        db.add(risk_record)
-        db.commit()
-        
-        print(f"  💾 Saved risk assessment to database for ({lat}, {lng}) - Risk Level: {ai_risk_level}")
-        
-        return risk_record.id
-        
-    except Exception as e:
-        print(f"  ⚠️ Error saving risk assessment to database: {e}")
-        db.rollback()
-        return None
-
 def process_grid_risk_assessment(
     min_lat: float, 
     max_lat: float, 
@@ -395,110 +268,18 @@ def process_grid_risk_assessment(
     db: Session
 ):
     """
-    Process a grid of points for comprehensive risk assessment
+    Process a grid of points for comprehensive risk assessment (see grid_pipeline.py)
     """
-    # Generate grid points
     grid_points = generate_grid_points(min_lat, max_lat, min_lng, max_lng, grid_spacing)
-    total_points = len(grid_points)
-    
-    print(f"Processing risk assessment for {total_points} grid points...")
-    
-    results = []
-    points_processed = 0
-    points_with_weather = 0
-    points_with_flood_risk = 0
-    points_with_landslide_risk = 0
-    points_with_ai_assessment = 0
-    errors = 0
-    
-    for lat, lng in grid_points:
-        try:
-            point_result = GridPointAssessment(
-                latitude=lat,
-                longitude=lng
-            )
-            
-            # 1. Fetch weather data
-            weather_data = fetch_weather_data(lat, lng, api_key)
-            weather_data_id = None
-            if weather_data:
-                point_result.weather_data = weather_data
-                points_with_weather += 1
-                
-                # Save weather data to database for risk assessment
-                try:
-                    point_geom = f"POINT({lng} {lat})"
-                    weather_record = WeatherData(
-                        location=point_geom,
-                        temperature=weather_data["temperature"],
-                        humidity=weather_data["humidity"],
-                        pressure=weather_data["pressure"],
-                        wind_speed=weather_data["wind_speed"],
-                        wind_direction=weather_data["wind_direction"],
-                        precipitation=weather_data["precipitation"],
-                        weather_condition=weather_data["weather_condition"]
-                    )
-                    db.add(weather_record)
-                    db.commit()
-                    weather_data_id = weather_record.id
-                    print(f"  💾 Saved weather data to database for ({lat}, {lng})")
-                except Exception as e:
-                    print(f"  ⚠️ Error saving weather data to database: {e}")
-                    db.rollback()
-            
-            # 2. Check hazard zones
-            flood_risk, landslide_risk = check_hazard_zones(lat, lng, db)
-            if flood_risk:
-                point_result.flood_risk = flood_risk
-                points_with_flood_risk += 1
-            if landslide_risk:
-                point_result.landslide_risk = landslide_risk
-                points_with_landslide_risk += 1
-            
-            # 3. AI risk assessment (only if we have some data)
-            if weather_data or flood_risk or landslide_risk:
-                ai_assessment = assess_point_risk(lat, lng, weather_data, flood_risk, landslide_risk, db)
-                if ai_assessment:
-                    point_result.ai_assessment = ai_assessment
-                    points_with_ai_assessment += 1
-                    
-                    # Save risk assessment to database
-                    save_risk_assessment_to_db(
-                        lat, lng, weather_data, flood_risk, landslide_risk, 
-                        ai_assessment, weather_data_id, db
-                    )
-            
-            results.append(point_result)
-            points_processed += 1
-            
-            # Rate limiting
-            time.sleep(0.5)  # Wait 0.5 seconds between requests
-            
-        except Exception as e:
-            print(f"Error processing point ({lat}, {lng}): {e}")
-            point_result.error = str(e)
-            results.append(point_result)
-            errors += 1
-            points_processed += 1
-            continue
-    
-    return {
-        "grid_points": total_points,
-        "points_processed": points_processed,
-        "points_with_weather": points_with_weather,
-        "points_with_flood_risk": points_with_flood_risk,
-        "points_with_landslide_risk": points_with_landslide_risk,
-        "points_with_ai_assessment": points_with_ai_assessment,
-        "errors": errors,
-        "results": results
-    }
+    result = run_grid_pipeline(grid_points, api_key, db)
+    result["results"] = [GridPointAssessment(**point) for point in result["results"]]
+    return result
 
 
 # Grid Risk Assessment Endpoint
 @app.post("/api/grid-risk-assessment", response_model=GridRiskAssessmentResponse)
 async def create_grid_risk_assessment(
     request: GridRiskAssessmentRequest,
-    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db)
 ):
     """
@@ -534,34 +315,28 @@ async def create_grid_risk_assessment(
         )
         total_points = len(grid_points)
         
-        # Estimate time (0.5 seconds per point due to rate limiting)
-        estimated_time = total_points * 0.5  # seconds
+        # Estimate time from the per-stage rate limits (the LLM budget dominates)
+        estimated_time = estimate_grid_seconds(total_points)
         
-        # For large grids, run in background
+        # For large grids, run as a background job (poll /api/grid-risk-assessment/jobs/{job_id})
         if total_points > 20:
-            # Start background task
-            background_tasks.add_task(
-                process_grid_risk_assessment,
-                min_lat,
-                max_lat,
-                min_lng,
-                max_lng,
-                request.grid_spacing,
-                api_key,
-                db
-            )
+            job = create_job(db, min_lat, max_lat, min_lng, max_lng, request.grid_spacing, total_points,
+                             api_key=request.api_key)
+            job_runner.submit(job.id, request.api_key)
             
             return GridRiskAssessmentResponse(
                 status="started",
-                message=f"Grid risk assessment started in background. Processing {total_points} points.",
+                message=f"Grid risk assessment job {job.id} queued. Processing {total_points} points.",
                 grid_points=total_points,
                 points_processed=0,
                 points_with_weather=0,
                 points_with_flood_risk=0,
                 points_with_landslide_risk=0,
                 points_with_ai_assessment=0,
+                points_with_rule_assessment=0,
                 errors=0,
-                estimated_time=estimated_time
+                estimated_time=estimated_time,
+                job_id=job.id
             )
         else:
             # For small grids, process immediately
@@ -584,6 +359,7 @@ async def create_grid_risk_assessment(
                 points_with_flood_risk=result['points_with_flood_risk'],
                 points_with_landslide_risk=result['points_with_landslide_risk'],
                 points_with_ai_assessment=result['points_with_ai_assessment'],
+                points_with_rule_assessment=result['points_with_rule_assessment'],
                 errors=result['errors'],
                 estimated_time=estimated_time,
                 results=result['results']
@@ -617,6 +393,7 @@ async def get_grid_risk_assessment_status(db: Session = Depends(get_db)):
                     "location": assessment.location,
                     "ai_risk_level": assessment.ai_risk_level,
                     "ai_risk_score": assessment.ai_risk_score,
+                    "assessment_method": assessment.assessment_method,
                     "timestamp": assessment.timestamp.isoformat() if assessment.timestamp else None
                 }
                 for assessment in recent_assessments
@@ -627,6 +404,58 @@ async def get_grid_risk_assessment_status(db: Session = Depends(get_db)):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error getting grid risk assessment status: {str(e)}")
 
+@app.get("/api/grid-risk-assessment/jobs")
+async def list_grid_risk_assessment_jobs(
+    status: Optional[str] = None,
+    limit: int = 20,
+    db: Session = Depends(get_db)
+):
+    """
+    List recent grid assessment jobs, newest first
+    """
+    query = db.query(GridAssessmentJob)
+    if status:
+        query = query.filter(GridAssessmentJob.status == status)
+    jobs = query.order_by(GridAssessmentJob.created_at.desc()).limit(min(limit, 100)).all()
+    return {"jobs": [job_summary(job) for job in jobs], "count": len(jobs)}
+
+@app.get("/api/grid-risk-assessment/jobs/{job_id}")
+async def get_grid_risk_assessment_job(
+    job_id: str,
+    since: int = -1,
+    limit: int = 500,
+    db: Session = Depends(get_db)
+):
+    """
+    Job progress, ETA and the point results stored after point index `since`
+    
+    Poll with the returned next_since to receive only new results.
+    """
+    job = db.get(GridAssessmentJob, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Grid assessment job {job_id} not found")
+    return {**job_summary(job), **get_job_results(db, job_id, since, min(limit, 5000))}
+
+@app.post("/api/grid-risk-assessment/jobs/{job_id}/cancel")
+async def cancel_grid_risk_assessment_job(job_id: str, db: Session = Depends(get_db)):
+    """
+    Cancel a job; a running job stops after its current chunk and keeps its stored results
+    """
+    job = request_cancel(db, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Grid assessment job {job_id} not found")
+    return job_summary(job)
+
+@app.post("/api/grid-risk-assessment/jobs/{job_id}/resume")
+async def resume_grid_risk_assessment_job(job_id: str, api_key: Optional[str] = None, db: Session = Depends(get_db)):
+    """
+    Requeue a failed or cancelled job; points already stored are not assessed again
+    """
+    job = resume_job(db, job_id, api_key)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Grid assessment job {job_id} not found")
+    return job_summary(job)
+
 @app.get("/api/risk-assessments")
 async def get_risk_assessments(
     limit: int = 100,
@@ -666,6 +495,7 @@ async def get_risk_assessments(
                     "ai_assessment_summary": assessment.ai_assessment_summary,
                     "ai_recommendations": assessment.ai_recommendations,
                     "ai_factors": assessment.ai_factors,
+                    "assessment_method": assessment.assessment_method,
                     "timestamp": assessment.timestamp.isoformat() if assessment.timestamp else None
                 }
                 for assessment in assessments
@@ -685,6 +515,14 @@ async def get_env_info():
         "environment": os.getenv("ENVIRONMENT", "development")
     }
 
+# Weather cache metrics
+@app.get("/api/weather-cache/stats")
+async def get_weather_cache_stats():
+    cache = get_weather_cache()
+    if cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **cache.stats()}
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -0,0 +1,94 @@
+"""
+Helpers for online-safe migrations
+Used from migrations/versions/*.py. Index builds and backfills run outside the migration's
+transaction so they never hold locks on hot tables for longer than one small batch.
+"""
+
+import time
+from typing import Optional
+
+from alembic import op
+from sqlalchemy import text
+
+
+def index_exists(name: str, valid_only: bool = True) -> bool:
+    """True if an index with this name exists in the current schema (and is valid)"""
+    row = op.get_bind().execute(text("""
+        SELECT i.indisvalid
+        FROM pg_index i
+        JOIN pg_class c ON c.oid = i.indexrelid
+        JOIN pg_namespace n ON n.oid = c.relnamespace
+        WHERE n.nspname = current_schema() AND c.relname = :name
+    """), {"name": name}).fetchone()
+    if row is None:
+        return False
+    return bool(row[0]) or not valid_only
+
+
+def create_index_concurrently(name: str, table: str, expression: str, using: Optional[str] = None,
+                              unique: bool = False, where: Optional[str] = None):
+    """
+    CREATE INDEX CONCURRENTLY IF NOT EXISTS, dropping a leftover INVALID index first
+
+    Args:
+        name: Index name
+        table: Table name
+        expression: Column list / expression inside the parentheses, e.g. "station_name, recorded_at DESC"
+        using: Index method (gist, brin, ...); btree if omitted
+        unique: Create a UNIQUE index
+        where: Optional partial-index predicate
+    """
+    with op.get_context().autocommit_block():
+        if index_exists(name, valid_only=False) and not index_exists(name):
+            print(f"🔧 Dropping invalid index {name} before rebuilding")
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+
+        unique_sql = "UNIQUE " if unique else ""
+        using_sql = f" USING {using}" if using else ""
+        where_sql = f" WHERE {where}" if where else ""
+        op.execute(
+            f"CREATE {unique_sql}INDEX CONCURRENTLY IF NOT EXISTS {name} "
+            f"ON {table}{using_sql} ({expression}){where_sql}"
+        )
+
+
+def drop_index_concurrently(name: str):
+    """DROP INDEX CONCURRENTLY IF EXISTS"""
+    with op.get_context().autocommit_block():
+        op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+
+
+def batched_backfill(table: str, set_clause: str, where_clause: str, batch_size: int = 5000,
+                     pause_seconds: float = 0.0, key_column: str = "id") -> int:
+    """
+    Run UPDATE <table> SET <set_clause> WHERE <where_clause> in small committed batches
+
+    Each batch locks at most batch_size rows, so concurrent inserts and reads on the table keep
+    flowing. where_clause must stop matching a row once it has been updated, otherwise the loop
+    never finishes.
+
+    Returns:
+        Total rows updated
+    """
+    total = 0
+    with op.get_context().autocommit_block():
+        bind = op.get_bind()
+        while True:
+            result = bind.execute(text(f"""
+                UPDATE {table} SET {set_clause}
+                WHERE {key_column} IN (
+                    SELECT {key_column} FROM {table}
+                    WHERE {where_clause}
+                    LIMIT :batch_size
+                    FOR UPDATE SKIP LOCKED
+                )
+            """), {"batch_size": batch_size})
+            updated = result.rowcount or 0
+            total += updated
+            if updated == 0:
+                break
+            print(f"  🔄 Backfilled {total} rows in {table}...")
+            if pause_seconds:
+                time.sleep(pause_seconds)
+    return total
+
@@ -0,0 +1,89 @@
+"""Baseline schema
+
+Creates the tables from models.py when they are missing, so the revision can be applied both to an
+empty pivot_db and to one previously built by create_all / setup_tables.py.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+import geoalchemy2
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def _has_table(name):
+    return sa.inspect(op.get_bind()).has_table(name)
+
+
+def _geometry(geometry_type):
+    # Spatial GiST indexes are created explicitly (and concurrently) in 0002
+    return geoalchemy2.Geometry(geometry_type, srid=4326, spatial_index=False)
+
+
+def upgrade():
+    op.execute("CREATE EXTENSION IF NOT EXISTS postgis")
+
+    if not _has_table("weather_data"):
+        op.create_table(
+            "weather_data",
+            sa.Column("id", sa.Integer, primary_key=True),
+            sa.Column("location", _geometry("POINT"), nullable=False),
+            sa.Column("temperature", sa.Float),
+            sa.Column("humidity", sa.Float),
+            sa.Column("pressure", sa.Float),
+            sa.Column("wind_speed", sa.Float),
+            sa.Column("wind_direction", sa.Float),
+            sa.Column("precipitation", sa.Float),
+            sa.Column("weather_condition", sa.String(100)),
+            sa.Column("timestamp", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        )
+
+    for table in ("flood_data", "landslide_data"):
+        if not _has_table(table):
+            op.create_table(
+                table,
+                sa.Column("id", sa.Integer, primary_key=True),
+                sa.Column("geometry", _geometry("MULTIPOLYGON"), nullable=False),
+                sa.Column("risk_value", sa.String(50)),
+                sa.Column("timestamp", sa.DateTime(timezone=True), server_default=sa.func.now()),
+            )
+
+    for table in ("flood_data_subdivided", "landslide_data_subdivided"):
+        if not _has_table(table):
+            op.create_table(
+                table,
+                sa.Column("id", sa.Integer, primary_key=True),
+                sa.Column("source_id", sa.Integer, nullable=False),
+                sa.Column("geometry", _geometry("POLYGON"), nullable=False),
+                sa.Column("risk_value", sa.String(50)),
+            )
+
+    if not _has_table("risk_assessment_data"):
+        op.create_table(
+            "risk_assessment_data",
+            sa.Column("id", sa.Integer, primary_key=True),
+            sa.Column("location", _geometry("POINT"), nullable=False),
+            sa.Column("weather_data_id", sa.Integer, nullable=True),
+            sa.Column("flood_risk", sa.String(50), nullable=True),
+            sa.Column("landslide_risk", sa.String(50), nullable=True),
+            sa.Column("ai_risk_score", sa.Integer, nullable=True),
+            sa.Column("ai_risk_level", sa.String(50), nullable=True),
+            sa.Column("ai_assessment_summary", sa.Text, nullable=True),
+            sa.Column("ai_recommendations", sa.Text, nullable=True),
+            sa.Column("ai_factors", sa.Text, nullable=True),
+            sa.Column("timestamp", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        )
+
+
+def downgrade():
+    for table in (
+        "risk_assessment_data", "landslide_data_subdivided", "flood_data_subdivided",
+        "landslide_data", "flood_data", "weather_data",
+    ):
+        op.execute(f"DROP TABLE IF EXISTS {table}")
@@ -0,0 +1,43 @@
+"""Spatial and lookup indexes
+
+Builds the indexes declared on the models with CREATE INDEX CONCURRENTLY so the migration can run
+while grid assessments are writing.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19
+"""
+from migration_utils import create_index_concurrently, drop_index_concurrently
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+# (name, table, expression, using)
+INDEXES = [
+    ("idx_weather_data_location", "weather_data", "location", "gist"),
+    ("idx_flood_data_geometry", "flood_data", "geometry", "gist"),
+    ("idx_landslide_data_geometry", "landslide_data", "geometry", "gist"),
+    ("idx_flood_data_subdivided_geometry", "flood_data_subdivided", "geometry", "gist"),
+    ("idx_landslide_data_subdivided_geometry", "landslide_data_subdivided", "geometry", "gist"),
+    ("idx_risk_assessment_data_location", "risk_assessment_data", "location", "gist"),
+    ("ix_weather_data_id", "weather_data", "id", None),
+    ("ix_flood_data_id", "flood_data", "id", None),
+    ("ix_landslide_data_id", "landslide_data", "id", None),
+    ("ix_flood_data_subdivided_id", "flood_data_subdivided", "id", None),
+    ("ix_landslide_data_subdivided_id", "landslide_data_subdivided", "id", None),
+    ("ix_flood_data_subdivided_source_id", "flood_data_subdivided", "source_id", None),
+    ("ix_landslide_data_subdivided_source_id", "landslide_data_subdivided", "source_id", None),
+    ("ix_risk_assessment_data_id", "risk_assessment_data", "id", None),
+]
+
+
+def upgrade():
+    for name, table, expression, using in INDEXES:
+        create_index_concurrently(name, table, expression, using=using)
+
+
+def downgrade():
+    for name, _, _, _ in reversed(INDEXES):
+        drop_index_concurrently(name)
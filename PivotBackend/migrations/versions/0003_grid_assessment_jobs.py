@@ -0,0 +1,62 @@
+"""Grid assessment jobs
+
+Durable job and per-point result tables for background grid risk assessments (see jobs.py), so
+jobs survive restarts and resume from the last completed chunk.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from migration_utils import create_index_concurrently, drop_index_concurrently
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "grid_assessment_jobs",
+        sa.Column("id", sa.String(36), primary_key=True),
+        sa.Column("status", sa.String(20), nullable=False, server_default="queued"),
+        sa.Column("min_lat", sa.Float, nullable=False),
+        sa.Column("max_lat", sa.Float, nullable=False),
+        sa.Column("min_lng", sa.Float, nullable=False),
+        sa.Column("max_lng", sa.Float, nullable=False),
+        sa.Column("grid_spacing", sa.Float, nullable=False),
+        sa.Column("total_points", sa.Integer, nullable=False),
+        sa.Column("points_processed", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("points_with_weather", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("points_with_flood_risk", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("points_with_landslide_risk", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("points_with_ai_assessment", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("errors", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("run_start_points", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("cancel_requested", sa.Boolean, nullable=False, server_default=sa.false()),
+        sa.Column("error", sa.Text, nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("started_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("finished_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    op.create_table(
+        "grid_assessment_job_points",
+        sa.Column("job_id", sa.String(36), sa.ForeignKey("grid_assessment_jobs.id", ondelete="CASCADE"),
+                  primary_key=True),
+        sa.Column("point_index", sa.Integer, primary_key=True),
+        sa.Column("latitude", sa.Float, nullable=False),
+        sa.Column("longitude", sa.Float, nullable=False),
+        sa.Column("result", sa.JSON, nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    create_index_concurrently("ix_grid_assessment_jobs_status", "grid_assessment_jobs", "status")
+
+
+def downgrade():
+    drop_index_concurrently("ix_grid_assessment_jobs_status")
+    op.drop_table("grid_assessment_job_points")
+    op.drop_table("grid_assessment_jobs")
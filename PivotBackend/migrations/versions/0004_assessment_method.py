@@ -0,0 +1,28 @@
+"""Assessment method
+
+Records whether each risk assessment came from the LLM or the rule-based scorer (risk_scoring.py),
+and counts rule-settled points on grid jobs separately from LLM-assessed ones.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Nullable / constant-default columns: metadata-only changes, no table rewrite
+    op.add_column("risk_assessment_data", sa.Column("assessment_method", sa.String(20), nullable=True))
+    op.add_column("grid_assessment_jobs",
+                  sa.Column("points_with_rule_assessment", sa.Integer, nullable=False, server_default="0"))
+
+
+def downgrade():
+    op.drop_column("grid_assessment_jobs", "points_with_rule_assessment")
+    op.drop_column("risk_assessment_data", "assessment_method")
@@ -0,0 +1,25 @@
+"""Grid job API key fingerprint
+
+Records which API key a grid job was started with (a hash, never the key), so a job resumed without
+its per-request key fails instead of silently switching to GOOGLE_MAPS_API_KEY.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Nullable column: metadata-only change, no table rewrite
+    op.add_column("grid_assessment_jobs", sa.Column("api_key_fingerprint", sa.String(16), nullable=True))
+
+
+def downgrade():
+    op.drop_column("grid_assessment_jobs", "api_key_fingerprint")
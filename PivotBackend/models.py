@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, Text
+from sqlalchemy import Column, Integer, String, Float, DateTime, Text, Boolean, JSON, ForeignKey
 from sqlalchemy.sql import func
 from geoalchemy2 import Geometry
 from database import Base
@@ -33,6 +33,22 @@ class LandslideData(Base):
     risk_value = Column(String(50))
     timestamp = Column(DateTime(timezone=True), server_default=func.now())
 
+class FloodDataSubdivided(Base):
+    __tablename__ = "flood_data_subdivided"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    source_id = Column(Integer, nullable=False, index=True)  # flood_data.id
+    geometry = Column(Geometry('POLYGON', srid=4326), nullable=False)
+    risk_value = Column(String(50))
+
+class LandslideDataSubdivided(Base):
+    __tablename__ = "landslide_data_subdivided"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    source_id = Column(Integer, nullable=False, index=True)  # landslide_data.id
+    geometry = Column(Geometry('POLYGON', srid=4326), nullable=False)
+    risk_value = Column(String(50))
+
 class RiskAssessmentData(Base):
     __tablename__ = "risk_assessment_data"
     
@@ -46,4 +62,42 @@ class RiskAssessmentData(Base):
     ai_assessment_summary = Column(Text, nullable=True)
     ai_recommendations = Column(Text, nullable=True)
     ai_factors = Column(Text, nullable=True)  # JSON string of contributing factors
+    assessment_method = Column(String(20), nullable=True)  # llm or rules (risk_scoring.py); NULL on older rows
     timestamp = Column(DateTime(timezone=True), server_default=func.now())
+
+class GridAssessmentJob(Base):
+    __tablename__ = "grid_assessment_jobs"
+    
+    id = Column(String(36), primary_key=True)  # uuid4
+    status = Column(String(20), nullable=False, default="queued", index=True)  # queued, running, completed, failed, cancelled
+    min_lat = Column(Float, nullable=False)
+    max_lat = Column(Float, nullable=False)
+    min_lng = Column(Float, nullable=False)
+    max_lng = Column(Float, nullable=False)
+    grid_spacing = Column(Float, nullable=False)
+    total_points = Column(Integer, nullable=False)
+    points_processed = Column(Integer, nullable=False, default=0)
+    points_with_weather = Column(Integer, nullable=False, default=0)
+    points_with_flood_risk = Column(Integer, nullable=False, default=0)
+    points_with_landslide_risk = Column(Integer, nullable=False, default=0)
+    points_with_ai_assessment = Column(Integer, nullable=False, default=0)  # assessed by the LLM
+    points_with_rule_assessment = Column(Integer, nullable=False, default=0)  # settled by risk_scoring.py
+    errors = Column(Integer, nullable=False, default=0)
+    run_start_points = Column(Integer, nullable=False, default=0)  # points_processed when the current run began (for ETA)
+    cancel_requested = Column(Boolean, nullable=False, default=False)
+    api_key_fingerprint = Column(String(16), nullable=True)  # sha256 prefix of a per-request API key; NULL = GOOGLE_MAPS_API_KEY
+    error = Column(Text, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now())
+
+class GridAssessmentJobPoint(Base):
+    __tablename__ = "grid_assessment_job_points"
+    
+    job_id = Column(String(36), ForeignKey("grid_assessment_jobs.id", ondelete="CASCADE"), primary_key=True)
+    point_index = Column(Integer, primary_key=True)  # position in generate_grid_points() order
+    latitude = Column(Float, nullable=False)
+    longitude = Column(Float, nullable=False)
+    result = Column(JSON, nullable=False)  # GridPointAssessment fields
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
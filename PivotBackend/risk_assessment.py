@@ -13,8 +13,108 @@ from sqlalchemy.orm import Session
 from sqlalchemy import text
 from dotenv import load_dotenv
 
+from hazard_raster import lookup_hazard_risk
+from risk_scoring import rule_based_assessments
+from subdivided_hazards import hazard_lookup_table
+
 load_dotenv()
 
+RISK_SEVERITY = {'1': 'low', '2': 'medium', '3': 'high'}
+RISK_LEVELS = ('low', 'medium', 'high', 'critical')
+
+RISK_SCORE_GUIDELINES = """Risk Score Guidelines:
+- 0-20: Very low risk
+- 21-40: Low risk
+- 41-60: Medium risk
+- 61-80: High risk
+- 81-100: Critical risk
+
+Consider factors like:
+- Heavy rainfall + flood zones = increased flood risk
+- High humidity + landslide zones = increased landslide risk
+- Wind conditions affecting debris flow
+- Temperature affecting soil stability
+- Pressure changes indicating weather system changes
+"""
+
+# Output tokens budgeted per point in a batched prompt (one compact JSON object each)
+BATCH_TOKENS_PER_POINT = 120
+
+# Subdivided pieces carry their source zone's id and risk_value, so the join never touches the
+# original (large) polygons; {table}/{id_column} fall back to the source table while the subdivided
+# one is behind (subdivided_hazards.hazard_lookup_table). DISTINCT because a point on an internal
+# cut line hits two pieces.
+HAZARD_BATCH_QUERY = """
+    SELECT DISTINCT p.idx, s.{id_column} AS id, s.risk_value
+    FROM unnest(CAST(:idx AS integer[]), CAST(:lats AS float8[]), CAST(:lngs AS float8[])) AS p(idx, lat, lng)
+    JOIN {table} s ON ST_Intersects(s.geometry, ST_SetSRID(ST_MakePoint(p.lng, p.lat), 4326))
+"""
+
+
+def _empty_hazard_zones() -> Dict:
+    return {
+        "flood_zones": [],
+        "landslide_zones": [],
+        "total_flood_zones": 0,
+        "total_landslide_zones": 0,
+        "flood_risk": None,
+        "landslide_risk": None
+    }
+
+
+def get_hazard_zones_batch(db: Session, points: List[Tuple[float, float]]) -> List[Dict]:
+    """
+    Hazard zones for many points with one spatial join per layer (two queries in total)
+    
+    Points the hazard raster places outside every zone of a layer (hazard_raster.py) are left out
+    of that layer's join; raster misses and points inside zones still run it, since the zone ids
+    and severities come from the table.
+    
+    Args:
+        db: Database session
+        points: (lat, lng) pairs
+        
+    Returns:
+        One dict per point, in input order: flood_zones / landslide_zones (id, risk_value,
+        severity), their totals, and flood_risk / landslide_risk (max risk_value, or None)
+    """
+    results = [_empty_hazard_zones() for _ in points]
+    if not points:
+        return results
+    
+    try:
+        for layer in ("flood", "landslide"):
+            candidates = [i for i, (lat, lng) in enumerate(points) if lookup_hazard_risk(layer, lat, lng) is not None]
+            if not candidates:
+                continue
+            params = {
+                "idx": candidates,
+                "lats": [points[i][0] for i in candidates],
+                "lngs": [points[i][1] for i in candidates],
+            }
+            table, id_column = hazard_lookup_table(db, layer)
+            query = HAZARD_BATCH_QUERY.format(table=table, id_column=id_column)
+            rows = db.execute(text(query), params).fetchall()
+            for row in sorted(rows, key=lambda r: r.id):
+                results[row.idx][f"{layer}_zones"].append({
+                    "id": row.id,
+                    "risk_value": row.risk_value,
+                    "severity": RISK_SEVERITY.get(row.risk_value, 'unknown')
+                })
+    except Exception as e:
+        print(f"Error getting hazard zones for {len(points)} points: {e}")
+        db.rollback()
+        return [_empty_hazard_zones() for _ in points]
+    
+    for zones in results:
+        for layer in ("flood", "landslide"):
+            layer_zones = zones[f"{layer}_zones"]
+            zones[f"total_{layer}_zones"] = len(layer_zones)
+            risk_values = [zone["risk_value"] for zone in layer_zones if zone["risk_value"]]
+            zones[f"{layer}_risk"] = max(risk_values) if risk_values else None
+    return results
+
+
 class RiskAssessmentEngine:
     def __init__(self, openrouter_api_key: Optional[str] = None):
         """
@@ -79,70 +179,7 @@ class RiskAssessmentEngine:
         """
         Get hazard zones (flood and landslide) for a location
         """
-        try:
-            point_geom = f"POINT({lng} {lat})"
-            
-            # Check flood zones
-            flood_query = text("""
-                SELECT id, risk_value, 
-                       CASE 
-                           WHEN risk_value = '1' THEN 'low'
-                           WHEN risk_value = '2' THEN 'medium'
-                           WHEN risk_value = '3' THEN 'high'
-                           ELSE 'unknown'
-                       END as severity
-                FROM flood_data 
-                WHERE ST_Contains(geometry, ST_GeomFromText(:point_geom, 4326))
-            """)
-            
-            flood_results = db.execute(flood_query, {"point_geom": point_geom}).fetchall()
-            flood_zones = [
-                {
-                    "id": row.id,
-                    "risk_value": row.risk_value,
-                    "severity": row.severity
-                }
-                for row in flood_results
-            ]
-            
-            # Check landslide zones
-            landslide_query = text("""
-                SELECT id, risk_value,
-                       CASE 
-                           WHEN risk_value = '1' THEN 'low'
-                           WHEN risk_value = '2' THEN 'medium'
-                           WHEN risk_value = '3' THEN 'high'
-                           ELSE 'unknown'
-                       END as severity
-                FROM landslide_data 
-                WHERE ST_Contains(geometry, ST_GeomFromText(:point_geom, 4326))
-            """)
-            
-            landslide_results = db.execute(landslide_query, {"point_geom": point_geom}).fetchall()
-            landslide_zones = [
-                {
-                    "id": row.id,
-                    "risk_value": row.risk_value,
-                    "severity": row.severity
-                }
-                for row in landslide_results
-            ]
-            
-            return {
-                "flood_zones": flood_zones,
-                "landslide_zones": landslide_zones,
-                "total_flood_zones": len(flood_zones),
-                "total_landslide_zones": len(landslide_zones)
-            }
-            
-        except Exception as e:
-            print(f"Error getting hazard zones: {e}")
-            return {
-                "flood_zones": [],
-                "landslide_zones": [],
-                "total_flood_zones": 0,
-                "total_landslide_zones": 0
-            }
+        return get_hazard_zones_batch(db, [(lat, lng)])[0]
     
     def create_risk_assessment_prompt(self, weather_data: Dict, hazard_zones: Dict, lat: float, lng: float) -> str:
         """
@@ -200,27 +237,14 @@ Provide your response in this exact JSON format:
     "recommendations": "<specific recommendations for this situation>"
 }}
 
-Risk Score Guidelines:
-- 0-20: Very low risk
-- 21-40: Low risk
-- 41-60: Medium risk
-- 61-80: High risk
-- 81-100: Critical risk
-
-Consider factors like:
-- Heavy rainfall + flood zones = increased flood risk
-- High humidity + landslide zones = increased landslide risk
-- Wind conditions affecting debris flow
-- Temperature affecting soil stability
-- Pressure changes indicating weather system changes
-
+{RISK_SCORE_GUIDELINES}
 Respond only with the JSON, no additional text."""
 
         return prompt
     
-    def assess_risk_with_llm(self, prompt: str) -> Optional[Dict]:
+    def _chat_completion(self, prompt: str, max_tokens: int) -> Optional[str]:
         """
-        Use OpenRouter LLM to assess risk
+        Send one prompt to OpenRouter and return the message content, or None on failure
         """
         try:
             if not self.openrouter_api_key:
@@ -241,36 +265,19 @@ Respond only with the JSON, no additional text."""
                     }
                 ],
                 "temperature": 0.3,
-                "max_tokens": 500
+                "max_tokens": max_tokens
             }
             
             response = requests.post(
                 f"{self.base_url}/chat/completions",
                 headers=headers,
                 json=payload,
-                timeout=30
+                timeout=30 + max_tokens // 50
             )
             
             if response.status_code == 200:
                 result = response.json()
-                content = result['choices'][0]['message']['content']
-                
-                # Try to parse JSON response
-                try:
-                    # Clean the response in case there's extra text
-                    content = content.strip()
-                    if content.startswith('```json'):
-                        content = content[7:]
-                    if content.endswith('```'):
-                        content = content[:-3]
-                    
-                    risk_assessment = json.loads(content)
-                    return risk_assessment
-                    
-                except json.JSONDecodeError as e:
-                    print(f"Error parsing LLM response: {e}")
-                    print(f"Raw response: {content}")
-                    return None
+                return result['choices'][0]['message']['content']
             else:
                 print(f"OpenRouter API error: {response.status_code}")
                 print(f"Response: {response.text}")
@@ -280,19 +287,199 @@ Respond only with the JSON, no additional text."""
             print(f"Error calling OpenRouter API: {e}")
             return None
     
-    def assess_location_risk(self, lat: float, lng: float, db: Session) -> Dict:
+    @staticmethod
+    def _parse_json_content(content: str):
+        """
+        Parse a JSON response, stripping Markdown code fences; raises json.JSONDecodeError
+        """
+        # Clean the response in case there's extra text
+        content = content.strip()
+        if content.startswith('```json'):
+            content = content[7:]
+        elif content.startswith('```'):
+            content = content[3:]
+        if content.endswith('```'):
+            content = content[:-3]
+        return json.loads(content)
+    
+    def assess_risk_with_llm(self, prompt: str) -> Optional[Dict]:
+        """
+        Use OpenRouter LLM to assess risk
+        """
+        content = self._chat_completion(prompt, max_tokens=500)
+        if content is None:
+            return None
+        
+        # Try to parse JSON response
+        try:
+            return self._parse_json_content(content)
+        except json.JSONDecodeError as e:
+            print(f"Error parsing LLM response: {e}")
+            print(f"Raw response: {content}")
+            return None
+    
+    def create_batch_risk_assessment_prompt(self, entries: List[Dict]) -> str:
+        """
+        Create one prompt covering several locations
+        
+        Args:
+            entries: Dicts with id, lat, lng, weather_data and hazard_zones
+        """
+        lines = []
+        for entry in entries:
+            weather = entry.get('weather_data')
+            if weather:
+                weather_info = (
+                    f"temp {weather.get('temperature', '?')}°C, humidity {weather.get('humidity', '?')}%, "
+                    f"pressure {weather.get('pressure', '?')} mb, wind {weather.get('wind_speed', '?')} km/h "
+                    f"from {weather.get('wind_direction', '?')}°, precipitation {weather.get('precipitation', '?')} mm/h, "
+                    f"{weather.get('weather_condition', 'unknown conditions')}"
+                )
+            else:
+                weather_info = "no recent weather data"
+            
+            zones = entry['hazard_zones']
+            flood_info = ', '.join(zone['severity'] for zone in zones['flood_zones']) or 'none'
+            landslide_info = ', '.join(zone['severity'] for zone in zones['landslide_zones']) or 'none'
+            lines.append(
+                f"- id {entry['id']}: ({entry['lat']:.4f}, {entry['lng']:.4f}); {weather_info}; "
+                f"flood zones: {flood_info}; landslide zones: {landslide_info}"
+            )
+        locations = "\n".join(lines)
+        
+        return f"""You are a disaster risk assessment expert analyzing {len(entries)} locations in the Philippines.
+
+Locations (weather conditions and hazard zones):
+{locations}
+
+Based on the weather conditions and hazard zone data, assess the likelihood of a disaster event occurring at each location.
+
+Provide your response as a JSON array with exactly one object per location, in this exact format:
+[
+    {{
+        "id": <location id>,
+        "risk_score": <number between 0-100>,
+        "risk_level": "<low/medium/high/critical>",
+        "description": "<one or two sentences on potential issues>",
+        "recommendations": "<one or two sentences of specific recommendations>"
+    }}
+]
+
+{RISK_SCORE_GUIDELINES}
+Respond only with the JSON array, no additional text."""
+    
+    @staticmethod
+    def _validate_assessment(item) -> Optional[Dict]:
+        """
+        Normalize one LLM assessment object, or None if it is unusable
+        """
+        if not isinstance(item, dict):
+            return None
+        try:
+            risk_score = int(round(float(item.get('risk_score'))))
+        except (TypeError, ValueError):
+            return None
+        risk_level = str(item.get('risk_level', '')).strip().lower()
+        if risk_level not in RISK_LEVELS:
+            return None
+        return {
+            "risk_score": max(0, min(100, risk_score)),
+            "risk_level": risk_level,
+            "description": str(item.get('description', '')),
+            "recommendations": str(item.get('recommendations', ''))
+        }
+    
+    def assess_risk_batch_with_llm(self, entries: List[Dict]) -> Dict[int, Dict]:
+        """
+        Assess several locations with one LLM request
+        
+        Returns:
+            Validated assessments keyed by entry id; entries the model dropped or answered
+            with invalid values are missing
+        """
+        if not entries:
+            return {}
+        prompt = self.create_batch_risk_assessment_prompt(entries)
+        content = self._chat_completion(prompt, max_tokens=200 + BATCH_TOKENS_PER_POINT * len(entries))
+        if content is None:
+            return {}
+        
+        try:
+            items = self._parse_json_content(content)
+        except json.JSONDecodeError as e:
+            print(f"Error parsing batched LLM response: {e}")
+            return {}
+        if isinstance(items, dict):
+            items = items.get('assessments', [items])
+        if not isinstance(items, list):
+            return {}
+        
+        expected = {entry['id'] for entry in entries}
+        assessments = {}
+        for item in items:
+            assessment = self._validate_assessment(item)
+            try:
+                entry_id = int(item.get('id')) if isinstance(item, dict) else None
+            except (TypeError, ValueError):
+                entry_id = None
+            if assessment and entry_id in expected and entry_id not in assessments:
+                assessments[entry_id] = assessment
+        return assessments
+    
+    def assess_locations_batch(self, points: List[Tuple[float, float]], weather: List[Optional[Dict]],
+                               hazard_zones: List[Dict]) -> Tuple[List[Dict], int]:
+        """
+        Risk assessment for several locations from precomputed inputs with one LLM request
+        
+        Points the model leaves out or answers unusably get _create_fallback_assessment().
+        
+        Returns:
+            One assess_location_risk()-shaped dict per point, in input order, and the number of
+            points the model answered (0 when the request failed or its response was unusable)
+        """
+        entries = [
+            {"id": index, "lat": lat, "lng": lng, "weather_data": weather[index], "hazard_zones": hazard_zones[index]}
+            for index, (lat, lng) in enumerate(points)
+        ]
+        assessments = self.assess_risk_batch_with_llm(entries)
+        print(f"   Batched LLM assessment: {len(assessments)}/{len(entries)} points answered")
+        
+        timestamp = datetime.now().isoformat()
+        results = []
+        for entry in entries:
+            assessment = assessments.get(entry['id'])
+            if assessment is None:
+                assessment = self._create_fallback_assessment(entry['weather_data'], entry['hazard_zones'])
+            results.append({
+                "location": {"lat": entry['lat'], "lng": entry['lng']},
+                "weather_data": entry['weather_data'],
+                "hazard_zones": entry['hazard_zones'],
+                "risk_assessment": assessment,
+                "assessment_timestamp": timestamp
+            })
+        return results, len(assessments)
+    
+    def assess_location_risk(self, lat: float, lng: float, db: Optional[Session],
+                             weather_data: Optional[Dict] = None, hazard_zones: Optional[Dict] = None) -> Dict:
         """
         Complete risk assessment for a location
+        
+        Args:
+            weather_data: Precomputed weather (skips the weather query)
+            hazard_zones: Precomputed get_hazard_zones_batch() entry (skips the hazard queries);
+                db may be None when both are given
         """
         try:
             print(f"🔍 Assessing risk for location ({lat:.4f}, {lng:.4f})...")
             
             # Get recent weather data
-            weather_data = self.get_recent_weather_data(lat, lng, db)
+            if weather_data is None and db is not None:
+                weather_data = self.get_recent_weather_data(lat, lng, db)
             print(f"   Weather data: {'Available' if weather_data else 'Not available'}")
             
             # Get hazard zones
-            hazard_zones = self.get_hazard_zones(lat, lng, db)
+            if hazard_zones is None:
+                hazard_zones = self.get_hazard_zones(lat, lng, db)
             print(f"   Hazard zones: {hazard_zones['total_flood_zones']} flood, {hazard_zones['total_landslide_zones']} landslide")
             
             # Create assessment prompt
@@ -326,51 +513,9 @@ Respond only with the JSON, no additional text."""
     
     def _create_fallback_assessment(self, weather_data: Optional[Dict], hazard_zones: Dict) -> Dict:
         """
-        Create a fallback risk assessment when LLM is unavailable
+        Create a fallback risk assessment when LLM is unavailable (rule-based, see risk_scoring.py)
         """
-        risk_score = 0
-        risk_level = "low"
-        description = "Unable to perform detailed risk assessment due to system limitations."
-        recommendations = "Monitor weather conditions and follow local emergency guidelines."
-        
-        # Basic risk calculation based on available data
-        if weather_data:
-            # High precipitation increases risk
-            if weather_data.get('precipitation', 0) > 10:
-                risk_score += 30
-                description += " High precipitation detected."
-            
-            # High humidity can affect soil stability
-            if weather_data.get('humidity', 0) > 80:
-                risk_score += 15
-                description += " High humidity conditions."
-        
-        # Hazard zones increase risk
-        if hazard_zones['total_flood_zones'] > 0:
-            risk_score += 25
-            description += f" Located in {hazard_zones['total_flood_zones']} flood risk zone(s)."
-        
-        if hazard_zones['total_landslide_zones'] > 0:
-            risk_score += 25
-            description += f" Located in {hazard_zones['total_landslide_zones']} landslide risk zone(s)."
-        
-        # Determine risk level
-        if risk_score >= 80:
-            risk_level = "critical"
-        elif risk_score >= 60:
-            risk_level = "high"
-        elif risk_score >= 40:
-            risk_level = "medium"
-        else:
-            risk_level = "low"
-        
-        return {
-            "risk_score": min(risk_score, 100),
-            "risk_level": risk_level,
-            "description": description,
-            "recommendations": recommendations
-        }
-
+        return rule_based_assessments([weather_data], [hazard_zones])[0]
 
 def main():
     """Test the risk assessment engine"""
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Deterministic rule-based risk scoring for Pivot Backend
+Scores whole grids at once with NumPy from weather (precipitation, wind, humidity) and hazard-zone
+features. The grid pipeline uses it as a fast path: only points scoring near or above a threshold
+are sent to the LLM. RiskAssessmentEngine uses the same scores when the LLM is unavailable.
+"""
+
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+# Point contributions (max per feature); the total is clipped to 0-100
+PRECIPITATION_POINTS = 30.0  # reached at PRECIPITATION_FULL mm/h
+PRECIPITATION_FULL = 20.0
+HUMIDITY_POINTS = 15.0  # ramps from HUMIDITY_START to 100 %
+HUMIDITY_START = 70.0
+WIND_POINTS = 10.0  # ramps from WIND_START to WIND_FULL km/h
+WIND_START = 30.0
+WIND_FULL = 90.0
+ZONE_POINTS = 25.0  # per hazard layer, scaled by the zone's risk value (1-3)
+INTERACTION_POINTS = 15.0  # rain on a flood zone / humidity on a landslide zone
+
+# Same cut-offs as the LLM prompt's risk levels
+LEVEL_THRESHOLDS = ((80, "critical"), (60, "high"), (40, "medium"))
+
+
+def _column(weather: Sequence[Optional[Dict]], key: str) -> np.ndarray:
+    return np.array([(w.get(key) if w else None) or 0.0 for w in weather], dtype=float)
+
+
+def _zone_level(hazard_zones: Sequence[Dict], layer: str) -> np.ndarray:
+    """Highest risk value (0 outside all zones, 1-3 inside) per point"""
+    levels = []
+    for zones in hazard_zones:
+        risk = zones.get(f"{layer}_risk")
+        try:
+            levels.append(float(risk) if risk else 0.0)
+        except ValueError:
+            levels.append(0.0)
+    return np.clip(np.array(levels, dtype=float), 0.0, 3.0)
+
+
+def score_points(weather: Sequence[Optional[Dict]], hazard_zones: Sequence[Dict]) -> Dict[str, np.ndarray]:
+    """
+    Score many points at once
+
+    Args:
+        weather: Weather dict (temperature, humidity, wind_speed, precipitation, ...) or None per point
+        hazard_zones: get_hazard_zones_batch() entry per point
+
+    Returns:
+        Arrays: score (0-100), plus the per-feature contributions and has_weather
+    """
+    has_weather = np.array([bool(w) for w in weather], dtype=bool)
+    precipitation = _column(weather, "precipitation")
+    humidity = _column(weather, "humidity")
+    wind_speed = _column(weather, "wind_speed")
+    flood = _zone_level(hazard_zones, "flood") / 3.0
+    landslide = _zone_level(hazard_zones, "landslide") / 3.0
+
+    rain_factor = np.clip(precipitation / PRECIPITATION_FULL, 0.0, 1.0)
+    humidity_factor = np.clip((humidity - HUMIDITY_START) / (100.0 - HUMIDITY_START), 0.0, 1.0)
+    wind_factor = np.clip((wind_speed - WIND_START) / (WIND_FULL - WIND_START), 0.0, 1.0)
+
+    components = {
+        "precipitation": rain_factor * PRECIPITATION_POINTS,
+        "humidity": humidity_factor * HUMIDITY_POINTS,
+        "wind": wind_factor * WIND_POINTS,
+        "flood_zone": flood * ZONE_POINTS,
+        "landslide_zone": landslide * ZONE_POINTS,
+        "interaction": np.maximum(rain_factor * flood, np.maximum(rain_factor, humidity_factor) * landslide)
+                       * INTERACTION_POINTS,
+    }
+    score = np.clip(np.rint(sum(components.values())), 0, 100)
+    return {"score": score, "has_weather": has_weather, **components}
+
+
+def risk_levels(scores: np.ndarray) -> List[str]:
+    """low / medium / high / critical per score"""
+    levels = np.full(scores.shape, "low", dtype=object)
+    for threshold, level in reversed(LEVEL_THRESHOLDS):
+        levels[scores >= threshold] = level
+    return levels.tolist()
+
+
+def needs_llm(scored: Dict[str, np.ndarray], hazard_zones: Sequence[Dict], threshold: float,
+              margin: float) -> np.ndarray:
+    """
+    Points worth an LLM assessment: score within `margin` of `threshold` or above, or inside a
+    hazard zone with no weather data (the rules can't judge the weather part)
+    """
+    in_zone = (_zone_level(hazard_zones, "flood") > 0) | (_zone_level(hazard_zones, "landslide") > 0)
+    uncertain = ~scored["has_weather"] & in_zone
+    return (scored["score"] >= threshold - margin) | uncertain
+
+
+def _describe(index: int, scored: Dict[str, np.ndarray], zones: Dict) -> str:
+    parts = []
+    if not scored["has_weather"][index]:
+        parts.append("No recent weather data.")
+    if scored["precipitation"][index] >= PRECIPITATION_POINTS / 2:
+        parts.append("Heavy precipitation detected.")
+    elif scored["precipitation"][index] > 0:
+        parts.append("Some precipitation detected.")
+    if scored["humidity"][index] >= HUMIDITY_POINTS / 2:
+        parts.append("High humidity conditions.")
+    if scored["wind"][index] > 0:
+        parts.append("Strong winds.")
+    if zones.get("total_flood_zones"):
+        parts.append(f"Located in {zones['total_flood_zones']} flood risk zone(s).")
+    if zones.get("total_landslide_zones"):
+        parts.append(f"Located in {zones['total_landslide_zones']} landslide risk zone(s).")
+    return " ".join(parts) or "No significant weather or hazard-zone risk factors."
+
+
+def rule_based_assessments(weather: Sequence[Optional[Dict]], hazard_zones: Sequence[Dict],
+                           scored: Optional[Dict[str, np.ndarray]] = None) -> List[Dict]:
+    """
+    Assessment dicts (risk_score, risk_level, description, recommendations) per point, in the same
+    shape as an LLM assessment
+    """
+    scored = scored if scored is not None else score_points(weather, hazard_zones)
+    levels = risk_levels(scored["score"])
+    assessments = []
+    for index, zones in enumerate(hazard_zones):
+        level = levels[index]
+        if level in ("high", "critical"):
+            recommendations = "Prepare to evacuate, secure go-bags and follow local emergency advisories."
+        elif level == "medium":
+            recommendations = "Monitor weather updates closely and review evacuation routes."
+        else:
+            recommendations = "Monitor weather conditions and follow local emergency guidelines."
+        assessments.append({
+            "risk_score": int(scored["score"][index]),
+            "risk_level": level,
+            "description": _describe(index, scored, zones),
+            "recommendations": recommendations,
+            "method": "rules"
+        })
+    return assessments
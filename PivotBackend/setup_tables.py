@@ -8,6 +8,7 @@ import os
 from dotenv import load_dotenv
 from database import engine
 from models import Base, WeatherData, FloodData, LandslideData
+from schema_version import upgrade_to_head, drop_version_table
 
 load_dotenv()
 
@@ -17,8 +18,8 @@ def setup_tables():
     try:
         print("Creating database tables...")
         
-        # Create all tables
-        Base.metadata.create_all(bind=engine)
+        # Create/upgrade all tables through the versioned migrations
+        upgrade_to_head()
         
         print("✅ All tables created successfully!")
         print("\nCreated tables:")
@@ -45,6 +46,7 @@ def drop_tables():
         
         # Drop all tables
         Base.metadata.drop_all(bind=engine)
+        drop_version_table()
         
         print("✅ All tables dropped successfully!")
         
@@ -59,10 +61,11 @@ def reset_tables():
         
         # Drop all tables
         Base.metadata.drop_all(bind=engine)
+        drop_version_table()
         print("✅ Tables dropped.")
         
         # Create all tables
-        Base.metadata.create_all(bind=engine)
+        upgrade_to_head()
         print("✅ Tables recreated.")
         
         print("🔄 Database reset completed!")
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Subdivided hazard tables for Pivot Backend
+Splits flood_data / landslide_data MULTIPOLYGONs with ST_Subdivide into small, indexed pieces
+so point-in-zone checks compare against tight bounding boxes instead of whole provinces.
+"""
+
+import sys
+import time
+from typing import Tuple
+from sqlalchemy import text
+
+from database import SessionLocal
+
+SUBDIVIDED_HAZARD_TABLES = {
+    "flood": ("flood_data", "flood_data_subdivided"),
+    "landslide": ("landslide_data", "landslide_data_subdivided"),
+}
+
+
+def rebuild_subdivided_table(db, layer: str, max_vertices: int = 256) -> int:
+    """
+    Rebuild <layer>_data_subdivided from the source polygons
+
+    Uses DELETE inside one transaction (not TRUNCATE) so hazard checks keep reading the
+    previous pieces until the rebuild commits.
+
+    Returns:
+        Number of pieces written
+    """
+    if layer not in SUBDIVIDED_HAZARD_TABLES:
+        raise ValueError(f"Unknown hazard layer '{layer}'. Use one of: {list(SUBDIVIDED_HAZARD_TABLES)}")
+    source_table, subdivided_table = SUBDIVIDED_HAZARD_TABLES[layer]
+
+    db.execute(text(f"DELETE FROM {subdivided_table}"))
+    result = db.execute(text(f"""
+        INSERT INTO {subdivided_table} (source_id, risk_value, geometry)
+        SELECT src.id, src.risk_value, (ST_Dump(piece.geom)).geom
+        FROM {source_table} AS src
+        CROSS JOIN LATERAL ST_Subdivide(
+            CASE WHEN ST_IsValid(src.geometry) THEN src.geometry
+                 ELSE ST_CollectionExtract(ST_MakeValid(src.geometry), 3)
+            END,
+            :max_vertices
+        ) AS piece(geom)
+    """), {"max_vertices": max_vertices})
+    db.commit()
+
+    db.execute(text(f"ANALYZE {subdivided_table}"))
+    db.commit()
+    return result.rowcount
+
+
+def hazard_lookup_table(db, layer: str) -> Tuple[str, str]:
+    """
+    (table, zone id column) that point hazard checks for a layer should read
+
+    The subdivided table unless it is behind its source table (empty after a failed rebuild, or
+    polygons imported without a refresh), then the source polygons. Both MAX lookups are
+    index-backed.
+    """
+    source_table, subdivided_table = SUBDIVIDED_HAZARD_TABLES[layer]
+    current = db.execute(text(f"""
+        SELECT COALESCE((SELECT MAX(source_id) FROM {subdivided_table}), 0)
+               >= COALESCE((SELECT MAX(id) FROM {source_table}), 0)
+    """)).scalar()
+    return (subdivided_table, "source_id") if current else (source_table, "id")
+
+
+def refresh_subdivided_table(layer: str):
+    """Rebuild a layer's subdivided table after an import, logging instead of raising on failure"""
+    db = SessionLocal()
+    try:
+        start_time = time.time()
+        pieces = rebuild_subdivided_table(db, layer)
+        print(f"✂️ Rebuilt {layer}_data_subdivided: {pieces} pieces in {time.time() - start_time:.1f}s")
+    except Exception as e:
+        db.rollback()
+        print(f"❌ Failed to rebuild {layer}_data_subdivided: {e}")
+    finally:
+        db.close()
+
+
+def populate_stale_subdivided_tables():
+    """Build subdivided tables that are empty while their source table has polygons"""
+    db = SessionLocal()
+    try:
+        for layer, (source_table, subdivided_table) in SUBDIVIDED_HAZARD_TABLES.items():
+            source_has_rows = db.execute(text(f"SELECT EXISTS (SELECT 1 FROM {source_table})")).scalar()
+            subdivided_has_rows = db.execute(text(f"SELECT EXISTS (SELECT 1 FROM {subdivided_table})")).scalar()
+            if source_has_rows and not subdivided_has_rows:
+                print(f"✂️ Subdividing {layer} polygons (first run)...")
+                pieces = rebuild_subdivided_table(db, layer)
+                print(f"✅ {subdivided_table} populated with {pieces} pieces")
+    except Exception as e:
+        db.rollback()
+        print(f"⚠️ Could not populate subdivided hazard tables: {e}")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    """Rebuild subdivided tables: python subdivided_hazards.py [flood|landslide]"""
+    for hazard_layer in ([sys.argv[1]] if len(sys.argv) > 1 else list(SUBDIVIDED_HAZARD_TABLES)):
+        refresh_subdivided_table(hazard_layer)
@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+"""
+Location-quantized cache for weather observations (Pivot Backend)
+
+Coordinates are rounded to WEATHER_CACHE_PRECISION decimal places, so nearby requests share one
+upstream call. An entry is fresh for WEATHER_CACHE_TTL seconds; for WEATHER_CACHE_STALE_TTL
+seconds after that it is still served while a background refresh runs (stale-while-revalidate).
+
+Collectors that record history only accept fresh entries. Once an observation is stored,
+mark_stored() tags its entry with the weather_data id, and later hits carry it as
+"weather_data_id" so collectors reference that row instead of inserting the observation again.
+
+The default backend is in-process memory. WEATHER_CACHE_BACKEND=sqlite stores entries in a WAL-mode
+SQLite file that every worker process on the host can share (e.g. several uvicorn workers).
+"""
+
+import copy
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Tuple
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+WEATHER_CACHE_ENABLED = os.getenv("WEATHER_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+WEATHER_CACHE_TTL = float(os.getenv("WEATHER_CACHE_TTL", "600"))  # seconds an observation is fresh
+WEATHER_CACHE_STALE_TTL = float(os.getenv("WEATHER_CACHE_STALE_TTL", "1800"))  # extra seconds served while refreshing
+WEATHER_CACHE_PRECISION = int(os.getenv("WEATHER_CACHE_PRECISION", "2"))  # decimal places (~1.1 km)
+WEATHER_CACHE_BACKEND = os.getenv("WEATHER_CACHE_BACKEND", "memory")  # memory | sqlite
+WEATHER_CACHE_PATH = os.getenv("WEATHER_CACHE_PATH", "./weather_cache.sqlite3")
+WEATHER_CACHE_MAX_ENTRIES = int(os.getenv("WEATHER_CACHE_MAX_ENTRIES", "10000"))
+
+
+class MemoryCacheBackend:
+    """Bounded in-process LRU store of (stored_at, payload)"""
+
+    def __init__(self, max_entries: int = WEATHER_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, Dict]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Tuple[float, Dict]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key: str, stored_at: float, payload: Dict):
+        payload = copy.deepcopy(payload)  # callers may mutate what they fetched
+        with self._lock:
+            self._entries[key] = (stored_at, payload)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class SQLiteCacheBackend:
+    """Shared on-disk store; WAL mode lets several processes read while one writes"""
+
+    def __init__(self, path: str = WEATHER_CACHE_PATH, max_entries: int = WEATHER_CACHE_MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self._local = threading.local()
+        with self._connection() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS weather_cache (
+                    key TEXT PRIMARY KEY,
+                    stored_at REAL NOT NULL,
+                    payload TEXT NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS ix_weather_cache_stored_at ON weather_cache (stored_at)")
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str) -> Optional[Tuple[float, Dict]]:
+        row = self._connection().execute(
+            "SELECT stored_at, payload FROM weather_cache WHERE key = ?", (key,)
+        ).fetchone()
+        return (row[0], json.loads(row[1])) if row else None
+
+    def set(self, key: str, stored_at: float, payload: Dict):
+        with self._connection() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO weather_cache (key, stored_at, payload) VALUES (?, ?, ?)",
+                (key, stored_at, json.dumps(payload)),
+            )
+            conn.execute("""
+                DELETE FROM weather_cache WHERE key IN (
+                    SELECT key FROM weather_cache ORDER BY stored_at DESC LIMIT -1 OFFSET ?
+                )
+            """, (self.max_entries,))
+
+    def __len__(self):
+        return self._connection().execute("SELECT COUNT(*) FROM weather_cache").fetchone()[0]
+
+
+class WeatherCache:
+    """Quantized-location cache with a freshness window and stale-while-revalidate"""
+
+    def __init__(self, backend=None, ttl: float = WEATHER_CACHE_TTL, stale_ttl: float = WEATHER_CACHE_STALE_TTL,
+                 precision: int = WEATHER_CACHE_PRECISION):
+        self.backend = backend or MemoryCacheBackend()
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.precision = precision
+        self._lock = threading.Lock()
+        self._key_locks: Dict[str, threading.Lock] = {}
+        self._refreshing = set()
+        self.metrics = {"hits": 0, "stale_hits": 0, "misses": 0, "refreshes": 0, "errors": 0,
+                        "served_age_total": 0.0, "served_age_max": 0.0}
+
+    def key(self, lat: float, lng: float) -> str:
+        return f"{round(lat, self.precision):.{self.precision}f},{round(lng, self.precision):.{self.precision}f}"
+
+    def _count(self, metric: str, age: Optional[float] = None):
+        with self._lock:
+            self.metrics[metric] += 1
+            if age is not None:
+                self.metrics["served_age_total"] += age
+                self.metrics["served_age_max"] = max(self.metrics["served_age_max"], age)
+
+    def _key_lock(self, key: str) -> threading.Lock:
+        with self._lock:
+            return self._key_locks.setdefault(key, threading.Lock())
+
+    def get_fresh(self, lat: float, lng: float) -> Optional[Dict]:
+        """Cached observation if it is within the freshness window, else None (no fetch)"""
+        entry = self.backend.get(self.key(lat, lng))
+        age = time.time() - entry[0] if entry is not None else None
+        if age is None or age >= self.ttl:
+            self._count("misses")
+            return None
+        self._count("hits", age)
+        return copy.deepcopy(entry[1])
+
+    def put(self, lat: float, lng: float, payload: Dict):
+        self.backend.set(self.key(lat, lng), time.time(), payload)
+
+    def mark_stored(self, lat: float, lng: float, current: Optional[Dict], weather_data_id: int):
+        """Record the weather_data row of the cached observation, if the entry still holds it"""
+        key = self.key(lat, lng)
+        with self._key_lock(key):
+            entry = self.backend.get(key)
+            if entry is not None and entry[1].get("current") == current:
+                self.backend.set(key, entry[0], {**entry[1], "weather_data_id": weather_data_id})
+
+    def _refresh(self, key: str, lat: float, lng: float, fetch: Callable[[], Optional[Dict]],
+                 should_cache: Callable[[Dict], bool]):
+        try:
+            payload = fetch()
+            if payload and should_cache(payload):
+                self.backend.set(key, time.time(), payload)
+            self._count("refreshes")
+        except Exception as e:
+            self._count("errors")
+            print(f"⚠️ Background weather refresh failed for {key}: {e}")
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    def get_or_fetch(self, lat: float, lng: float, fetch: Callable[[], Optional[Dict]],
+                     should_cache: Callable[[Dict], bool] = lambda payload: True,
+                     allow_stale: bool = True) -> Optional[Dict]:
+        """
+        Return the cached observation for (lat, lng), fetching it if needed
+
+        - fresh entry: returned as is
+        - stale entry (within stale_ttl past ttl): returned, and one background refresh is started;
+          with allow_stale=False treated as expired
+        - missing/expired: fetched synchronously; concurrent callers for the same key wait for
+          a single upstream request
+        """
+        key = self.key(lat, lng)
+        entry = self.backend.get(key)
+        now = time.time()
+
+        if entry is not None:
+            age = now - entry[0]
+            if age < self.ttl:
+                self._count("hits", age)
+                return copy.deepcopy(entry[1])
+            if allow_stale and age < self.ttl + self.stale_ttl:
+                self._count("stale_hits", age)
+                with self._lock:
+                    start_refresh = key not in self._refreshing
+                    self._refreshing.add(key)
+                if start_refresh:
+                    threading.Thread(target=self._refresh, args=(key, lat, lng, fetch, should_cache),
+                                     daemon=True).start()
+                return copy.deepcopy(entry[1])
+
+        with self._key_lock(key):
+            # Another caller may have filled the entry while we waited
+            entry = self.backend.get(key)
+            if entry is not None and time.time() - entry[0] < self.ttl:
+                self._count("hits", time.time() - entry[0])
+                return copy.deepcopy(entry[1])
+
+            self._count("misses")
+            payload = fetch()
+            if payload and should_cache(payload):
+                self.backend.set(key, time.time(), payload)
+            return payload
+
+    def stats(self) -> Dict:
+        """Hit/miss counters, hit ratio and age of served entries"""
+        with self._lock:
+            metrics = dict(self.metrics)
+        served = metrics["hits"] + metrics["stale_hits"]
+        lookups = served + metrics["misses"]
+        return {
+            "backend": type(self.backend).__name__,
+            "entries": len(self.backend),
+            "ttl_seconds": self.ttl,
+            "stale_ttl_seconds": self.stale_ttl,
+            "precision": self.precision,
+            "hits": metrics["hits"],
+            "stale_hits": metrics["stale_hits"],
+            "misses": metrics["misses"],
+            "background_refreshes": metrics["refreshes"],
+            "refresh_errors": metrics["errors"],
+            "hit_ratio": served / lookups if lookups else 0.0,
+            "avg_served_age_seconds": metrics["served_age_total"] / served if served else 0.0,
+            "max_served_age_seconds": metrics["served_age_max"],
+        }
+
+
+_cache: Optional[WeatherCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_weather_cache() -> Optional[WeatherCache]:
+    """Process-wide cache configured from the environment, or None when disabled"""
+    global _cache
+    if not WEATHER_CACHE_ENABLED:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            if WEATHER_CACHE_BACKEND == "sqlite":
+                backend = SQLiteCacheBackend(WEATHER_CACHE_PATH)
+            else:
+                backend = MemoryCacheBackend()
+            _cache = WeatherCache(backend)
+            print(f"🗃️ Weather cache: {type(backend).__name__}, ttl={WEATHER_CACHE_TTL}s, "
+                  f"stale={WEATHER_CACHE_STALE_TTL}s, precision={WEATHER_CACHE_PRECISION}")
+        return _cache
+
+
+def mark_weather_stored(weather_data: Dict, weather_data_id: int):
+    """Tag the cache entry of a GoogleWeatherAPI observation with the weather_data row it was stored as"""
+    cache = get_weather_cache()
+    location = weather_data.get("location", {})
+    if cache is not None and location.get("lat") is not None and location.get("lng") is not None:
+        cache.mark_stored(location["lat"], location["lng"], weather_data.get("current"), weather_data_id)
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Single-pass keyword intent routing for assistant messages
+
+Every keyword set (greetings, developer questions, weather terms, ...) is compiled once into
+one regular expression built from a trie of all keywords, and a single scan of the message finds
+every keyword, overlapping ones included. Matches have the same substring semantics as the
+`keyword in text` checks they replace.
+
+A copy of this module lives in Frontend-Admin/intent_router.py for the admin assistant script.
+"""
+
+import re
+from typing import Dict, Iterable, Optional, Set
+
+from gazetteer.places import get_gazetteer
+
+
+def _trie_regex(keywords: Iterable[str]) -> str:
+    """Regex matching the longest keyword that starts at the current position"""
+    trie: Dict = {}
+    for keyword in keywords:
+        node = trie
+        for char in keyword:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def build(node: Dict) -> str:
+        is_end = "" in node
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        if len(branches) == 1 and not is_end:
+            return branches[0]
+        body = "(?:" + "|".join(branches) + ")"
+        return body + "?" if is_end else body
+
+    return build(trie)
+
+
+class IntentRouter:
+    """Compiled matcher for named keyword sets"""
+
+    def __init__(self, keyword_sets: Dict[str, Iterable[str]]):
+        self._keyword_intents: Dict[str, Set[str]] = {}
+        for intent, keywords in keyword_sets.items():
+            for keyword in keywords:
+                self._keyword_intents.setdefault(keyword.lower(), set()).add(intent)
+
+        keywords = sorted(self._keyword_intents, key=len, reverse=True)
+        # The scan reports the longest keyword at each position; shorter keywords inside it
+        # (e.g. "flood" in "flood warning") are credited from this table of (intent, keyword) pairs
+        self._credits = {
+            keyword: [(intent, other) for other in keywords if other in keyword
+                      for intent in self._keyword_intents[other]]
+            for keyword in keywords
+        }
+        self._pattern = re.compile(_trie_regex(keywords)) if keywords else None
+
+    def match(self, text: str) -> Dict[str, Set[str]]:
+        """
+        Every intent whose keywords occur in text (case-insensitive)
+
+        Returns:
+            intent -> set of distinct keywords found for it
+        """
+        found: Dict[str, Set[str]] = {}
+        if self._pattern is None:
+            return found
+        text = text.lower()
+        seen = set()
+        position = 0
+        # Resume one character after each match start so overlapping keywords are found too;
+        # the regex engine skips ahead to the next possible first character in C
+        while True:
+            match = self._pattern.search(text, position)
+            if match is None:
+                return found
+            position = match.start() + 1
+            keyword = match.group()
+            if keyword in seen:
+                continue
+            seen.add(keyword)
+            for intent, credited in self._credits[keyword]:
+                if intent in found:
+                    found[intent].add(credited)
+                else:
+                    found[intent] = {credited}
+
+
+GREETING_WORDS = ["hello", "hi", "hey", "good morning", "good afternoon", "good evening", "greetings", "hola", "bonjour"]
+DEVELOPER_KEYWORDS = ["who developed", "who created", "who made", "who built", "your developer", "your creator",
+                      "who are you made by", "development team", "your team"]
+WEATHER_KEYWORDS = ["weather", "temperature", "rain", "rainfall", "humidity", "wind"]
+
+ASSISTANT_INTENTS = {
+    "greeting": GREETING_WORDS,
+    "developer": DEVELOPER_KEYWORDS,
+    "weather": WEATHER_KEYWORDS,
+}
+
+_router: Optional[IntentRouter] = None
+
+
+def get_intent_router() -> IntentRouter:
+    """Process-wide router for the assistant's keyword sets (compiled on first use)"""
+    global _router
+    if _router is None:
+        _router = IntentRouter(ASSISTANT_INTENTS)
+    return _router
+
+
+def route_question(question: str) -> Dict:
+    """
+    Classify an assistant question in one pass
+
+    Returns:
+        is_greeting (greeting word in a message of at most 3 words), is_developer_question,
+        is_weather_question, detected_city ({"name", "coords"} or None) and the raw intents
+    """
+    intents = get_intent_router().match(question)
+    # Place names come from the gazetteer's token trie rather than a keyword list
+    place = get_gazetteer().find_place(question)
+    detected_city = None
+    if place:
+        detected_city = {"name": place["name"], "coords": {"lat": place["latitude"], "lng": place["longitude"]}}
+    return {
+        "is_greeting": "greeting" in intents and len(question.split()) <= 3,
+        "is_developer_question": "developer" in intents,
+        "is_weather_question": "weather" in intents,
+        "detected_city": detected_city,
+        "intents": intents,
+    }
@@ -1,8 +1,8 @@
-from flask import Flask, request, jsonify, send_from_directory
+from flask import Flask, g, request, jsonify, send_file, send_from_directory
 from flask_cors import CORS
 from db.queries import (
-    get_flood_data_by_risk,
-    get_landslide_data_by_risk,
+    get_hazard_features_page,
+    iter_hazard_features,
     get_recent_weather_data,
     get_recent_earthquakes,
     get_earthquakes_by_magnitude,
@@ -10,6 +10,7 @@ from db.queries import (
     get_landslide_risk_at_point,
     get_recent_earthquakes_nearby,
     get_nearest_recent_weather,
+    get_point_risks_batch,
     get_landslide_data_nearby,
     get_all_emergency_protocols,
     get_emergency_protocol_by_id,
@@ -21,23 +22,47 @@ from db.queries import (
 from vectordb.ingest import add_documents
 from ai.rag import answer_with_rag
 from ai.base_model import get_base_model  # Import our new base model
-from db.setup import setup_database
-from db.base import SessionLocal, engine
+from ai.intent_router import route_question
+from gazetteer.places import get_gazetteer
+from serialization import dumps, geojson_fragment, install_json_provider
+from http_cache import conditional_layer_response, response_cache, streamed_layer_response
+from config import HAZARD_PAGE_SIZE_MAX, HAZARD_STREAM_BATCH_SIZE, HTTP_CACHE_MAX_AGE, RISK_POINTS_MAX
+from db.schema_version import check_schema_version
+from db.exports import EXPORT_FORMATS, HAZARD_TABLES, export_path, load_export_manifest
+from weather.weather_cache import get_weather_cache
+from db.rollups import (
+    get_layer_stats, get_observation_totals, get_observation_rollups, MAGNITUDE_CATEGORIES,
+)
+from db.base import SessionLocal, engine, get_read_engine, replica_router
 from sqlalchemy import text
 import json
+import os
 import traceback
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 
-# Setup database with PostGIS
-setup_database()
+# Schema is managed by migrations (python init_db.py / alembic upgrade head); only verify it here
+check_schema_version()
 
 app = Flask(__name__, static_folder='static')
+install_json_provider(app)  # orjson responses, GeoJSON fragments passed through
 CORS(app)  # Enable CORS for all routes
 
 # Enable CORS for all routes
 CORS(app, origins=["http://localhost:3000", "http://127.0.0.1:3000"])
 
 
+def _read_engine():
+    """Read engine (replica or primary, db/base.py) chosen once per request so all its queries agree"""
+    if "read_engine" not in g:
+        g.read_engine = get_read_engine()
+    return g.read_engine
+
+
+def _read_session():
+    """Session for read-only handlers; protocol CRUD and ingestion keep using SessionLocal (primary)"""
+    return SessionLocal(bind=_read_engine())
+
+
 @app.route("/")
 def index():
     """Serve the map example"""
@@ -77,7 +102,7 @@ def assistant_chat():
         weather_hours = int(payload.get("weather_hours", 3))
         weather_radius_km = float(payload.get("weather_radius_km", 100.0))
 
-        db = SessionLocal()
+        db = _read_session()
         flood_risk = get_flood_risk_at_point(db, latitude=lat, longitude=lng)
         landslide_risk = get_landslide_risk_at_point(db, latitude=lat, longitude=lng)
         recent_eq = get_recent_earthquakes_nearby(db, latitude=lat, longitude=lng, hours=hours_earthquake, max_km=eq_radius_km)
@@ -152,7 +177,7 @@ def assistant():
         weather_hours = int(payload.get("weather_hours", 3))
         weather_radius_km = float(payload.get("weather_radius_km", 100.0))
 
-        db = SessionLocal()
+        db = _read_session()
 
         # Spatial checks
         flood_risk = get_flood_risk_at_point(db, latitude=lat, longitude=lng)
@@ -280,50 +305,20 @@ def enhanced_assistant():
 
         print(f"🤖 Enhanced Assistant Request: {question}" + (f" at ({lat:.5f}, {lng:.5f})" if has_location else " (general question)"))
 
-        # Fast greeting detection for quick responses
-        greeting_words = ["hello", "hi", "hey", "good morning", "good afternoon", "good evening", "greetings", "hola", "bonjour"]
-        question_lower = question.lower().strip()
-        
-        # Check if the question is a simple greeting
-        is_greeting = any(greeting in question_lower for greeting in greeting_words) and len(question.split()) <= 3
-        
-        # Check for questions about development/creator
-        developer_keywords = ["who developed", "who created", "who made", "who built", "your developer", "your creator", "who are you made by", "development team", "your team"]
-        is_developer_question = any(keyword in question_lower for keyword in developer_keywords)
-        
-        # Check for location-specific questions that should trigger map interaction
-        philippine_cities = {
-            "manila": {"lat": 14.5995, "lng": 120.9842},
-            "quezon city": {"lat": 14.6760, "lng": 121.0437},
-            "cebu city": {"lat": 10.3157, "lng": 123.8854},
-            "cebu": {"lat": 10.3157, "lng": 123.8854},
-            "davao city": {"lat": 7.1907, "lng": 125.4553},
-            "davao": {"lat": 7.1907, "lng": 125.4553},
-            "iloilo city": {"lat": 10.7202, "lng": 122.5621},
-            "iloilo": {"lat": 10.7202, "lng": 122.5621},
-            "baguio": {"lat": 16.4023, "lng": 120.5960},
-            "zamboanga city": {"lat": 6.9214, "lng": 122.0790},
-            "zamboanga": {"lat": 6.9214, "lng": 122.0790},
-            "cagayan de oro": {"lat": 8.4542, "lng": 124.6319},
-            "general santos": {"lat": 6.1164, "lng": 125.1716}
-        }
-        
-        detected_city = None
-        for city_name, coords in philippine_cities.items():
-            if city_name in question_lower:
-                detected_city = {"name": city_name.title(), "coords": coords}
-                break
-        
-        # Check for weather-specific questions about cities
-        weather_keywords = ["weather", "temperature", "rain", "rainfall", "humidity", "wind"]
-        is_weather_question = any(keyword in question_lower for keyword in weather_keywords)
+        # Greeting / developer / city / weather intents in a single pass over the question
+        routed = route_question(question)
+        is_greeting = routed["is_greeting"]
+        is_developer_question = routed["is_developer_question"]
+        # Location-specific questions trigger map interaction
+        detected_city = routed["detected_city"]
+        is_weather_question = routed["is_weather_question"]
         
         if detected_city and is_weather_question:
             # Handle city-specific weather questions with real database data
             try:
                 print(f"🌤️ Weather question detected for {detected_city['name']}")
                 
-                db = SessionLocal()
+                db = _read_session()
                 # Get real weather data for the detected city
                 lat, lng = detected_city['coords']['lat'], detected_city['coords']['lng']
                 nearest_weather = get_nearest_recent_weather(db, latitude=lat, longitude=lng, hours=24, max_km=10.0)
@@ -491,7 +486,7 @@ The ButDev Team built me to be your trusted companion in staying safe from natur
 
         # If we have location data, get real-time hazard data
         if has_location:
-            db = SessionLocal()
+            db = _read_session()
             flood_risk = get_flood_risk_at_point(db, latitude=lat, longitude=lng)
             landslide_risk = get_landslide_risk_at_point(db, latitude=lat, longitude=lng)
             recent_eq = get_recent_earthquakes_nearby(db, latitude=lat, longitude=lng, hours=hours_earthquake, max_km=eq_radius_km)
@@ -500,8 +495,13 @@ The ButDev Team built me to be your trusted companion in staying safe from natur
             # Build comprehensive context for the AI model
             hazard_context = []
             
-            # Remove specific location coordinates from context
+            # Remove specific location coordinates from context; name the nearest place instead
             # hazard_context.append(f"📍 Location: {lat:.5f}, {lng:.5f}")
+            nearest_place = get_gazetteer().nearest_place(lat, lng, max_km=50.0)
+            if nearest_place:
+                area = ", ".join(part for part in (nearest_place["name"], nearest_place["city_municipality"],
+                                                  nearest_place["province"]) if part)
+                hazard_context.append(f"📍 Area: near {area} ({nearest_place['distance_km']:.1f}km away)")
             
             # Flood risk context
             if flood_risk is not None:
@@ -633,6 +633,7 @@ Please provide specific, actionable advice for this location considering all the
             # Prepare the response
             response = {
                 "location": {"lat": lat, "lng": lng},
+                "nearest_place": nearest_place,
                 "question": question,
                 "hazards": {
                     "flood_risk": flood_risk,
@@ -747,81 +748,204 @@ I'm here to help keep you safe from natural disasters in the Philippines. Feel f
             db.close()
 
 
+# ============================================================================
+# POINT RISK ENDPOINTS
+# ============================================================================
+
+@app.route("/api/risk/points", methods=["POST"])
+def get_point_risks():
+    """Hazard snapshot for many points at once (no LLM).
+    
+    Request JSON:
+      { "points": [ { "lat": number, "lng": number, "id"?: any }, ... ] }
+      Points may also be [lat, lng] pairs. Same optional knobs as /api/assistant:
+      hours_earthquake, eq_radius_km, weather_hours, weather_radius_km
+    """
+    db = None
+    try:
+        payload = request.get_json(force=True) or {}
+        raw_points = payload.get("points")
+        if not isinstance(raw_points, list) or not raw_points:
+            return jsonify({"error": "points must be a non-empty list"}), 400
+        if len(raw_points) > RISK_POINTS_MAX:
+            return jsonify({"error": f"at most {RISK_POINTS_MAX} points per request"}), 400
+
+        points, ids = [], []
+        for i, point in enumerate(raw_points):
+            try:
+                if isinstance(point, dict):
+                    lat, lng = float(point["lat"]), float(point["lng"])
+                    ids.append(point.get("id"))
+                else:
+                    lat, lng = float(point[0]), float(point[1])
+                    ids.append(None)
+            except (KeyError, IndexError, TypeError, ValueError):
+                return jsonify({"error": f"points[{i}] must have numeric lat and lng"}), 400
+            if not (-90 <= lat <= 90 and -180 <= lng <= 180):
+                return jsonify({"error": f"points[{i}] is out of range"}), 400
+            points.append((lat, lng))
+
+        print(f"📍 Point risk request for {len(points)} points")
+        db = _read_session()
+        results = get_point_risks_batch(
+            db,
+            points,
+            hours_earthquake=int(payload.get("hours_earthquake", 24)),
+            eq_radius_km=float(payload.get("eq_radius_km", 100.0)),
+            weather_hours=int(payload.get("weather_hours", 3)),
+            weather_radius_km=float(payload.get("weather_radius_km", 100.0)),
+        )
+        for point_id, result in zip(ids, results):
+            if point_id is not None:
+                result["id"] = point_id
+
+        return jsonify({"points": results, "count": len(results)})
+
+    except Exception as e:
+        print(f"❌ Error in get_point_risks: {e}")
+        print(f"📋 Traceback: {traceback.format_exc()}")
+        return jsonify({"error": str(e), "traceback": traceback.format_exc()}), 500
+
+    finally:
+        if db:
+            db.close()
+
+
 # ============================================================================
 # FLOOD DATA ENDPOINTS
 # ============================================================================
 
+def _hazard_feature_properties(record_id, risk_level, layer):
+    return {
+        "id": record_id,
+        "risk_level": float(risk_level),
+        "risk_category": get_risk_category(risk_level),
+        "data_type": layer
+    }
+
+
+def _hazard_page_params():
+    """after_id / page_size / stream query parameters (`limit` is accepted as the old name of page_size)"""
+    after_id = request.args.get('after_id', 0, type=int)
+    page_size = request.args.get('page_size', type=int) or request.args.get('limit', 1000, type=int)
+    page_size = max(1, min(page_size, HAZARD_PAGE_SIZE_MAX))
+    stream = request.args.get('stream', '').lower() in ('1', 'true', 'yes')
+    return after_id, page_size, stream
+
+
+def _hazard_features_page(db, layer, min_risk, max_risk, after_id, page_size):
+    """One keyset page as a FeatureCollection dict; next_after_id is null on the last page"""
+    rows = get_hazard_features_page(db, layer, min_risk=min_risk, max_risk=max_risk,
+                                    after_id=after_id, page_size=page_size)
+    print(f"✅ Found {len(rows)} {layer} records after id {after_id}")
+    
+    features = []
+    for record_id, risk_level, geometry_json in rows:
+        if geometry_json is None:
+            print(f"⚠️ No geometry found for {layer} record {record_id}")
+            continue
+        features.append({
+            "type": "Feature",
+            "geometry": geojson_fragment(geometry_json),
+            "properties": _hazard_feature_properties(record_id, risk_level, layer)
+        })
+    
+    response = {
+        "type": "FeatureCollection",
+        "features": features,
+        "total": len(features),
+        "page_size": page_size,
+        "next_after_id": rows[-1][0] if len(rows) == page_size else None
+    }
+    if not rows and after_id == 0:
+        response["message"] = f"No {layer} data found for the specified risk range."
+    return response
+
+
+def _hazard_layer_response(db, layer, build_payload):
+    """Payload as JSON with ETag / 304 / pre-compressed variants (http_cache.py), or plain jsonify"""
+    cached = conditional_layer_response(db, layer, lambda: dumps(build_payload()))
+    return cached if cached is not None else jsonify(build_payload())
+
+
+def _stream_hazard_features(db, layer, min_risk, max_risk, after_id):
+    """Full FeatureCollection export streamed from a server-side cursor (constant memory), with the
+    layer's ETag / 304 handling and gzip when accepted (http_cache.py)"""
+    read_engine = _read_engine()
+    
+    def generate():
+        total = 0
+        yield '{"type": "FeatureCollection", "features": ['
+        try:
+            with read_engine.connect() as conn:
+                for record_id, risk_level, geometry_json in iter_hazard_features(
+                        conn, layer, min_risk=min_risk, max_risk=max_risk, after_id=after_id,
+                        batch_size=HAZARD_STREAM_BATCH_SIZE):
+                    if geometry_json is None:
+                        continue
+                    # ST_AsGeoJSON output is already JSON; splice it in instead of re-encoding
+                    properties = json.dumps(_hazard_feature_properties(record_id, risk_level, layer))
+                    yield (',' if total else '') + \
+                        f'{{"type": "Feature", "geometry": {geometry_json}, "properties": {properties}}}'
+                    total += 1
+        except Exception as e:
+            # Headers are already sent; the truncated document makes the failure visible to clients
+            print(f"❌ Error while streaming {layer} features: {e}")
+            print(f"📋 Traceback: {traceback.format_exc()}")
+            return
+        print(f"✅ Streamed {total} {layer} features")
+        yield f'], "total": {total}}}'
+    
+    return streamed_layer_response(db, layer, generate(), mimetype="application/geo+json")
+
+
+def _hazard_export_response(layer, export_format):
+    """
+    Whole layer as the FlatGeobuf / GeoParquet file written by db/exports.py after ingestion.
+    send_file answers Range requests, so FlatGeobuf clients can read the spatial index and then only
+    the features inside their bounding box. Risk and paging parameters do not apply to these files.
+    """
+    if export_format not in EXPORT_FORMATS:
+        return jsonify({"error": f"Unknown format '{export_format}'. Use one of: {list(EXPORT_FORMATS)}"}), 400
+    extension, mimetype = EXPORT_FORMATS[export_format]
+    path = os.path.abspath(export_path(layer, extension))
+    if not os.path.exists(path):
+        return jsonify({
+            "error": f"No {extension} export of the {layer} layer yet",
+            "hint": f"Run: python -m db.exports {layer}"
+        }), 404
+    print(f"📦 Serving {layer} export {os.path.basename(path)}")
+    response = send_file(path, mimetype=mimetype, conditional=True, max_age=HTTP_CACHE_MAX_AGE,
+                         download_name=os.path.basename(path))
+    response.headers["Access-Control-Expose-Headers"] = "Content-Range, Content-Length, Accept-Ranges, ETag"
+    return response
+
+
 @app.route("/api/flood-data", methods=["GET"])
 def get_flood_data():
-    """Get all flood data for Google Maps"""
+    """Flood features for Google Maps, one keyset page at a time (?after_id&page_size), streamed (?stream=1)
+    or as a FlatGeobuf / GeoParquet file (?format=fgb|parquet)"""
     db = None
     try:
         print("🔍 Starting flood data request...")
-        db = SessionLocal()
+        export_format = request.args.get('format', '').lower()
+        if export_format and export_format not in ('json', 'geojson'):
+            return _hazard_export_response("flood", export_format)
         
         # Get query parameters
         min_risk = request.args.get('min_risk', type=float)
         max_risk = request.args.get('max_risk', type=float)
-        limit = request.args.get('limit', 1000, type=int)
+        after_id, page_size, stream = _hazard_page_params()
         
-        print(f"📊 Query params: min_risk={min_risk}, max_risk={max_risk}, limit={limit}")
+        print(f"📊 Query params: min_risk={min_risk}, max_risk={max_risk}, after_id={after_id}, "
+              f"page_size={page_size}, stream={stream}")
         
-        # Query flood data
-        print("🗄️ Querying flood data from database...")
-        flood_data = get_flood_data_by_risk(db, min_risk=min_risk, max_risk=max_risk)
-        print(f"✅ Found {len(flood_data)} flood data records")
+        db = _read_session()
+        if stream:
+            return _stream_hazard_features(db, "flood", min_risk, max_risk, after_id)
         
-        if not flood_data:
-            return jsonify({
-                "type": "FeatureCollection",
-                "features": [],
-                "total": 0,
-                "message": "No flood data found for the specified risk range."
-            })
-        
-        # Convert to GeoJSON format for Google Maps
-        features = []
-        for i, data in enumerate(flood_data[:limit]):
-            try:
-                print(f"🔄 Processing record {i+1}/{min(len(flood_data), limit)}")
-                
-                # Convert WKT to GeoJSON coordinates using engine connection
-                with engine.connect() as conn:
-                    result = conn.execute(text(f"SELECT ST_AsGeoJSON(geometry) FROM flood_data WHERE id = {data.id}"))
-                    geojson_result = result.fetchone()
-                    
-                    if geojson_result is None or geojson_result[0] is None:
-                        print(f"⚠️ No geometry found for record {data.id}")
-                        continue
-                    
-                    geojson = geojson_result[0]
-                    geometry = json.loads(geojson)
-                
-                feature = {
-                    "type": "Feature",
-                    "geometry": geometry,
-                    "properties": {
-                        "id": data.id,
-                        "risk_level": float(data.risk_level),
-                        "risk_category": get_risk_category(data.risk_level),
-                        "data_type": "flood"
-                    }
-                }
-                features.append(feature)
-                
-            except Exception as e:
-                print(f"❌ Error processing record {data.id}: {e}")
-                continue
-        
-        print(f"✅ Successfully processed {len(features)} features")
-        
-        geojson_response = {
-            "type": "FeatureCollection",
-            "features": features,
-            "total": len(features)
-        }
-        
-        return jsonify(geojson_response)
+        return _hazard_layer_response(
+            db, "flood", lambda: _hazard_features_page(db, "flood", min_risk, max_risk, after_id, page_size))
         
     except Exception as e:
         print(f"❌ Error in get_flood_data: {e}")
@@ -839,55 +963,37 @@ def get_flood_stats():
     db = None
     try:
         print("📊 Getting flood data statistics...")
-        db = SessionLocal()
+        db = _read_session()
         
-        with engine.connect() as conn:
-            # Get total count
-            result = conn.execute(text("SELECT COUNT(*) FROM flood_data"))
-            total_count = result.fetchone()[0]
-            print(f"📈 Total flood areas: {total_count}")
-            
-            if total_count == 0:
-                return jsonify({
-                    "total_flood_areas": 0,
-                    "risk_statistics": {
-                        "min_risk": 0,
-                        "max_risk": 0,
-                        "avg_risk": 0
-                    },
-                    "risk_distribution": []
-                })
-            
-            # Get risk level statistics
-            result = conn.execute(text("""
-                SELECT 
-                    MIN(risk_level) as min_risk,
-                    MAX(risk_level) as max_risk,
-                    AVG(risk_level) as avg_risk,
-                    COUNT(*) as total
-                FROM flood_data
-            """))
-            stats = result.fetchone()
-            
-            # Get risk level distribution
-            result = conn.execute(text("""
-                SELECT 
-                    risk_level,
-                    COUNT(*) as count
-                FROM flood_data 
-                GROUP BY risk_level 
-                ORDER BY risk_level
-            """))
-            distribution = [{"risk_level": float(row[0]), "count": row[1]} for row in result.fetchall()]
+        # layer_stats is recomputed after each ingestion (db/rollups.py); a missing row is
+        # computed on the primary, never on a read replica
+        with _read_engine().connect() as conn:
+            layer_stats = get_layer_stats(conn, "flood", primary=engine)
+        total_count = layer_stats["total_count"] if layer_stats else 0
+        print(f"📈 Total flood areas: {total_count}")
+        
+        if total_count == 0:
+            return jsonify({
+                "total_flood_areas": 0,
+                "risk_statistics": {
+                    "min_risk": 0,
+                    "max_risk": 0,
+                    "avg_risk": 0
+                },
+                "risk_distribution": []
+            })
         
         stats_response = {
             "total_flood_areas": total_count,
             "risk_statistics": {
-                "min_risk": float(stats[0]) if stats[0] else 0,
-                "max_risk": float(stats[1]) if stats[1] else 0,
-                "avg_risk": float(stats[2]) if stats[2] else 0
+                "min_risk": float(layer_stats["min_risk"]) if layer_stats["min_risk"] else 0,
+                "max_risk": float(layer_stats["max_risk"]) if layer_stats["max_risk"] else 0,
+                "avg_risk": float(layer_stats["avg_risk"]) if layer_stats["avg_risk"] else 0
             },
-            "risk_distribution": distribution
+            "risk_distribution": [
+                {"risk_level": float(entry["risk_level"]), "count": entry["count"]}
+                for entry in layer_stats["risk_distribution"]
+            ]
         }
         
         print(f"✅ Statistics calculated successfully")
@@ -907,128 +1013,74 @@ def get_flood_stats():
 # LANDSLIDE DATA ENDPOINTS
 # ============================================================================
 
+def _nearby_landslide_features(db, lat, lng, radius_km, min_risk, max_risk, page_size):
+    """FeatureCollection dict of the page_size landslide features nearest to a point"""
+    landslide_data = get_landslide_data_nearby(db, lat, lng, radius_km, min_risk, max_risk, limit=page_size)
+    print(f"✅ Found {len(landslide_data)} landslide data records")
+    
+    features = []
+    for record_id, risk_level, geometry_json, distance_km in landslide_data:
+        if geometry_json is None:
+            print(f"⚠️ No geometry found for landslide record {record_id}")
+            continue
+        properties = _hazard_feature_properties(record_id, risk_level, "landslide")
+        properties["distance_km"] = float(distance_km)
+        features.append({
+            "type": "Feature",
+            "geometry": geojson_fragment(geometry_json),
+            "properties": properties
+        })
+    
+    geojson_response = {
+        "type": "FeatureCollection",
+        "features": features,
+        "total": len(features)
+    }
+    if not features:
+        geojson_response["message"] = "No landslide data found for the specified risk range."
+    return geojson_response
+
+
 @app.route("/api/landslide-data", methods=["GET"])
 def get_landslide_data():
-    """Get all landslide data for Google Maps"""
+    """Landslide features for Google Maps: keyset pages (?after_id&page_size), a streamed export
+    (?stream=1), a FlatGeobuf / GeoParquet file (?format=fgb|parquet), or the nearest page_size
+    features around ?lat&lng&radius_km"""
     db = None
     try:
         print("🏔️ Starting landslide data request...")
         print(f"🔗 Request URL: {request.url}")
-        print(f"📋 Request headers: {dict(request.headers)}")
-        
-        db = SessionLocal()
+        export_format = request.args.get('format', '').lower()
+        if export_format and export_format not in ('json', 'geojson'):
+            return _hazard_export_response("landslide", export_format)
         
         # Get query parameters
         min_risk = request.args.get('min_risk', type=float)
         max_risk = request.args.get('max_risk', type=float)
-        limit = request.args.get('limit', 1000, type=int)
+        after_id, page_size, stream = _hazard_page_params()
         
         # Get nearby query parameters
         lat = request.args.get('lat', type=float)
         lng = request.args.get('lng', type=float)
         radius_km = request.args.get('radius_km', 50.0, type=float)
         
-        print(f"📊 Query params: min_risk={min_risk}, max_risk={max_risk}, limit={limit}")
+        print(f"📊 Query params: min_risk={min_risk}, max_risk={max_risk}, after_id={after_id}, "
+              f"page_size={page_size}, stream={stream}")
         print(f"📍 Nearby params: lat={lat}, lng={lng}, radius_km={radius_km}")
         
-        # Query landslide data
-        print("🗄️ Querying landslide data from database...")
-        try:
-            # Use nearby query if lat/lng provided, otherwise use risk-based query
-            if lat is not None and lng is not None:
-                print(f"🗺️ Using nearby query around ({lat}, {lng}) with radius {radius_km}km")
-                landslide_data = get_landslide_data_nearby(db, lat, lng, radius_km, min_risk, max_risk)
-            else:
-                print("📊 Using risk-based query")
-                landslide_data = get_landslide_data_by_risk(db, min_risk=min_risk, max_risk=max_risk)
-            
-            print(f"✅ Found {len(landslide_data)} landslide data records")
-            print(f"📋 Data types: {[type(item) for item in landslide_data[:3]]}")
-        except Exception as query_error:
-            print(f"❌ Database query error: {query_error}")
-            print(f"📋 Query error traceback: {traceback.format_exc()}")
-            return jsonify({"error": f"Database query failed: {str(query_error)}"}), 500
-        
-        if not landslide_data:
-            return jsonify({
-                "type": "FeatureCollection",
-                "features": [],
-                "total": 0,
-                "message": "No landslide data found for the specified risk range."
-            })
-        
-        # Convert to GeoJSON format for Google Maps
-        features = []
-        for i, data in enumerate(landslide_data[:limit]):
-            try:
-                print(f"🔄 Processing landslide record {i+1}/{min(len(landslide_data), limit)}")
-                
-                # Handle different data formats (ORM objects vs raw query results)
-                if hasattr(data, 'id') and hasattr(data, 'risk_level'):
-                    # ORM object format (from get_landslide_data_by_risk)
-                    record_id = data.id
-                    risk_level = data.risk_level
-                    
-                    # Convert WKT to GeoJSON coordinates using engine connection
-                    with engine.connect() as conn:
-                        result = conn.execute(text(f"SELECT ST_AsGeoJSON(geometry) FROM landslide_data WHERE id = {record_id}"))
-                        geojson_result = result.fetchone()
-                        
-                        if geojson_result is None or geojson_result[0] is None:
-                            print(f"⚠️ No geometry found for landslide record {record_id}")
-                            continue
-                        
-                        geojson = geojson_result[0]
-                        geometry = json.loads(geojson)
-                else:
-                    # Raw query result format (from get_landslide_data_nearby)
-                    record_id = data[0]  # id
-                    risk_level = data[1]  # risk_level
-                    geometry = json.loads(data[2])  # geometry_json
-                    distance_km = data[3]  # distance_km
-                
-                feature = {
-                    "type": "Feature",
-                    "geometry": geometry,
-                    "properties": {
-                        "id": record_id,
-                        "risk_level": float(risk_level),
-                        "risk_category": get_risk_category(risk_level),
-                        "data_type": "landslide"
-                    }
-                }
-                
-                # Add distance if available (from nearby query)
-                if 'distance_km' in locals():
-                    feature["properties"]["distance_km"] = float(distance_km)
-                
-                features.append(feature)
-                
-            except Exception as e:
-                print(f"❌ Error processing landslide record {i}: {e}")
-                continue
-        
-        print(f"✅ Successfully processed {len(features)} landslide features")
-        
-        geojson_response = {
-            "type": "FeatureCollection",
-            "features": features,
-            "total": len(features)
-        }
-        
-        print(f"📦 Response structure: {list(geojson_response.keys())}")
-        print(f"📦 Features count in response: {len(geojson_response['features'])}")
-        print(f"📦 Response type: {type(geojson_response)}")
-        
-        try:
-            response = jsonify(geojson_response)
-            print(f"✅ JSON response created successfully")
-            print(f"📦 Response content length: {len(response.get_data())}")
-            return response
-        except Exception as json_error:
-            print(f"❌ JSON serialization error: {json_error}")
-            print(f"📋 JSON error traceback: {traceback.format_exc()}")
-            return jsonify({"error": f"JSON serialization failed: {str(json_error)}"}), 500
+        db = _read_session()
+        if lat is None or lng is None:
+            if stream:
+                return _stream_hazard_features(db, "landslide", min_risk, max_risk, after_id)
+            return _hazard_layer_response(
+                db, "landslide",
+                lambda: _hazard_features_page(db, "landslide", min_risk, max_risk, after_id, page_size))
+        
+        # Nearby mode is ordered by distance, so it returns the closest page_size features only
+        print(f"🗺️ Using nearby query around ({lat}, {lng}) with radius {radius_km}km")
+        return _hazard_layer_response(
+            db, "landslide",
+            lambda: _nearby_landslide_features(db, lat, lng, radius_km, min_risk, max_risk, page_size))
         
     except Exception as e:
         print(f"❌ Error in get_landslide_data: {e}")
@@ -1046,10 +1098,10 @@ def debug_landslide():
     db = None
     try:
         print("🔍 Debug landslide data...")
-        db = SessionLocal()
+        db = _read_session()
         
         # Check if table exists
-        with engine.connect() as conn:
+        with _read_engine().connect() as conn:
             try:
                 result = conn.execute(text("SELECT COUNT(*) FROM landslide_data"))
                 total_count = result.fetchone()[0]
@@ -1087,55 +1139,36 @@ def get_landslide_stats():
     db = None
     try:
         print("📊 Getting landslide data statistics...")
-        db = SessionLocal()
+        db = _read_session()
         
-        with engine.connect() as conn:
-            # Get total count
-            result = conn.execute(text("SELECT COUNT(*) FROM landslide_data"))
-            total_count = result.fetchone()[0]
-            print(f"📈 Total landslide areas: {total_count}")
-            
-            if total_count == 0:
-                return jsonify({
-                    "total_landslide_areas": 0,
-                    "risk_statistics": {
-                        "min_risk": 0,
-                        "max_risk": 0,
-                        "avg_risk": 0
-                    },
-                    "risk_distribution": []
-                })
-            
-            # Get risk level statistics
-            result = conn.execute(text("""
-                SELECT 
-                    MIN(risk_level) as min_risk,
-                    MAX(risk_level) as max_risk,
-                    AVG(risk_level) as avg_risk,
-                    COUNT(*) as total
-                FROM landslide_data
-            """))
-            stats = result.fetchone()
-            
-            # Get risk level distribution
-            result = conn.execute(text("""
-                SELECT 
-                    risk_level,
-                    COUNT(*) as count
-                FROM landslide_data 
-                GROUP BY risk_level 
-                ORDER BY risk_level
-            """))
-            distribution = [{"risk_level": float(row[0]), "count": row[1]} for row in result.fetchall()]
+        # layer_stats is recomputed after each ingestion (db/rollups.py)
+        with _read_engine().connect() as conn:
+            layer_stats = get_layer_stats(conn, "landslide", primary=engine)
+        total_count = layer_stats["total_count"] if layer_stats else 0
+        print(f"📈 Total landslide areas: {total_count}")
+        
+        if total_count == 0:
+            return jsonify({
+                "total_landslide_areas": 0,
+                "risk_statistics": {
+                    "min_risk": 0,
+                    "max_risk": 0,
+                    "avg_risk": 0
+                },
+                "risk_distribution": []
+            })
         
         stats_response = {
             "total_landslide_areas": total_count,
             "risk_statistics": {
-                "min_risk": float(stats[0]) if stats[0] else 0,
-                "max_risk": float(stats[1]) if stats[1] else 0,
-                "avg_risk": float(stats[2]) if stats[2] else 0
+                "min_risk": float(layer_stats["min_risk"]) if layer_stats["min_risk"] else 0,
+                "max_risk": float(layer_stats["max_risk"]) if layer_stats["max_risk"] else 0,
+                "avg_risk": float(layer_stats["avg_risk"]) if layer_stats["avg_risk"] else 0
             },
-            "risk_distribution": distribution
+            "risk_distribution": [
+                {"risk_level": float(entry["risk_level"]), "count": entry["count"]}
+                for entry in layer_stats["risk_distribution"]
+            ]
         }
         
         print(f"✅ Landslide statistics calculated successfully")
@@ -1161,7 +1194,7 @@ def get_seismic_data():
     db = None
     try:
         print("🌋 Starting seismic data request...")
-        db = SessionLocal()
+        db = _read_session()
         
         # Get query parameters
         min_magnitude = request.args.get('min_magnitude', type=float)
@@ -1195,7 +1228,7 @@ def get_seismic_data():
                 print(f"🔄 Processing seismic record {i+1}/{min(len(seismic_data), limit)}")
                 
                 # Convert WKT to GeoJSON coordinates using engine connection
-                with engine.connect() as conn:
+                with _read_engine().connect() as conn:
                     result = conn.execute(text(f"SELECT ST_AsGeoJSON(geometry) FROM earthquake_data WHERE id = {data.id}"))
                     geojson_result = result.fetchone()
                     
@@ -1204,7 +1237,7 @@ def get_seismic_data():
                         continue
                     
                     geojson = geojson_result[0]
-                    geometry = json.loads(geojson)
+                    geometry = geojson_fragment(geojson)
                 
                 feature = {
                     "type": "Feature",
@@ -1252,93 +1285,50 @@ def get_seismic_stats():
     db = None
     try:
         print("📊 Getting seismic data statistics...")
-        db = SessionLocal()
+        db = _read_session()
         
-        with engine.connect() as conn:
-            # Get total count
-            result = conn.execute(text("SELECT COUNT(*) FROM earthquake_data"))
-            total_count = result.fetchone()[0]
-            print(f"📈 Total seismic events: {total_count}")
-            
-            if total_count == 0:
-                return jsonify({
-                    "total_seismic_events": 0,
-                    "magnitude_statistics": {
-                        "min_magnitude": 0,
-                        "max_magnitude": 0,
-                        "avg_magnitude": 0
-                    },
-                    "depth_statistics": {
-                        "min_depth": 0,
-                        "max_depth": 0,
-                        "avg_depth": 0
-                    },
-                    "magnitude_distribution": []
-                })
-            
-            # Get magnitude statistics
-            result = conn.execute(text("""
-                SELECT 
-                    MIN(magnitude) as min_magnitude,
-                    MAX(magnitude) as max_magnitude,
-                    AVG(magnitude) as avg_magnitude,
-                    COUNT(*) as total
-                FROM earthquake_data
-            """))
-            mag_stats = result.fetchone()
-            
-            # Get depth statistics
-            result = conn.execute(text("""
-                SELECT 
-                    MIN(depth) as min_depth,
-                    MAX(depth) as max_depth,
-                    AVG(depth) as avg_depth
-                FROM earthquake_data 
-                WHERE depth IS NOT NULL
-            """))
-            depth_stats = result.fetchone()
-            
-            # Get magnitude distribution
-            result = conn.execute(text("""
-                SELECT 
-                    CASE 
-                        WHEN magnitude < 2.0 THEN 'Micro'
-                        WHEN magnitude < 4.0 THEN 'Minor'
-                        WHEN magnitude < 5.0 THEN 'Light'
-                        WHEN magnitude < 6.0 THEN 'Moderate'
-                        WHEN magnitude < 7.0 THEN 'Strong'
-                        WHEN magnitude < 8.0 THEN 'Major'
-                        ELSE 'Great'
-                    END as category,
-                    COUNT(*) as count
-                FROM earthquake_data 
-                GROUP BY category
-                ORDER BY 
-                    CASE category
-                        WHEN 'Micro' THEN 1
-                        WHEN 'Minor' THEN 2
-                        WHEN 'Light' THEN 3
-                        WHEN 'Moderate' THEN 4
-                        WHEN 'Strong' THEN 5
-                        WHEN 'Major' THEN 6
-                        WHEN 'Great' THEN 7
-                    END
-            """))
-            distribution = [{"category": row[0], "count": row[1]} for row in result.fetchall()]
+        # observation_rollups is maintained by an insert trigger on earthquake_data (db/rollups.py)
+        with _read_engine().connect() as conn:
+            totals = get_observation_totals(conn, "earthquake")
+        total_count = totals.get("rows", {}).get("count", 0)
+        print(f"📈 Total seismic events: {total_count}")
+        
+        if total_count == 0:
+            return jsonify({
+                "total_seismic_events": 0,
+                "magnitude_statistics": {
+                    "min_magnitude": 0,
+                    "max_magnitude": 0,
+                    "avg_magnitude": 0
+                },
+                "depth_statistics": {
+                    "min_depth": 0,
+                    "max_depth": 0,
+                    "avg_depth": 0
+                },
+                "magnitude_distribution": []
+            })
+        
+        magnitude = totals.get("magnitude", {})
+        depth = totals.get("depth", {})
+        categories = totals.get("magnitude_category", {})
         
         stats_response = {
             "total_seismic_events": total_count,
             "magnitude_statistics": {
-                "min_magnitude": float(mag_stats[0]) if mag_stats[0] else 0,
-                "max_magnitude": float(mag_stats[1]) if mag_stats[1] else 0,
-                "avg_magnitude": float(mag_stats[2]) if mag_stats[2] else 0
+                "min_magnitude": float(magnitude["min"]) if magnitude.get("min") else 0,
+                "max_magnitude": float(magnitude["max"]) if magnitude.get("max") else 0,
+                "avg_magnitude": float(magnitude["avg"]) if magnitude.get("avg") else 0
             },
             "depth_statistics": {
-                "min_depth": float(depth_stats[0]) if depth_stats[0] else 0,
-                "max_depth": float(depth_stats[1]) if depth_stats[1] else 0,
-                "avg_depth": float(depth_stats[2]) if depth_stats[2] else 0
+                "min_depth": float(depth["min"]) if depth.get("min") else 0,
+                "max_depth": float(depth["max"]) if depth.get("max") else 0,
+                "avg_depth": float(depth["avg"]) if depth.get("avg") else 0
             },
-            "magnitude_distribution": distribution
+            "magnitude_distribution": [
+                {"category": category, "count": categories[category]["count"]}
+                for category in MAGNITUDE_CATEGORIES if category in categories
+            ]
         }
         
         print(f"✅ Seismic statistics calculated successfully")
@@ -1364,7 +1354,7 @@ def get_weather_data():
     db = None
     try:
         print("🌤️ Starting weather data request...")
-        db = SessionLocal()
+        db = _read_session()
         
         # Get query parameters
         hours = request.args.get('hours', 1, type=int)
@@ -1393,7 +1383,7 @@ def get_weather_data():
                 print(f"🔄 Processing weather record {i+1}/{min(len(weather_data), limit)}")
                 
                 # Convert WKT to GeoJSON coordinates using engine connection
-                with engine.connect() as conn:
+                with _read_engine().connect() as conn:
                     result = conn.execute(text(f"SELECT ST_AsGeoJSON(geometry) FROM weather_data WHERE id = {data.id}"))
                     geojson_result = result.fetchone()
                     
@@ -1402,7 +1392,7 @@ def get_weather_data():
                         continue
                     
                     geojson = geojson_result[0]
-                    geometry = json.loads(geojson)
+                    geometry = geojson_fragment(geojson)
                 
                 feature = {
                     "type": "Feature",
@@ -1453,12 +1443,12 @@ def get_weather_stats():
     db = None
     try:
         print("📊 Getting weather data statistics...")
-        db = SessionLocal()
+        db = _read_session()
         
-        with engine.connect() as conn:
-            # Get total count
-            result = conn.execute(text("SELECT COUNT(*) FROM weather_data"))
-            total_count = result.fetchone()[0]
+        # observation_rollups is maintained by an insert trigger on weather_data (db/rollups.py)
+        with _read_engine().connect() as conn:
+            totals = get_observation_totals(conn, "weather")
+            total_count = totals.get("rows", {}).get("count", 0)
             print(f"📈 Total weather stations: {total_count}")
             
             if total_count == 0:
@@ -1475,46 +1465,23 @@ def get_weather_stats():
                     }
                 })
             
-            # Get temperature statistics
-            result = conn.execute(text("""
-                SELECT 
-                    MIN(temperature) as min_temp,
-                    MAX(temperature) as max_temp,
-                    AVG(temperature) as avg_temp
-                FROM weather_data 
-                WHERE temperature IS NOT NULL
-            """))
-            temp_stats = result.fetchone()
-            
-            # Get rainfall statistics
-            result = conn.execute(text("""
-                SELECT 
-                    SUM(rainfall) as total_rainfall,
-                    AVG(rainfall) as avg_rainfall
-                FROM weather_data 
-                WHERE rainfall IS NOT NULL
-            """))
-            rain_stats = result.fetchone()
-            
-            # Get station count
-            result = conn.execute(text("""
-                SELECT COUNT(DISTINCT station_name) as unique_stations
-                FROM weather_data 
-                WHERE station_name IS NOT NULL
-            """))
-            station_count = result.fetchone()[0]
+            # One row per station
+            station_count = conn.execute(text("SELECT COUNT(*) FROM weather_latest")).scalar()
+        
+        temperature = totals.get("temperature", {})
+        rainfall = totals.get("rainfall", {})
         
         stats_response = {
             "total_weather_stations": total_count,
             "unique_stations": station_count,
             "temperature_statistics": {
-                "min_temp": float(temp_stats[0]) if temp_stats[0] else 0,
-                "max_temp": float(temp_stats[1]) if temp_stats[1] else 0,
-                "avg_temp": float(temp_stats[2]) if temp_stats[2] else 0
+                "min_temp": float(temperature["min"]) if temperature.get("min") else 0,
+                "max_temp": float(temperature["max"]) if temperature.get("max") else 0,
+                "avg_temp": float(temperature["avg"]) if temperature.get("avg") else 0
             },
             "rainfall_statistics": {
-                "total_rainfall": float(rain_stats[0]) if rain_stats[0] else 0,
-                "avg_rainfall": float(rain_stats[1]) if rain_stats[1] else 0
+                "total_rainfall": float(rainfall["sum"]) if rainfall.get("sum") else 0,
+                "avg_rainfall": float(rainfall["avg"]) if rainfall.get("avg") else 0
             }
         }
         
@@ -1531,113 +1498,155 @@ def get_weather_stats():
             db.close()
 
 
+def _observation_rollups_response(dataset):
+    """Hourly/daily rollup buckets for ?granularity=hour|day&hours=N&metric=a,b"""
+    try:
+        granularity = request.args.get('granularity', 'hour')
+        hours = request.args.get('hours', 24 if granularity == 'hour' else 24 * 30, type=int)
+        metrics = [m for m in request.args.get('metric', '').split(',') if m] or None
+        if granularity not in ('hour', 'day'):
+            return jsonify({"error": "granularity must be 'hour' or 'day'"}), 400
+        
+        since = datetime.now(timezone.utc) - timedelta(hours=hours)
+        with _read_engine().connect() as conn:
+            buckets = get_observation_rollups(conn, dataset, granularity, since, metrics)
+        
+        return jsonify({
+            "dataset": dataset,
+            "granularity": granularity,
+            "since": since.isoformat(),
+            "buckets": buckets,
+            "count": len(buckets)
+        })
+        
+    except Exception as e:
+        print(f"❌ Error in {dataset} rollups: {e}")
+        print(f"📋 Traceback: {traceback.format_exc()}")
+        return jsonify({"error": str(e), "traceback": traceback.format_exc()}), 500
+
+
+@app.route("/api/weather-data/rollups", methods=["GET"])
+def get_weather_rollups():
+    """Hourly/daily weather aggregates for dashboard charts"""
+    return _observation_rollups_response("weather")
+
+
+@app.route("/api/seismic-data/rollups", methods=["GET"])
+def get_seismic_rollups():
+    """Hourly/daily seismic aggregates for dashboard charts"""
+    return _observation_rollups_response("earthquake")
+
+
+@app.route("/api/weather-data/cache-stats", methods=["GET"])
+def get_weather_cache_stats():
+    """Hit/miss/age metrics of the weather observation cache"""
+    cache = get_weather_cache()
+    if cache is None:
+        return jsonify({"enabled": False})
+    return jsonify({"enabled": True, **cache.stats()})
+
+
+@app.route("/api/hazard-exports", methods=["GET"])
+def get_hazard_exports():
+    """Manifests (feature count, layer version, file sizes) of the FlatGeobuf / GeoParquet exports"""
+    return jsonify({layer: load_export_manifest(layer) for layer in HAZARD_TABLES})
+
+
+@app.route("/api/db/replicas", methods=["GET"])
+def get_replica_status():
+    """Read replica lag and whether read-only endpoints are currently served by the primary"""
+    return jsonify(replica_router.status())
+
+
+@app.route("/api/http-cache/stats", methods=["GET"])
+def get_http_cache_stats():
+    """Size and hit/miss metrics of the pre-compressed hazard response cache"""
+    return jsonify(response_cache.stats())
+
+
 @app.route("/api/weather-data/frontend-cities", methods=["GET"])
 def get_frontend_cities_weather():
     """Get weather data for the specific Philippine cities listed in map-component.tsx"""
     db = None
     try:
         print("🗺️ Getting frontend cities weather data...")
-        db = SessionLocal()
+        db = _read_session()
         
-        # Exact coordinates from ClimaTechUser/components/map-component.tsx lines 29-39
+        # Featured gazetteer cities, in the order of ClimaTechUser/components/map-component.tsx
         frontend_cities = [
-            {"name": "Manila", "lat": 14.5995, "lng": 120.9842},
-            {"name": "Quezon City", "lat": 14.6760, "lng": 121.0437},
-            {"name": "Cebu City", "lat": 10.3157, "lng": 123.8854},
-            {"name": "Davao City", "lat": 7.1907, "lng": 125.4553},
-            {"name": "Iloilo City", "lat": 10.7202, "lng": 122.5621},
-            {"name": "Baguio", "lat": 16.4023, "lng": 120.5960},
-            {"name": "Zamboanga City", "lat": 6.9214, "lng": 122.0790},
-            {"name": "Cagayan de Oro", "lat": 8.4542, "lng": 124.6319},
-            {"name": "General Santos", "lat": 6.1164, "lng": 125.1716}
+            {"name": place["name"], "lat": place["latitude"], "lng": place["longitude"]}
+            for place in get_gazetteer().featured()
         ]
         
+        # One round trip: each city is LATERAL-joined to its freshest station in weather_latest
+        city_values = ", ".join(
+            f"(:name_{i}, :lat_{i}, :lng_{i}, {i})" for i in range(len(frontend_cities))
+        )
+        params = {}
+        for i, city in enumerate(frontend_cities):
+            params.update({f"name_{i}": city["name"], f"lat_{i}": city["lat"], f"lng_{i}": city["lng"]})
+
+        query = text(f"""
+            SELECT 
+                city.name,
+                latest.weather_data_id,
+                latest.station_name,
+                latest.temperature,
+                latest.humidity,
+                latest.rainfall,
+                latest.wind_speed,
+                latest.wind_direction,
+                latest.pressure,
+                latest.weather_metadata->>'description' as weather_condition,
+                latest.recorded_at
+            FROM (VALUES {city_values}) AS city(name, lat, lng, position)
+            LEFT JOIN LATERAL (
+                SELECT *
+                FROM weather_latest
+                WHERE ST_DWithin(
+                    geometry::geography, 
+                    ST_SetSRID(ST_Point(city.lng, city.lat), 4326)::geography, 
+                    5000  -- 5km radius
+                )
+                ORDER BY recorded_at DESC 
+                LIMIT 1
+            ) latest ON TRUE
+            ORDER BY city.position
+        """)
+        rows = {row[0]: row for row in db.execute(query, params).fetchall()}
+        
         cities_weather = []
         successful_cities = 0
         
         for city in frontend_cities:
-            try:
-                # Query weather data for this specific city location
-                query = text("""
-                    SELECT 
-                        id,
-                        station_name,
-                        temperature,
-                        humidity,
-                        rainfall,
-                        wind_speed,
-                        wind_direction,
-                        pressure,
-                        weather_metadata->>'description' as weather_condition,
-                        recorded_at,
-                        ST_X(geometry) as longitude,
-                        ST_Y(geometry) as latitude,
-                        created_at
-                    FROM weather_data 
-                    WHERE ST_DWithin(
-                        geometry::geography, 
-                        ST_SetSRID(ST_Point(:lng, :lat), 4326)::geography, 
-                        5000  -- 5km radius
-                    )
-                    ORDER BY created_at DESC 
-                    LIMIT 1
-                """)
-                
-                result = db.execute(query, {"lat": city["lat"], "lng": city["lng"]})
-                weather_row = result.fetchone()
-                
-                if weather_row:
-                    # Weather data found in database
-                    city_weather = {
-                        "id": weather_row[0],
-                        "city_name": city["name"],
-                        "station_name": weather_row[1],
-                        "coordinates": {
-                            "lat": city["lat"],
-                            "lng": city["lng"]
-                        },
-                        "temperature": weather_row[2],
-                        "humidity": weather_row[3],
-                        "rainfall": weather_row[4],
-                        "wind_speed": weather_row[5],
-                        "wind_direction": weather_row[6],
-                        "pressure": weather_row[7],
-                        "weather_condition": weather_row[8],
-                        "filipino_condition": weather_row[8],  # Filipino weather condition
-                        "recorded_at": weather_row[9].isoformat() if weather_row[9] else None,
-                        "data_source": "database",
-                        "status": "success"
-                    }
-                    successful_cities += 1
-                else:
-                    # No weather data found, return city info with placeholder
-                    city_weather = {
-                        "id": None,
-                        "city_name": city["name"],
-                        "station_name": f"{city['name']} Weather Station",
-                        "coordinates": {
-                            "lat": city["lat"],
-                            "lng": city["lng"]
-                        },
-                        "temperature": None,
-                        "humidity": None,
-                        "rainfall": None,
-                        "wind_speed": None,
-                        "wind_direction": None,
-                        "pressure": None,
-                        "weather_condition": "No data available",
-                        "filipino_condition": "No data available",
-                        "recorded_at": None,
-                        "data_source": "none",
-                        "status": "no_data"
-                    }
-                
-                cities_weather.append(city_weather)
-                
-            except Exception as city_error:
-                print(f"❌ Error processing {city['name']}: {city_error}")
-                # Add error entry for this city
-                cities_weather.append({
+            weather_row = rows.get(city["name"])
+            
+            if weather_row and weather_row[1] is not None:
+                # Weather data found in database
+                city_weather = {
+                    "id": weather_row[1],
+                    "city_name": city["name"],
+                    "station_name": weather_row[2],
+                    "coordinates": {
+                        "lat": city["lat"],
+                        "lng": city["lng"]
+                    },
+                    "temperature": weather_row[3],
+                    "humidity": weather_row[4],
+                    "rainfall": weather_row[5],
+                    "wind_speed": weather_row[6],
+                    "wind_direction": weather_row[7],
+                    "pressure": weather_row[8],
+                    "weather_condition": weather_row[9],
+                    "filipino_condition": weather_row[9],  # Filipino weather condition
+                    "recorded_at": weather_row[10].isoformat() if weather_row[10] else None,
+                    "data_source": "database",
+                    "status": "success"
+                }
+                successful_cities += 1
+            else:
+                # No weather data found, return city info with placeholder
+                city_weather = {
                     "id": None,
                     "city_name": city["name"],
                     "station_name": f"{city['name']} Weather Station",
@@ -1651,12 +1660,14 @@ def get_frontend_cities_weather():
                     "wind_speed": None,
                     "wind_direction": None,
                     "pressure": None,
-                    "weather_condition": "Error loading data",
-                    "filipino_condition": "Error loading data",
+                    "weather_condition": "No data available",
+                    "filipino_condition": "No data available",
                     "recorded_at": None,
-                    "data_source": "error",
-                    "status": "error"
-                })
+                    "data_source": "none",
+                    "status": "no_data"
+                }
+            
+            cities_weather.append(city_weather)
         
         response = {
             "cities": cities_weather,
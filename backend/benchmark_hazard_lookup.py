@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Benchmark point-in-hazard lookups
+Compares the original whole-MULTIPOLYGON query, the ST_Subdivide'd tables, and (if built)
+the precomputed hazard raster on the same random points inside the Philippines.
+
+Usage:
+    python benchmark_hazard_lookup.py [num_points] [seed]
+"""
+
+import random
+import statistics
+import sys
+import time
+from sqlalchemy import create_engine, text
+from config import DATABASE_URL
+
+# Bounding box used to sample points (min_lng, min_lat, max_lng, max_lat), roughly Luzon to Mindanao
+SAMPLE_BOUNDS = (119.5, 5.5, 126.5, 18.5)
+
+QUERIES = {
+    "original": """
+        SELECT MAX(risk_level) FROM {layer}_data
+        WHERE ST_Intersects(geometry, ST_SetSRID(ST_Point(:lng, :lat), 4326))
+    """,
+    "subdivided": """
+        SELECT MAX(risk_level) FROM {layer}_data_subdivided
+        WHERE ST_Intersects(geometry, ST_SetSRID(ST_Point(:lng, :lat), 4326))
+    """,
+}
+
+
+def sample_points(count: int, seed: int):
+    rng = random.Random(seed)
+    min_lng, min_lat, max_lng, max_lat = SAMPLE_BOUNDS
+    return [(rng.uniform(min_lat, max_lat), rng.uniform(min_lng, max_lng)) for _ in range(count)]
+
+
+def summarize(label: str, timings_ms):
+    timings_ms = sorted(timings_ms)
+    p95 = timings_ms[max(int(len(timings_ms) * 0.95) - 1, 0)]
+    print(f"  {label:<12} mean {statistics.mean(timings_ms):8.3f} ms   "
+          f"p50 {statistics.median(timings_ms):8.3f} ms   p95 {p95:8.3f} ms")
+
+
+def benchmark_layer(conn, layer: str, points):
+    print(f"\n🗺️ {layer} ({len(points)} points)")
+    results = {}
+
+    for label, sql in QUERIES.items():
+        query = text(sql.format(layer=layer))
+        conn.execute(query, {"lat": points[0][0], "lng": points[0][1]})  # warm-up
+        timings, values = [], []
+        for lat, lng in points:
+            start = time.perf_counter()
+            value = conn.execute(query, {"lat": lat, "lng": lng}).scalar()
+            timings.append((time.perf_counter() - start) * 1000.0)
+            values.append(float(value) if value is not None else None)
+        results[label] = values
+        summarize(label, timings)
+
+    mismatches = sum(1 for a, b in zip(results["original"], results["subdivided"]) if a != b)
+    if mismatches:
+        print(f"  ⚠️ subdivided differs from original on {mismatches} points (boundary cases)")
+    else:
+        print("  ✅ subdivided results match original")
+
+    try:
+        from db.hazard_raster import HazardRaster, RASTER_MISS
+        raster = HazardRaster.load(layer)
+    except Exception as e:
+        print(f"  ℹ️ raster skipped: {e}")
+        return
+    if raster is None:
+        print("  ℹ️ raster not built (python -m db.hazard_raster)")
+        return
+
+    query = text(QUERIES["subdivided"].format(layer=layer))
+    timings, fallbacks = [], 0
+    for lat, lng in points:
+        start = time.perf_counter()
+        value = raster.lookup(lat, lng)
+        if value is RASTER_MISS:
+            fallbacks += 1
+            conn.execute(query, {"lat": lat, "lng": lng}).scalar()
+        timings.append((time.perf_counter() - start) * 1000.0)
+    summarize("raster", timings)
+    print(f"  ↪️ {fallbacks}/{len(points)} raster lookups fell back to PostGIS")
+
+
+def main():
+    num_points = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    seed = int(sys.argv[2]) if len(sys.argv) > 2 else 42
+    points = sample_points(num_points, seed)
+
+    print("⏱️ Hazard point lookup benchmark")
+    engine = create_engine(DATABASE_URL)
+    with engine.connect() as conn:
+        for layer in ("flood", "landslide"):
+            count = conn.execute(text(f"SELECT COUNT(*) FROM {layer}_data_subdivided")).scalar()
+            if not count:
+                print(f"\n⚠️ {layer}_data_subdivided is empty; run: python -m ingest.post_ingestion {layer}")
+                continue
+            benchmark_layer(conn, layer, points)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Benchmark assistant intent detection
+Compares the original per-list `keyword in question` scans from enhanced_assistant (with the city
+scan extended to every gazetteer name) against the compiled IntentRouter plus the gazetteer's token
+trie on a mix of sample questions, and checks the greeting/developer/weather flags agree.
+
+The legacy city scan is linear in the number of places; set GAZETTEER_PATH to a full PSGC export
+to compare at real size (the bundled seed has only a few dozen places).
+
+Usage:
+    python benchmark_intent_router.py [iterations]
+"""
+
+import statistics
+import sys
+import time
+from ai.intent_router import DEVELOPER_KEYWORDS, GREETING_WORDS, WEATHER_KEYWORDS, get_intent_router, route_question
+from gazetteer.places import get_gazetteer
+
+FLAGS = ("is_greeting", "is_developer_question", "is_weather_question")
+
+SAMPLE_QUESTIONS = [
+    "hi",
+    "Good morning!",
+    "Who developed this assistant?",
+    "What is the weather in Cebu City today?",
+    "Is there heavy rainfall expected in Davao this week?",
+    "How strong is the wind in Zamboanga right now?",
+    "What should I prepare for a typhoon if I live near the coast in Iloilo?",
+    "Tell me about landslide hazards along the mountain roads going up to Baguio and the nearest evacuation centers",
+    "What are the flood risk zones in Quezon City and how can my barangay prepare before the rainy season starts?",
+    "Explain the difference between a tropical depression and a super typhoon.",
+]
+
+
+def legacy_route(question: str) -> dict:
+    """The checks enhanced_assistant ran before the intent router"""
+    question_lower = question.lower().strip()
+    detected_city = None
+    for place in get_gazetteer().places:
+        if place["name"].lower() in question_lower:
+            detected_city = {"name": place["name"], "coords": {"lat": place["latitude"], "lng": place["longitude"]}}
+            break
+    return {
+        "is_greeting": any(greeting in question_lower for greeting in GREETING_WORDS) and len(question.split()) <= 3,
+        "is_developer_question": any(keyword in question_lower for keyword in DEVELOPER_KEYWORDS),
+        "is_weather_question": any(keyword in question_lower for keyword in WEATHER_KEYWORDS),
+        "detected_city": detected_city,
+    }
+
+
+def time_per_call(func, iterations: int) -> list:
+    timings = []
+    for question in SAMPLE_QUESTIONS:
+        start = time.perf_counter()
+        for _ in range(iterations):
+            func(question)
+        timings.append((time.perf_counter() - start) / iterations * 1e6)
+    return timings
+
+
+def summarize(name: str, timings: list) -> None:
+    print(f"{name:>10}: mean {statistics.mean(timings):7.2f} µs  "
+          f"median {statistics.median(timings):7.2f} µs  max {max(timings):7.2f} µs")
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+
+    start = time.perf_counter()
+    get_intent_router()
+    print(f"🔧 Compiled intent router in {(time.perf_counter() - start) * 1000:.2f} ms")
+    print(f"🗺️ Matching against {len(get_gazetteer().places)} gazetteer places")
+
+    mismatches = 0
+    for question in SAMPLE_QUESTIONS:
+        routed, legacy = route_question(question), legacy_route(question)
+        if any(routed[flag] != legacy[flag] for flag in FLAGS):
+            mismatches += 1
+            print(f"❌ Mismatch for: {question!r}")
+    print(f"✅ {len(SAMPLE_QUESTIONS) - mismatches}/{len(SAMPLE_QUESTIONS)} questions classified identically")
+
+    print(f"📊 Per-question latency over {iterations} iterations:")
+    summarize("legacy", time_per_call(legacy_route, iterations))
+    summarize("router", time_per_call(route_question, iterations))
+
+
+if __name__ == "__main__":
+    main()
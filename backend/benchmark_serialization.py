@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Benchmark API response serialization
+Builds a synthetic hazard FeatureCollection (polygons as ST_AsGeoJSON strings) and compares:
+
+- current: json.loads each geometry, then encode the whole response with the stdlib (what jsonify did)
+- json:    serialization.dumps with the stdlib encoder and GeoJSON fragments passed through
+- orjson:  serialization.dumps with orjson and GeoJSON fragments passed through (if installed)
+
+Usage:
+    python benchmark_serialization.py [num_features] [vertices_per_polygon] [rounds]
+"""
+
+import json
+import math
+import random
+import statistics
+import sys
+import time
+
+from serialization import dumps, geojson_fragment, orjson
+
+
+def make_geometries(num_features: int, vertices: int) -> list:
+    """GeoJSON MultiPolygon strings with PostGIS-like 15-digit coordinates"""
+    geometries = []
+    for _ in range(num_features):
+        lng, lat = random.uniform(119.5, 126.5), random.uniform(5.5, 18.5)
+        ring = []
+        for k in range(vertices):
+            angle = 2 * math.pi * k / vertices
+            radius = random.uniform(0.001, 0.01)
+            ring.append([lng + radius * math.cos(angle), lat + radius * math.sin(angle)])
+        ring.append(ring[0])
+        geometries.append(json.dumps({"type": "MultiPolygon", "coordinates": [[ring]]}))
+    return geometries
+
+
+def build_response(geometries: list, wrap) -> dict:
+    features = [
+        {
+            "type": "Feature",
+            "geometry": wrap(geometry),
+            "properties": {"id": i, "risk_level": 2.0, "risk_category": "medium", "data_type": "flood"},
+        }
+        for i, geometry in enumerate(geometries)
+    ]
+    return {"type": "FeatureCollection", "features": features, "total": len(features)}
+
+
+def current_path(geometries: list) -> bytes:
+    response = build_response(geometries, json.loads)
+    return json.dumps(response, default=str, sort_keys=True).encode("utf-8")
+
+
+def time_runs(func, rounds: int) -> list:
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def summarize(name: str, timings: list, size: int) -> None:
+    print(f"{name:>8}: median {statistics.median(timings):8.1f} ms  "
+          f"min {min(timings):8.1f} ms  body {size / 1e6:6.2f} MB")
+
+
+def main():
+    num_features = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    vertices = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    rounds = int(sys.argv[3]) if len(sys.argv) > 3 else 5
+
+    random.seed(42)
+    geometries = make_geometries(num_features, vertices)
+    print(f"📦 {num_features} features x {vertices} vertices, {rounds} rounds")
+
+    candidates = {
+        "current": lambda: current_path(geometries),
+        "json": lambda: dumps(build_response(geometries, geojson_fragment), encoder="json"),
+    }
+    if orjson is not None:
+        candidates["orjson"] = lambda: dumps(build_response(geometries, geojson_fragment), encoder="orjson")
+    else:
+        print("⚠️ orjson not installed, skipping")
+
+    reference = json.loads(current_path(geometries))
+    for name, func in candidates.items():
+        body = func()
+        if json.loads(body) != reference:
+            print(f"❌ {name} output differs from the current path")
+        summarize(name, time_runs(func, rounds), len(body))
+
+
+if __name__ == "__main__":
+    main()
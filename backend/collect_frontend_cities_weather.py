@@ -12,6 +12,8 @@ from datetime import datetime
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from weather.weather_database import WeatherDatabaseManager
+from db.partitions import maintain_partitions
+from gazetteer.places import get_gazetteer
 
 
 def collect_frontend_cities_weather():
@@ -20,17 +22,10 @@ def collect_frontend_cities_weather():
     These cities match the frontend PHILIPPINE_CITIES array (lines 29-39)
     """
     
-    # Exact cities from ClimaTechUser/components/map-component.tsx lines 29-39
+    # Featured gazetteer cities, in the order of ClimaTechUser/components/map-component.tsx
     frontend_cities = [
-        (14.5995, 120.9842, "Manila Weather Station"),
-        (14.6760, 121.0437, "Quezon City Weather Station"),
-        (10.3157, 123.8854, "Cebu City Weather Station"),
-        (7.1907, 125.4553, "Davao City Weather Station"),
-        (10.7202, 122.5621, "Iloilo City Weather Station"),
-        (16.4023, 120.5960, "Baguio Weather Station"),
-        (6.9214, 122.0790, "Zamboanga City Weather Station"),
-        (8.4542, 124.6319, "Cagayan de Oro Weather Station"),
-        (6.1164, 125.1716, "General Santos Weather Station")
+        (place["latitude"], place["longitude"], f"{place['name']} Weather Station")
+        for place in get_gazetteer().featured()
     ]
     
     print("🗺️ Frontend Cities Weather Collection")
@@ -91,10 +86,10 @@ def verify_frontend_cities_data():
                     weather_metadata->>'description' as weather_condition,
                     ST_X(geometry) as longitude,
                     ST_Y(geometry) as latitude,
-                    created_at
-                FROM weather_data 
+                    recorded_at
+                FROM weather_latest 
                 WHERE station_name LIKE '%Weather Station'
-                ORDER BY created_at DESC;
+                ORDER BY recorded_at DESC;
             """))
             
             rows = result.fetchall()
@@ -151,6 +146,9 @@ def main():
     print("=" * 55)
     
     try:
+        # Make sure this month's weather_data partition exists before inserting
+        maintain_partitions()
+        
         # Collect weather data for frontend cities
         result = collect_frontend_cities_weather()
         
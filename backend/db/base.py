@@ -1,7 +1,14 @@
-from sqlalchemy import create_engine
+import threading
+import time
+
+from sqlalchemy import create_engine, text
 from sqlalchemy.orm import declarative_base, sessionmaker
-from config import DATABASE_URL
+from config import (
+    DATABASE_URL, DATABASE_REPLICA_URLS, REPLICA_MAX_LAG_SECONDS, REPLICA_LAG_CHECK_INTERVAL,
+    REPLICA_CONNECT_TIMEOUT,
+)
 
+# Primary: ingestion, migrations, protocol CRUD and anything else that writes
 engine = create_engine(DATABASE_URL, echo=False)
 SessionLocal = sessionmaker(bind=engine)
 Base = declarative_base()
@@ -9,6 +16,112 @@ Base = declarative_base()
 # Import models to ensure they are registered with SQLAlchemy
 from . import models
 
+# Seconds the replica is behind the primary; 0 when it is streaming from the primary and has replayed
+# everything it received (an idle primary must not look like lag) or when it is not a standby at all.
+# A standby whose WAL receiver is not streaming (disconnected, or restoring from the archive) cannot
+# know what the primary has written since, so it falls back to the age of its last replayed
+# transaction. NULL (nothing replayed yet) is treated as unusable.
+REPLICA_LAG_QUERY = """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN EXISTS (SELECT 1 FROM pg_stat_wal_receiver WHERE status = 'streaming')
+             AND pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())
+    END
+"""
+
+
+class ReplicaRouter:
+    """
+    Chooses the engine for read-only work: replicas in turn, skipping any that are unreachable or
+    more than max_lag_seconds behind, and the primary when none qualifies. Lag is measured at most
+    once per check_interval per replica, so routing adds no query to most requests.
+    """
+
+    def __init__(self, primary, replicas, max_lag_seconds: float, check_interval: float):
+        self.primary = primary
+        self.replicas = replicas
+        self.max_lag_seconds = max_lag_seconds
+        self.check_interval = check_interval
+        self._lag = {}  # replica index -> (checked_at, lag seconds or None)
+        self._lock = threading.Lock()
+        self._next = 0
+        self._on_primary = False
+
+    def _measure_lag(self, index: int):
+        try:
+            with self.replicas[index].connect() as conn:
+                lag = conn.execute(text(REPLICA_LAG_QUERY)).scalar()
+            return float(lag) if lag is not None else None
+        except Exception as e:
+            print(f"⚠️ Read replica {index} unavailable: {e}")
+            return None
+
+    def replica_lag(self, index: int):
+        """Cached lag of a replica in seconds (None = unreachable or unknown)"""
+        now = time.monotonic()
+        with self._lock:
+            checked_at, lag = self._lag.get(index, (None, None))
+            if checked_at is not None and now - checked_at < self.check_interval:
+                return lag
+            # Claim the check so concurrent requests keep using the previous value meanwhile
+            self._lag[index] = (now, lag)
+        lag = self._measure_lag(index)
+        with self._lock:
+            self._lag[index] = (time.monotonic(), lag)
+        return lag
+
+    def get_engine(self):
+        if not self.replicas:
+            return self.primary
+        with self._lock:
+            start = self._next
+            self._next = (self._next + 1) % len(self.replicas)
+        for offset in range(len(self.replicas)):
+            index = (start + offset) % len(self.replicas)
+            lag = self.replica_lag(index)
+            if lag is not None and lag <= self.max_lag_seconds:
+                if self._on_primary:
+                    print(f"✅ Read replica {index} back within {self.max_lag_seconds:.0f}s lag, routing reads to it")
+                    self._on_primary = False
+                return self.replicas[index]
+        if not self._on_primary:
+            print(f"⚠️ No read replica within {self.max_lag_seconds:.0f}s lag, reading from the primary")
+            self._on_primary = True
+        return self.primary
+
+    def status(self):
+        """Per-replica URL (password hidden), last measured lag and whether reads may use it"""
+        replicas = []
+        for index, replica in enumerate(self.replicas):
+            lag = self.replica_lag(index)
+            replicas.append({
+                "replica": index,
+                "url": replica.url.render_as_string(hide_password=True),
+                "lag_seconds": lag,
+                "in_rotation": lag is not None and lag <= self.max_lag_seconds,
+            })
+        return {"replicas": replicas, "max_lag_seconds": self.max_lag_seconds,
+                "reading_from_primary": not any(r["in_rotation"] for r in replicas)}
+
+
+replica_engines = [
+    create_engine(url, echo=False, pool_pre_ping=True,
+                  connect_args={"connect_timeout": REPLICA_CONNECT_TIMEOUT})
+    for url in DATABASE_REPLICA_URLS
+]
+replica_router = ReplicaRouter(engine, replica_engines, REPLICA_MAX_LAG_SECONDS, REPLICA_LAG_CHECK_INTERVAL)
+
+
+def get_read_engine():
+    """Engine for read-only queries: a replica within the lag limit, else the primary"""
+    return replica_router.get_engine()
+
+
+def ReadSessionLocal():
+    """Session for read-only work, bound to get_read_engine() (writes fail on a replica)"""
+    return SessionLocal(bind=get_read_engine())
+
 
 def create_tables():
     """Create all tables and enable PostGIS extension"""
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Binary exports of the hazard polygon layers
+Writes each hazard table as FlatGeobuf (with its packed Hilbert R-tree, so clients can fetch only the
+features in a bounding box with HTTP range requests) and GeoParquet (for analytics jobs), plus a
+small JSON manifest. Rebuilt after each flood/landslide ingestion (ingest/post_ingestion.py) and
+served as static files by /api/flood-data and /api/landslide-data with ?format=fgb|parquet.
+
+Usage:
+    python -m db.exports [flood|landslide]
+"""
+
+import json
+import os
+import sys
+import time
+from datetime import datetime
+from typing import Dict, Optional
+
+from sqlalchemy import text
+
+from config import HAZARD_EXPORTS_DIR
+
+HAZARD_TABLES = {
+    "flood": "flood_data",
+    "landslide": "landslide_data",
+}
+
+# ?format= value -> (file extension, mimetype)
+EXPORT_FORMATS = {
+    "fgb": ("fgb", "application/flatgeobuf"),
+    "flatgeobuf": ("fgb", "application/flatgeobuf"),
+    "parquet": ("parquet", "application/vnd.apache.parquet"),
+    "geoparquet": ("parquet", "application/vnd.apache.parquet"),
+}
+
+
+def export_path(layer: str, extension: str, exports_dir: Optional[str] = None) -> str:
+    """Path of a layer's export file (extension "fgb", "parquet" or "json" for the manifest)"""
+    return os.path.join(exports_dir or HAZARD_EXPORTS_DIR, f"{layer}.{extension}")
+
+
+def load_export_manifest(layer: str, exports_dir: Optional[str] = None) -> Optional[Dict]:
+    """Manifest of the last export, or None if the layer was never exported"""
+    try:
+        with open(export_path(layer, "json", exports_dir), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def rebuild_hazard_exports(layer: str, exports_dir: Optional[str] = None) -> Dict:
+    """
+    Export a hazard table to FlatGeobuf and GeoParquet
+
+    Args:
+        layer: "flood" or "landslide"
+        exports_dir: Output directory (default: HAZARD_EXPORTS_DIR)
+
+    Returns:
+        Export manifest dictionary
+    """
+    import geopandas as gpd
+    import shapely
+    from .base import engine
+
+    if layer not in HAZARD_TABLES:
+        raise ValueError(f"Unknown hazard layer '{layer}'. Use one of: {list(HAZARD_TABLES)}")
+
+    table = HAZARD_TABLES[layer]
+    exports_dir = exports_dir or HAZARD_EXPORTS_DIR
+    print(f"📦 Exporting {layer} layer to FlatGeobuf and GeoParquet...")
+    start_time = time.time()
+
+    ids, risk_levels, geometries = [], [], []
+    with engine.connect() as conn:
+        version = conn.execute(text("SELECT updated_at FROM layer_stats WHERE layer = :layer"),
+                               {"layer": layer}).scalar()
+        result = conn.execution_options(stream_results=True).execute(text(f"""
+            SELECT id, risk_level, ST_AsBinary(geometry)
+            FROM {table}
+            WHERE geometry IS NOT NULL
+            ORDER BY id
+        """))
+        for record_id, risk_level, geometry_wkb in result:
+            ids.append(record_id)
+            risk_levels.append(float(risk_level))
+            geometries.append(bytes(geometry_wkb))
+
+    frame = gpd.GeoDataFrame(
+        {"id": ids, "risk_level": risk_levels},
+        geometry=shapely.from_wkb(geometries),
+        crs="EPSG:4326",
+    )
+    del geometries
+
+    os.makedirs(exports_dir, exist_ok=True)
+    fgb_path = export_path(layer, "fgb", exports_dir)
+    parquet_path = export_path(layer, "parquet", exports_dir)
+    manifest_path = export_path(layer, "json", exports_dir)
+    # Keep the real extension on the temp files; GDAL picks behaviour from it
+    tmp_fgb_path = os.path.join(exports_dir, f".{layer}.tmp.fgb")
+    tmp_parquet_path = os.path.join(exports_dir, f".{layer}.tmp.parquet")
+
+    frame.to_file(tmp_fgb_path, driver="FlatGeobuf", layer=layer, SPATIAL_INDEX="YES")
+    frame.to_parquet(tmp_parquet_path, index=False, compression="zstd")
+
+    manifest = {
+        "layer": layer,
+        "table": table,
+        "feature_count": len(frame),
+        "layer_version": version.isoformat() if version else None,
+        "files": {
+            "fgb": {"path": os.path.basename(fgb_path), "bytes": os.path.getsize(tmp_fgb_path)},
+            "parquet": {"path": os.path.basename(parquet_path), "bytes": os.path.getsize(tmp_parquet_path)},
+        },
+        "built_at": datetime.now().isoformat(),
+    }
+    tmp_manifest_path = manifest_path + ".tmp"
+    with open(tmp_manifest_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+
+    # Swap the files in atomically so a client never downloads a half-written export
+    os.replace(tmp_fgb_path, fgb_path)
+    os.replace(tmp_parquet_path, parquet_path)
+    os.replace(tmp_manifest_path, manifest_path)
+
+    elapsed = time.time() - start_time
+    print(f"✅ {layer} exported ({manifest['feature_count']} features) in {elapsed:.1f}s: "
+          f"FlatGeobuf {manifest['files']['fgb']['bytes'] / 1e6:.1f} MB, "
+          f"GeoParquet {manifest['files']['parquet']['bytes'] / 1e6:.1f} MB")
+    return manifest
+
+
+if __name__ == "__main__":
+    for hazard_layer in ([sys.argv[1]] if len(sys.argv) > 1 else list(HAZARD_TABLES)):
+        rebuild_hazard_exports(hazard_layer)
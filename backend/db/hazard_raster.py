@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+"""
+Precomputed hazard lookup raster
+Rasterizes flood_data / landslide_data onto a regular grid over the Philippines so that
+point-in-hazard lookups become array indexing instead of ST_Intersects against large MULTIPOLYGONs.
+
+Each cell stores the maximum risk_level of the polygons that fully contain it (0.0 = no hazard).
+Cells crossed by a polygon boundary whose risk exceeds the interior value are marked BOUNDARY;
+lookups in those cells fall back to the exact PostGIS query.
+"""
+
+import json
+import math
+import os
+import sys
+import time
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import shapely
+from shapely import wkb
+from sqlalchemy import text
+
+from config import HAZARD_RASTER_DIR, HAZARD_RASTER_ENABLED, HAZARD_RASTER_RESOLUTION
+
+# (min_lng, min_lat, max_lng, max_lat) covering the whole archipelago
+PHILIPPINES_BOUNDS = (116.0, 4.0, 127.5, 21.5)
+
+HAZARD_TABLES = {
+    "flood": "flood_data",
+    "landslide": "landslide_data",
+}
+
+NO_HAZARD = 0.0
+BOUNDARY = -1.0
+
+# Returned by lookup_hazard_risk when the raster cannot answer and the exact query must run
+RASTER_MISS = object()
+
+# Number of raster rows rasterized at once per polygon (bounds memory for very large polygons)
+_ROW_BLOCK = 256
+
+_loaded_rasters: Dict[str, "HazardRaster"] = {}
+
+
+def _raster_paths(layer: str, raster_dir: Optional[str] = None) -> Tuple[str, str]:
+    raster_dir = raster_dir or HAZARD_RASTER_DIR
+    return (
+        os.path.join(raster_dir, f"{layer}_risk.npy"),
+        os.path.join(raster_dir, f"{layer}_risk.json"),
+    )
+
+
+class HazardRaster:
+    """Memory-mapped risk grid for a single hazard layer"""
+
+    def __init__(self, layer: str, values: np.ndarray, meta: Dict, mtime: float):
+        self.layer = layer
+        self.values = values
+        self.meta = meta
+        self.mtime = mtime
+        self.min_lng, self.min_lat, self.max_lng, self.max_lat = meta["bounds"]
+        self.resolution = meta["resolution"]
+        self.height, self.width = values.shape
+
+    @classmethod
+    def load(cls, layer: str, raster_dir: Optional[str] = None) -> Optional["HazardRaster"]:
+        """Open the raster for a layer read-only, or return None if it has not been built"""
+        values_path, meta_path = _raster_paths(layer, raster_dir)
+        if not (os.path.exists(values_path) and os.path.exists(meta_path)):
+            return None
+
+        with open(meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        values = np.load(values_path, mmap_mode="r")
+        return cls(layer, values, meta, os.path.getmtime(values_path))
+
+    def cell_index(self, latitude: float, longitude: float) -> Optional[Tuple[int, int]]:
+        """Return the (row, col) of the cell containing the point, or None if outside the grid"""
+        if not (self.min_lat <= latitude <= self.max_lat and self.min_lng <= longitude <= self.max_lng):
+            return None
+        row = min(int((latitude - self.min_lat) / self.resolution), self.height - 1)
+        col = min(int((longitude - self.min_lng) / self.resolution), self.width - 1)
+        return row, col
+
+    def lookup(self, latitude: float, longitude: float):
+        """Return the max risk at a point, None outside hazard zones, or RASTER_MISS if undecided"""
+        index = self.cell_index(latitude, longitude)
+        if index is None:
+            return RASTER_MISS
+
+        value = float(self.values[index])
+        if value == BOUNDARY:
+            return RASTER_MISS
+        if value == NO_HAZARD:
+            return None
+        return value
+
+
+def get_hazard_raster(layer: str) -> Optional[HazardRaster]:
+    """Return the cached raster for a layer, reopening it when a rebuild replaced the file"""
+    values_path, _ = _raster_paths(layer)
+    cached = _loaded_rasters.get(layer)
+
+    try:
+        current_mtime = os.path.getmtime(values_path)
+    except OSError:
+        _loaded_rasters.pop(layer, None)
+        return None
+
+    if cached is None or cached.mtime != current_mtime:
+        cached = HazardRaster.load(layer)
+        if cached is None:
+            _loaded_rasters.pop(layer, None)
+            return None
+        _loaded_rasters[layer] = cached
+
+    return cached
+
+
+def lookup_hazard_risk(layer: str, latitude: float, longitude: float):
+    """
+    Look up the max risk_level for a point from the precomputed raster
+
+    Returns:
+        float risk level, None when the point is outside all hazard zones, or RASTER_MISS when the
+        raster is disabled/missing, the point is outside the grid, or the cell sits on a boundary
+    """
+    if not HAZARD_RASTER_ENABLED:
+        return RASTER_MISS
+
+    try:
+        raster = get_hazard_raster(layer)
+    except Exception as e:
+        print(f"⚠️ Could not open {layer} hazard raster: {e}")
+        return RASTER_MISS
+
+    if raster is None:
+        return RASTER_MISS
+    return raster.lookup(latitude, longitude)
+
+
+def _burn_polygon(geometry, risk_level: float, interior: np.ndarray, edge: np.ndarray,
+                  bounds: Tuple[float, float, float, float], resolution: float):
+    """Rasterize one polygon into the interior / edge max-risk grids"""
+    min_lng, min_lat, _, _ = bounds
+    height, width = interior.shape
+
+    g_min_lng, g_min_lat, g_max_lng, g_max_lat = geometry.bounds
+    col_start = max(int(math.floor((g_min_lng - min_lng) / resolution)), 0)
+    col_end = min(int(math.floor((g_max_lng - min_lng) / resolution)) + 1, width)
+    row_start = max(int(math.floor((g_min_lat - min_lat) / resolution)), 0)
+    row_end = min(int(math.floor((g_max_lat - min_lat) / resolution)) + 1, height)
+    if col_start >= col_end or row_start >= row_end:
+        return
+
+    boundary = geometry.boundary
+    shapely.prepare(geometry)
+    shapely.prepare(boundary)
+
+    cols = np.arange(col_start, col_end)
+    cell_min_x = min_lng + cols * resolution
+
+    for block_start in range(row_start, row_end, _ROW_BLOCK):
+        block_end = min(block_start + _ROW_BLOCK, row_end)
+        rows = np.arange(block_start, block_end)
+        cell_min_y = min_lat + rows * resolution
+
+        xs, ys = np.meshgrid(cell_min_x, cell_min_y)
+        boxes = shapely.box(xs, ys, xs + resolution, ys + resolution)
+
+        crosses = shapely.intersects(boundary, boxes)
+        centers_inside = shapely.contains_xy(geometry, xs + resolution / 2.0, ys + resolution / 2.0)
+        fully_inside = centers_inside & ~crosses
+
+        interior_block = interior[block_start:block_end, col_start:col_end]
+        edge_block = edge[block_start:block_end, col_start:col_end]
+        np.maximum(interior_block, np.where(fully_inside, risk_level, NO_HAZARD), out=interior_block)
+        np.maximum(edge_block, np.where(crosses, risk_level, NO_HAZARD), out=edge_block)
+
+
+def rebuild_hazard_raster(layer: str, resolution: Optional[float] = None,
+                          bounds: Tuple[float, float, float, float] = PHILIPPINES_BOUNDS,
+                          raster_dir: Optional[str] = None) -> Dict:
+    """
+    Rasterize a hazard table into a memory-mapped NumPy grid
+
+    Args:
+        layer: "flood" or "landslide"
+        resolution: Cell size in degrees (default: HAZARD_RASTER_RESOLUTION)
+        bounds: Grid extent as (min_lng, min_lat, max_lng, max_lat)
+        raster_dir: Output directory (default: HAZARD_RASTER_DIR)
+
+    Returns:
+        Raster metadata dictionary
+    """
+    from .base import engine
+
+    if layer not in HAZARD_TABLES:
+        raise ValueError(f"Unknown hazard layer '{layer}'. Use one of: {list(HAZARD_TABLES)}")
+
+    table = HAZARD_TABLES[layer]
+    resolution = resolution or HAZARD_RASTER_RESOLUTION
+    raster_dir = raster_dir or HAZARD_RASTER_DIR
+    min_lng, min_lat, max_lng, max_lat = bounds
+    width = int(math.ceil((max_lng - min_lng) / resolution))
+    height = int(math.ceil((max_lat - min_lat) / resolution))
+
+    print(f"🗺️ Building {layer} hazard raster ({width}x{height} cells at {resolution}°)...")
+    start_time = time.time()
+
+    interior = np.zeros((height, width), dtype=np.float32)
+    edge = np.zeros((height, width), dtype=np.float32)
+    feature_count = 0
+
+    query = text(f"""
+        SELECT risk_level, ST_AsBinary(geometry)
+        FROM {table}
+        WHERE geometry && ST_MakeEnvelope(:min_lng, :min_lat, :max_lng, :max_lat, 4326)
+    """)
+    with engine.connect() as conn:
+        result = conn.execution_options(stream_results=True).execute(query, {
+            "min_lng": min_lng, "min_lat": min_lat, "max_lng": max_lng, "max_lat": max_lat,
+        })
+        for risk_level, geometry_wkb in result:
+            if risk_level is None or geometry_wkb is None:
+                continue
+            geometry = wkb.loads(bytes(geometry_wkb))
+            if geometry.is_empty:
+                continue
+            _burn_polygon(geometry, float(risk_level), interior, edge, bounds, resolution)
+            feature_count += 1
+            if feature_count % 1000 == 0:
+                print(f"  🔄 Rasterized {feature_count} features...")
+
+    values = np.where(edge > interior, np.float32(BOUNDARY), interior)
+
+    os.makedirs(raster_dir, exist_ok=True)
+    values_path, meta_path = _raster_paths(layer, raster_dir)
+    tmp_values_path = values_path + ".tmp.npy"
+    tmp_meta_path = meta_path + ".tmp"
+
+    mapped = np.lib.format.open_memmap(tmp_values_path, mode="w+", dtype=np.float32, shape=values.shape)
+    mapped[:] = values
+    mapped.flush()
+    del mapped
+
+    meta = {
+        "layer": layer,
+        "table": table,
+        "bounds": list(bounds),
+        "resolution": resolution,
+        "shape": [height, width],
+        "feature_count": feature_count,
+        "boundary_cells": int(np.count_nonzero(values == BOUNDARY)),
+        "hazard_cells": int(np.count_nonzero(values > NO_HAZARD)),
+        "built_at": datetime.now().isoformat(),
+    }
+    with open(tmp_meta_path, "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2)
+
+    # Swap the files in atomically so readers never see a half-written raster
+    os.replace(tmp_meta_path, meta_path)
+    os.replace(tmp_values_path, values_path)
+    _loaded_rasters.pop(layer, None)
+
+    elapsed = time.time() - start_time
+    print(f"✅ {layer} hazard raster built from {feature_count} features in {elapsed:.1f}s")
+    print(f"   Hazard cells: {meta['hazard_cells']}, boundary cells (exact fallback): {meta['boundary_cells']}")
+    return meta
+
+
+if __name__ == "__main__":
+    """Rebuild the hazard rasters: python -m db.hazard_raster [flood|landslide] [resolution]"""
+    layers = [sys.argv[1]] if len(sys.argv) > 1 else list(HAZARD_TABLES)
+    cli_resolution = float(sys.argv[2]) if len(sys.argv) > 2 else None
+    for hazard_layer in layers:
+        rebuild_hazard_raster(hazard_layer, resolution=cli_resolution)
@@ -0,0 +1,345 @@
+#!/usr/bin/env python3
+"""
+Index management for the hazard schema
+Indexes are declared on the models (__table_args__); this module builds any that are missing on
+an existing database without blocking writes, and checks with EXPLAIN that the hot queries use them.
+
+Partitioned tables (weather_data, earthquake_data) cannot take CREATE INDEX CONCURRENTLY, so their
+indexes are built per partition and attached to an index created ON ONLY the parent. EXPLAIN on them
+names the partition indexes, which are mapped back to the parent index for the check.
+
+Usage:
+    python -m db.indexes ensure     # CREATE INDEX CONCURRENTLY for missing/invalid indexes
+    python -m db.indexes check      # EXPLAIN the hot queries and report the indexes they use
+"""
+
+import json
+import sys
+from datetime import datetime, timedelta
+from typing import Dict, List, Set
+
+from geoalchemy2 import Geometry
+from sqlalchemy import bindparam, select, text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.schema import CreateIndex
+
+from .base import Base, engine
+from .models import EarthquakeData, FloodData, WeatherData
+from .partitions import PARTITIONED_TABLES, list_partitions
+from .queries import (
+    LANDSLIDE_NEARBY_SQL, NEAREST_RECENT_WEATHER_SQL, POINT_PARAM_SQL,
+    RECENT_EARTHQUAKES_NEARBY_SQL, hazard_risk_at_point_sql,
+)
+
+# Representative point in Metro Manila used for EXPLAIN parameters
+_SAMPLE_POINT = {"lat": 14.5995, "lng": 120.9842}
+
+
+def _orm_sql(statement) -> str:
+    """Render a select() with :name placeholders, as text() expects"""
+    return str(statement.compile(dialect=postgresql.dialect(paramstyle="named")))
+
+
+# Hot queries with the indexes each is expected to use (any one of the listed indexes appearing
+# in the plan counts as a pass). The SQL is taken from db/queries.py, or built from the same model
+# columns its ORM queries filter on, so the check follows the queries instead of copies of them.
+HOT_QUERIES = [
+    {
+        "name": "flood risk at point",
+        "sql": f"SELECT {hazard_risk_at_point_sql('flood', POINT_PARAM_SQL)}",
+        "params": _SAMPLE_POINT,
+        "expected": ["idx_flood_data_subdivided_geometry"],
+    },
+    {
+        "name": "landslide risk at point",
+        "sql": f"SELECT {hazard_risk_at_point_sql('landslide', POINT_PARAM_SQL)}",
+        "params": _SAMPLE_POINT,
+        "expected": ["idx_landslide_data_subdivided_geometry"],
+    },
+    {
+        "name": "landslide zones nearby",
+        "sql": LANDSLIDE_NEARBY_SQL,
+        "params": dict(_SAMPLE_POINT, radius_meters=50000.0),
+        "expected": ["ix_landslide_data_subdivided_geography"],
+    },
+    {
+        "name": "recent earthquakes nearby",
+        "sql": RECENT_EARTHQUAKES_NEARBY_SQL,
+        "params": dict(_SAMPLE_POINT, cutoff=None, max_meters=100000.0),
+        "expected": ["ix_earthquake_data_geography", "ix_earthquake_data_event_time_brin"],
+    },
+    {
+        "name": "earthquakes by magnitude",
+        "sql": _orm_sql(select(EarthquakeData.id).where(EarthquakeData.magnitude >= bindparam("min_magnitude"))),
+        "params": {"min_magnitude": 4.0},
+        "expected": ["ix_earthquake_data_magnitude_event_time"],
+    },
+    {
+        "name": "nearest recent weather",
+        "sql": NEAREST_RECENT_WEATHER_SQL,
+        "params": dict(_SAMPLE_POINT, cutoff=None, max_meters=100000.0),
+        "expected": ["ix_weather_latest_geography"],
+    },
+    {
+        "name": "recent weather data",
+        "sql": _orm_sql(
+            select(WeatherData.id)
+            .where(WeatherData.recorded_at >= bindparam("cutoff"))
+            .order_by(WeatherData.recorded_at.desc())
+        ),
+        "params": {"cutoff": None},
+        "expected": ["ix_weather_data_recorded_at_brin"],
+    },
+    {
+        "name": "latest weather for station",
+        "sql": _orm_sql(
+            select(WeatherData.id)
+            .where(WeatherData.station_name == bindparam("station"))
+            .order_by(WeatherData.recorded_at.desc())
+            .limit(1)
+        ),
+        "params": {"station": "Manila"},
+        "expected": ["ix_weather_data_station_recorded_at"],
+    },
+    {
+        "name": "flood data by risk",
+        "sql": _orm_sql(select(FloodData.id).where(FloodData.risk_level >= bindparam("min_risk"))),
+        "params": {"min_risk": 2.0},
+        "expected": ["ix_flood_data_risk_level"],
+    },
+]
+
+
+def _spatial_index_ddl(table) -> List[Dict]:
+    """GiST indexes geoalchemy2 creates for Geometry columns, named the same way it names them"""
+    statements = []
+    for column in table.columns:
+        if isinstance(column.type, Geometry):
+            statements.append({
+                "name": f"idx_{table.name}_{column.name}",
+                "table": table.name,
+                "ddl": f"CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_{table.name}_{column.name} "
+                       f"ON {table.name} USING gist ({column.name})",
+            })
+    return statements
+
+
+def managed_indexes() -> List[Dict]:
+    """Return name, table and online-safe DDL for every index declared on the models"""
+    dialect = postgresql.dialect()
+    indexes = {}
+
+    for table in Base.metadata.sorted_tables:
+        for statement in _spatial_index_ddl(table):
+            indexes[statement["name"]] = statement
+
+        for index in sorted(table.indexes, key=lambda i: i.name):
+            ddl = str(CreateIndex(index).compile(dialect=dialect)).strip()
+            ddl = ddl.replace("CREATE INDEX", "CREATE INDEX CONCURRENTLY IF NOT EXISTS", 1)
+            ddl = ddl.replace("CREATE UNIQUE INDEX", "CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS", 1)
+            indexes[index.name] = {"name": index.name, "table": table.name, "ddl": ddl}
+
+    return list(indexes.values())
+
+
+def _partition_index_name(name: str, table: str, partition: str) -> str:
+    """ix_weather_data_geography -> ix_weather_data_p202501_geography (63-character identifier limit)"""
+    return name.replace(table, partition, 1)[:63]
+
+
+def _attached_partitions(conn, parent_index: str) -> Set[str]:
+    """Partitions whose index is already attached to a partitioned parent index"""
+    return set(conn.execute(text("""
+        SELECT t.relname
+        FROM pg_inherits i
+        JOIN pg_class p ON p.oid = i.inhparent
+        JOIN pg_index x ON x.indexrelid = i.inhrelid
+        JOIN pg_class t ON t.oid = x.indrelid
+        WHERE p.relname = :index
+    """), {"index": parent_index}).scalars().all())
+
+
+def _ensure_partitioned_index(conn, index: Dict, index_state: Dict[str, bool], verbose: bool) -> str:
+    """
+    Build a declared index on a partitioned table without blocking writes
+
+    The parent index is created ON ONLY the parent (metadata only, invalid at first); each partition
+    gets its own CONCURRENTLY-built index, which is then attached. Once every partition is attached
+    Postgres marks the parent index valid. An interrupted run resumes with the unattached partitions.
+
+    Returns:
+        Summary key: "existing", "created" or "rebuilt"
+    """
+    name, table, ddl = index["name"], index["table"], index["ddl"]
+    if index_state.get(name):
+        return "existing"
+
+    if name in index_state:
+        status = "rebuilt"
+        if verbose:
+            print(f"🔧 Resuming partitioned index {name} on {table}...")
+    else:
+        status = "created"
+        if verbose:
+            print(f"🔨 Creating partitioned index {name} on {table}...")
+        parent_ddl = ddl.replace(" CONCURRENTLY", "", 1).replace(f" ON {table} ", f" ON ONLY {table} ", 1)
+        conn.execute(text(parent_ddl))
+
+    attached = _attached_partitions(conn, name)
+    for partition in list_partitions(conn, table):
+        partition_table = partition["name"]
+        if partition_table in attached:
+            continue
+        child = _partition_index_name(name, table, partition_table)
+        if child in index_state and not index_state[child]:
+            conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {child}"))
+        if not index_state.get(child):
+            if verbose:
+                print(f"   🔨 {child} on {partition_table}...")
+            conn.execute(text(ddl.replace(f" {name} ON {table} ", f" {child} ON {partition_table} ", 1)))
+        conn.execute(text(f"ALTER INDEX {name} ATTACH PARTITION {child}"))
+    return status
+
+
+def ensure_indexes(verbose: bool = True) -> Dict[str, int]:
+    """
+    Build any declared index that is missing, without taking write locks
+
+    CREATE INDEX CONCURRENTLY cannot run in a transaction, so this uses an AUTOCOMMIT connection.
+    An interrupted concurrent build leaves an INVALID index that IF NOT EXISTS would skip,
+    so invalid indexes are dropped and rebuilt.
+    """
+    summary = {"created": 0, "rebuilt": 0, "existing": 0, "failed": 0}
+
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        existing_tables = {
+            row[0] for row in conn.execute(text(
+                "SELECT tablename FROM pg_tables WHERE schemaname = current_schema()"
+            ))
+        }
+        index_state = {
+            row[0]: row[1] for row in conn.execute(text("""
+                SELECT c.relname, i.indisvalid
+                FROM pg_index i
+                JOIN pg_class c ON c.oid = i.indexrelid
+                JOIN pg_namespace n ON n.oid = c.relnamespace
+                WHERE n.nspname = current_schema()
+            """))
+        }
+
+        for index in managed_indexes():
+            if index["table"] not in existing_tables:
+                continue
+
+            name = index["name"]
+            try:
+                if index["table"] in PARTITIONED_TABLES:
+                    summary[_ensure_partitioned_index(conn, index, index_state, verbose)] += 1
+                    continue
+
+                if name in index_state and index_state[name]:
+                    summary["existing"] += 1
+                    continue
+
+                if name in index_state:
+                    if verbose:
+                        print(f"🔧 Rebuilding invalid index {name}...")
+                    conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {name}"))
+                    summary["rebuilt"] += 1
+                else:
+                    if verbose:
+                        print(f"🔨 Creating index {name} on {index['table']}...")
+                    summary["created"] += 1
+
+                conn.execute(text(index["ddl"]))
+            except Exception as e:
+                summary["failed"] += 1
+                print(f"❌ Failed to build index {name}: {e}")
+
+    if verbose:
+        print(f"✅ Indexes: {summary['created']} created, {summary['rebuilt']} rebuilt, "
+              f"{summary['existing']} already present, {summary['failed']} failed")
+    return summary
+
+
+def _plan_index_names(plan_node: Dict) -> Set[str]:
+    names = set()
+    if "Index Name" in plan_node:
+        names.add(plan_node["Index Name"])
+    for child in plan_node.get("Plans", []):
+        names |= _plan_index_names(child)
+    return names
+
+
+def _partition_index_parents(conn) -> Dict[str, Set[str]]:
+    """Partition index name -> names of the partitioned indexes it is attached to"""
+    parents: Dict[str, Set[str]] = {}
+    for child, ancestor in conn.execute(text("""
+        SELECT c.relname, a.relname
+        FROM pg_class c
+        JOIN pg_namespace n ON n.oid = c.relnamespace
+        CROSS JOIN LATERAL pg_partition_ancestors(c.oid) AS pa(relid)
+        JOIN pg_class a ON a.oid = pa.relid
+        WHERE c.relkind = 'i' AND c.relispartition
+          AND n.nspname = current_schema() AND a.oid <> c.oid
+    """)):
+        parents.setdefault(child, set()).add(ancestor)
+    return parents
+
+
+def check_index_usage(force_index: bool = True) -> bool:
+    """
+    EXPLAIN each hot query and verify it can use one of its expected indexes
+
+    Args:
+        force_index: Disable sequential scans for the check. Small development tables are
+            cheaper to scan, so this verifies the index is usable rather than chosen today.
+
+    Returns:
+        True if every hot query uses an expected index
+    """
+    all_ok = True
+    cutoff = datetime.now() - timedelta(hours=24)
+
+    with engine.connect() as conn:
+        partition_index_parents = _partition_index_parents(conn)
+        conn.commit()
+        for hot_query in HOT_QUERIES:
+            params = {k: (cutoff if k == "cutoff" else v) for k, v in hot_query["params"].items()}
+            with conn.begin():
+                if force_index:
+                    conn.execute(text("SET LOCAL enable_seqscan = off"))
+                try:
+                    row = conn.execute(text("EXPLAIN (FORMAT JSON) " + hot_query["sql"]), params).fetchone()
+                except Exception as e:
+                    print(f"  ❌ {hot_query['name']}: EXPLAIN failed: {e}")
+                    all_ok = False
+                    continue
+
+            plan = row[0] if isinstance(row[0], list) else json.loads(row[0])
+            used = _plan_index_names(plan[0]["Plan"])
+            # Plans over partitioned tables name each partition's index; credit its parent index
+            for name in list(used):
+                used |= partition_index_parents.get(name, set())
+            matched = used & set(hot_query["expected"])
+
+            if matched:
+                print(f"  ✅ {hot_query['name']}: {', '.join(sorted(matched))}")
+            else:
+                all_ok = False
+                print(f"  ❌ {hot_query['name']}: expected one of {hot_query['expected']}, "
+                      f"plan uses {sorted(used) or 'no index'}")
+
+    return all_ok
+
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else "check"
+    if command == "ensure":
+        ensure_indexes()
+    elif command == "check":
+        print("🔍 Checking index usage of hot queries...")
+        sys.exit(0 if check_index_usage() else 1)
+    else:
+        print("Usage: python -m db.indexes [ensure|check]")
+        sys.exit(1)
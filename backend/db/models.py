@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, Text, Float, DateTime, String, JSON
+from sqlalchemy import Column, Integer, BigInteger, Text, Float, DateTime, String, JSON, Index, text
 from geoalchemy2 import Geometry
 from sqlalchemy.sql import func
 from .base import Base
@@ -10,6 +10,23 @@ class FloodData(Base):
     geometry = Column(Geometry('MULTIPOLYGON', srid=4326), nullable=False)
     risk_level = Column(Float, nullable=False)  # 1-3 scale for flood risk
 
+    __table_args__ = (
+        Index("ix_flood_data_risk_level", "risk_level"),
+    )
+
+
+class FloodDataSubdivided(Base):
+    """flood_data split with ST_Subdivide so index candidates have tight bounding boxes"""
+    __tablename__ = "flood_data_subdivided"
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    source_id = Column(Integer, nullable=False, index=True)  # flood_data.id
+    geometry = Column(Geometry('POLYGON', srid=4326), nullable=False)
+    risk_level = Column(Float, nullable=False)
+
+    __table_args__ = (
+        Index("ix_flood_data_subdivided_geography", text("(geometry::geography)"), postgresql_using="gist"),
+    )
+
 
 class EarthquakeData(Base):
     __tablename__ = "earthquake_data"
@@ -17,11 +34,19 @@ class EarthquakeData(Base):
     geometry = Column(Geometry('POINT', srid=4326), nullable=False)
     magnitude = Column(Float, nullable=False)
     depth = Column(Float, nullable=True)  # Depth in kilometers
-    event_time = Column(DateTime(timezone=True), nullable=True)
+    # Partition key (monthly RANGE partitions, see db/partitions.py); part of the primary key
+    event_time = Column(DateTime(timezone=True), primary_key=True, nullable=False, server_default=func.now())
     location_name = Column(String(255), nullable=True)
     source = Column(String(100), nullable=True)  # e.g., 'PHIVOLCS', 'USGS'
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
+    __table_args__ = (
+        Index("ix_earthquake_data_event_time_brin", "event_time", postgresql_using="brin"),
+        Index("ix_earthquake_data_magnitude_event_time", "magnitude", "event_time"),
+        Index("ix_earthquake_data_geography", text("(geometry::geography)"), postgresql_using="gist"),
+        {"postgresql_partition_by": "RANGE (event_time)"},
+    )
+
 
 class LandslideData(Base):
     __tablename__ = "landslide_data"
@@ -29,6 +54,23 @@ class LandslideData(Base):
     geometry = Column(Geometry('MULTIPOLYGON', srid=4326), nullable=False)
     risk_level = Column(Float, nullable=False)  # 1-3 scale for landslide risk
 
+    __table_args__ = (
+        Index("ix_landslide_data_risk_level", "risk_level"),
+    )
+
+
+class LandslideDataSubdivided(Base):
+    """landslide_data split with ST_Subdivide so index candidates have tight bounding boxes"""
+    __tablename__ = "landslide_data_subdivided"
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    source_id = Column(Integer, nullable=False, index=True)  # landslide_data.id
+    geometry = Column(Geometry('POLYGON', srid=4326), nullable=False)
+    risk_level = Column(Float, nullable=False)
+
+    __table_args__ = (
+        Index("ix_landslide_data_subdivided_geography", text("(geometry::geography)"), postgresql_using="gist"),
+    )
+
 
 class WeatherData(Base):
     __tablename__ = "weather_data"
@@ -41,11 +83,93 @@ class WeatherData(Base):
     wind_direction = Column(Float, nullable=True)
     pressure = Column(Float, nullable=True)
     station_name = Column(String(255), nullable=True)
-    recorded_at = Column(DateTime(timezone=True), nullable=True)
+    # Partition key (monthly RANGE partitions, see db/partitions.py); part of the primary key
+    recorded_at = Column(DateTime(timezone=True), primary_key=True, nullable=False, server_default=func.now())
     source = Column(String(100), nullable=True)  # e.g., 'PAGASA', 'weather_station'
     weather_metadata = Column(JSON, nullable=True)  # Additional data like Filipino weather conditions
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
+    __table_args__ = (
+        Index("ix_weather_data_recorded_at_brin", "recorded_at", postgresql_using="brin"),
+        Index("ix_weather_data_created_at_brin", "created_at", postgresql_using="brin"),
+        Index("ix_weather_data_station_recorded_at", station_name, recorded_at.desc()),
+        Index("ix_weather_data_geography", text("(geometry::geography)"), postgresql_using="gist"),
+        {"postgresql_partition_by": "RANGE (recorded_at)"},
+    )
+
+
+class WeatherLatest(Base):
+    """Most recent observation per station, upserted in the same transaction as each weather_data insert"""
+    __tablename__ = "weather_latest"
+    station_name = Column(String(255), primary_key=True)
+    weather_data_id = Column(Integer, nullable=False)  # weather_data.id of the observation
+    geometry = Column(Geometry('POINT', srid=4326), nullable=False)
+    temperature = Column(Float, nullable=True)
+    humidity = Column(Float, nullable=True)
+    rainfall = Column(Float, nullable=True)
+    wind_speed = Column(Float, nullable=True)
+    wind_direction = Column(Float, nullable=True)
+    pressure = Column(Float, nullable=True)
+    recorded_at = Column(DateTime(timezone=True), nullable=False)
+    source = Column(String(100), nullable=True)
+    weather_metadata = Column(JSON, nullable=True)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    __table_args__ = (
+        Index("ix_weather_latest_geography", text("(geometry::geography)"), postgresql_using="gist"),
+        Index("ix_weather_latest_recorded_at", "recorded_at"),
+    )
+
+
+class WeatherDataHourly(Base):
+    """Hourly per-station downsample of weather_data partitions past raw retention"""
+    __tablename__ = "weather_data_hourly"
+    station_name = Column(String(255), primary_key=True)
+    bucket_start = Column(DateTime(timezone=True), primary_key=True)
+    geometry = Column(Geometry('POINT', srid=4326), nullable=False)
+    avg_temperature = Column(Float, nullable=True)
+    avg_humidity = Column(Float, nullable=True)
+    total_rainfall = Column(Float, nullable=True)
+    max_rainfall = Column(Float, nullable=True)
+    avg_wind_speed = Column(Float, nullable=True)
+    max_wind_speed = Column(Float, nullable=True)
+    avg_pressure = Column(Float, nullable=True)
+    sample_count = Column(Integer, nullable=False)
+
+    __table_args__ = (
+        Index("ix_weather_data_hourly_bucket_start_brin", "bucket_start", postgresql_using="brin"),
+    )
+
+
+class ObservationRollup(Base):
+    """
+    Hourly/daily/all-time aggregates of weather_data and earthquake_data, maintained by
+    statement-level insert triggers (see db/rollups.py)
+    """
+    __tablename__ = "observation_rollups"
+    dataset = Column(String(32), primary_key=True)  # "weather" | "earthquake"
+    granularity = Column(String(8), primary_key=True)  # "hour" | "day" | "all"
+    bucket_start = Column(DateTime(timezone=True), primary_key=True)  # epoch for "all"
+    metric = Column(String(64), primary_key=True)  # e.g. "rows", "temperature", "magnitude_category"
+    dimension = Column(String(64), primary_key=True, server_default="")  # e.g. magnitude category
+    sample_count = Column(BigInteger, nullable=False)
+    value_sum = Column(Float, nullable=True)
+    value_min = Column(Float, nullable=True)
+    value_max = Column(Float, nullable=True)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+class LayerStats(Base):
+    """Summary statistics for a hazard polygon layer, recomputed after each ingestion"""
+    __tablename__ = "layer_stats"
+    layer = Column(String(32), primary_key=True)  # "flood" | "landslide"
+    total_count = Column(BigInteger, nullable=False)
+    min_risk = Column(Float, nullable=True)
+    max_risk = Column(Float, nullable=True)
+    avg_risk = Column(Float, nullable=True)
+    risk_distribution = Column(JSON, nullable=False)  # [{"risk_level": 1.0, "count": 10}, ...]
+    updated_at = Column(DateTime(timezone=True), server_default=func.now())
+
 
 class EmergencyProtocol(Base):
     __tablename__ = "emergency_protocol"
@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+"""
+Monthly RANGE partitions for weather_data (recorded_at) and earthquake_data (event_time)
+
+Each parent table has one partition per calendar month plus a DEFAULT partition that catches rows
+outside the pre-created range (so inserts never fail). Retention downsamples expired weather
+partitions into weather_data_hourly and then drops them, which is a metadata operation instead of
+a large DELETE.
+
+Usage:
+    python -m db.partitions maintain     # create upcoming partitions
+    python -m db.partitions retention    # downsample/drop expired partitions
+    python -m db.partitions list
+"""
+
+import sys
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+from sqlalchemy import text
+
+from config import (
+    PARTITION_MONTHS_AHEAD, WEATHER_RAW_RETENTION_DAYS,
+    WEATHER_HOURLY_RETENTION_DAYS, EARTHQUAKE_RETENTION_DAYS,
+)
+from .rollups import refresh_rollup_totals
+
+# parent table -> partition key column
+PARTITIONED_TABLES = {
+    "weather_data": "recorded_at",
+    "earthquake_data": "event_time",
+}
+
+
+def month_start(value: datetime) -> datetime:
+    """First instant of the month containing value (UTC)"""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    value = value.astimezone(timezone.utc)
+    return value.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def add_months(value: datetime, months: int) -> datetime:
+    month_index = value.month - 1 + months
+    return value.replace(year=value.year + month_index // 12, month=month_index % 12 + 1)
+
+
+def partition_name(table: str, start: datetime) -> str:
+    return f"{table}_p{start:%Y%m}"
+
+
+def default_partition_name(table: str) -> str:
+    return f"{table}_default"
+
+
+def list_partitions(conn, table: str) -> List[Dict]:
+    """Return name, bounds and default flag for each partition of a parent table"""
+    rows = conn.execute(text("""
+        SELECT child.relname, pg_get_expr(child.relpartbound, child.oid)
+        FROM pg_inherits
+        JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+        JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+        WHERE parent.relname = :table
+        ORDER BY child.relname
+    """), {"table": table}).fetchall()
+    return [{"name": row[0], "bound": row[1], "is_default": row[1] == "DEFAULT"} for row in rows]
+
+
+def ensure_default_partition(conn, table: str):
+    conn.execute(text(
+        f"CREATE TABLE IF NOT EXISTS {default_partition_name(table)} PARTITION OF {table} DEFAULT"
+    ))
+
+
+def create_month_partition(conn, table: str, start: datetime) -> bool:
+    """
+    Create the partition for the month starting at start, if it does not exist yet
+
+    Rows for that month that already landed in the DEFAULT partition are moved into the new
+    partition before it is attached (PostgreSQL refuses to attach over conflicting default rows).
+
+    Returns:
+        True if a partition was created
+    """
+    key = PARTITIONED_TABLES[table]
+    name = partition_name(table, start)
+    end = add_months(start, 1)
+
+    exists = conn.execute(text("SELECT to_regclass(:name) IS NOT NULL"), {"name": name}).scalar()
+    if exists:
+        return False
+
+    default_name = default_partition_name(table)
+    params = {"start": start, "end": end}
+    has_default = conn.execute(text("SELECT to_regclass(:name) IS NOT NULL"), {"name": default_name}).scalar()
+    default_rows = has_default and conn.execute(text(f"""
+        SELECT EXISTS (SELECT 1 FROM {default_name} WHERE {key} >= :start AND {key} < :end)
+    """), params).scalar()
+
+    bounds = f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+    if not default_rows:
+        conn.execute(text(f"CREATE TABLE {name} PARTITION OF {table} {bounds}"))
+        return True
+
+    conn.execute(text(f"CREATE TABLE {name} (LIKE {table} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"))
+    conn.execute(text(f"""
+        WITH moved AS (
+            DELETE FROM {default_name} WHERE {key} >= :start AND {key} < :end RETURNING *
+        )
+        INSERT INTO {name} SELECT * FROM moved
+    """), params)
+    conn.execute(text(f"ALTER TABLE {table} ATTACH PARTITION {name} {bounds}"))
+    return True
+
+
+def ensure_partitions(conn=None, months_ahead: Optional[int] = None, since: Optional[datetime] = None,
+                      tables: Optional[List[str]] = None) -> int:
+    """
+    Make sure monthly partitions exist from `since` (default: this month) to months_ahead ahead
+
+    Returns:
+        Number of partitions created
+    """
+    if conn is None:
+        from .base import engine
+        with engine.begin() as own_conn:
+            return ensure_partitions(own_conn, months_ahead, since, tables)
+
+    months_ahead = PARTITION_MONTHS_AHEAD if months_ahead is None else months_ahead
+    first = month_start(since or datetime.now(timezone.utc))
+    last = add_months(month_start(datetime.now(timezone.utc)), months_ahead)
+
+    created = 0
+    for table in tables or PARTITIONED_TABLES:
+        ensure_default_partition(conn, table)
+        current = first
+        while current <= last:
+            if create_month_partition(conn, table, current):
+                print(f"🧱 Created partition {partition_name(table, current)}")
+                created += 1
+            current = add_months(current, 1)
+    return created
+
+
+def maintain_partitions():
+    """Best-effort ensure_partitions() for collectors/ingestors; rows still land in DEFAULT on failure"""
+    try:
+        ensure_partitions()
+    except Exception as e:
+        print(f"⚠️ Could not create upcoming partitions: {e}")
+
+
+def _expired_partitions(conn, table: str, cutoff: datetime) -> List[str]:
+    """Monthly partitions whose whole range ends on or before cutoff"""
+    expired = []
+    for partition in list_partitions(conn, table):
+        if partition["is_default"] or not partition["name"].startswith(f"{table}_p"):
+            continue
+        try:
+            start = datetime.strptime(partition["name"][len(table) + 2:], "%Y%m").replace(tzinfo=timezone.utc)
+        except ValueError:
+            continue
+        if add_months(start, 1) <= cutoff:
+            expired.append(partition["name"])
+    return expired
+
+
+def downsample_weather_partition(conn, partition: str) -> int:
+    """Aggregate a weather_data partition into weather_data_hourly (idempotent upsert)"""
+    result = conn.execute(text(f"""
+        INSERT INTO weather_data_hourly (
+            station_name, bucket_start, geometry,
+            avg_temperature, avg_humidity, total_rainfall, max_rainfall,
+            avg_wind_speed, max_wind_speed, avg_pressure, sample_count
+        )
+        SELECT
+            COALESCE(station_name, 'unknown'),
+            date_trunc('hour', recorded_at),
+            ST_Centroid(ST_Collect(geometry)),
+            AVG(temperature), AVG(humidity), SUM(rainfall), MAX(rainfall),
+            AVG(wind_speed), MAX(wind_speed), AVG(pressure), COUNT(*)
+        FROM {partition}
+        GROUP BY COALESCE(station_name, 'unknown'), date_trunc('hour', recorded_at)
+        ON CONFLICT (station_name, bucket_start) DO UPDATE SET
+            avg_temperature = EXCLUDED.avg_temperature,
+            avg_humidity = EXCLUDED.avg_humidity,
+            total_rainfall = EXCLUDED.total_rainfall,
+            max_rainfall = EXCLUDED.max_rainfall,
+            avg_wind_speed = EXCLUDED.avg_wind_speed,
+            max_wind_speed = EXCLUDED.max_wind_speed,
+            avg_pressure = EXCLUDED.avg_pressure,
+            sample_count = EXCLUDED.sample_count
+    """))
+    return result.rowcount or 0
+
+
+def drop_partition(conn, table: str, partition: str):
+    """Detach then drop, so the parent's lock is only held for the detach"""
+    conn.execute(text(f"ALTER TABLE {table} DETACH PARTITION {partition}"))
+    conn.execute(text(f"DROP TABLE {partition}"))
+
+
+def apply_retention(now: Optional[datetime] = None) -> Dict[str, int]:
+    """
+    Enforce the retention policy from config.py
+
+    - weather_data partitions older than WEATHER_RAW_RETENTION_DAYS are downsampled to
+      weather_data_hourly and dropped
+    - weather_data_hourly rows older than WEATHER_HOURLY_RETENTION_DAYS are deleted
+    - earthquake_data partitions older than EARTHQUAKE_RETENTION_DAYS are dropped
+    - all-time observation rollups are recomputed for datasets that lost partitions
+
+    Each partition is handled in its own transaction.
+    """
+    from .base import engine
+
+    now = now or datetime.now(timezone.utc)
+    summary = {"weather_partitions_dropped": 0, "hourly_rows_written": 0,
+               "hourly_rows_deleted": 0, "earthquake_partitions_dropped": 0}
+
+    if WEATHER_RAW_RETENTION_DAYS > 0:
+        cutoff = now - timedelta(days=WEATHER_RAW_RETENTION_DAYS)
+        with engine.connect() as conn:
+            expired = _expired_partitions(conn, "weather_data", cutoff)
+        for partition in expired:
+            with engine.begin() as conn:
+                written = downsample_weather_partition(conn, partition)
+                drop_partition(conn, "weather_data", partition)
+            summary["hourly_rows_written"] += written
+            summary["weather_partitions_dropped"] += 1
+            print(f"🗜️ Downsampled {partition} into {written} hourly rows and dropped it")
+
+    if summary["weather_partitions_dropped"]:
+        with engine.begin() as conn:
+            refresh_rollup_totals(conn, "weather")
+
+    if WEATHER_HOURLY_RETENTION_DAYS > 0:
+        with engine.begin() as conn:
+            result = conn.execute(text("DELETE FROM weather_data_hourly WHERE bucket_start < :cutoff"),
+                                  {"cutoff": now - timedelta(days=WEATHER_HOURLY_RETENTION_DAYS)})
+            summary["hourly_rows_deleted"] = result.rowcount or 0
+
+    if EARTHQUAKE_RETENTION_DAYS > 0:
+        cutoff = now - timedelta(days=EARTHQUAKE_RETENTION_DAYS)
+        with engine.connect() as conn:
+            expired = _expired_partitions(conn, "earthquake_data", cutoff)
+        for partition in expired:
+            with engine.begin() as conn:
+                drop_partition(conn, "earthquake_data", partition)
+            summary["earthquake_partitions_dropped"] += 1
+            print(f"🗑️ Dropped {partition}")
+        if expired:
+            with engine.begin() as conn:
+                refresh_rollup_totals(conn, "earthquake")
+
+    print(f"✅ Retention: {summary}")
+    return summary
+
+
+if __name__ == "__main__":
+    action = sys.argv[1] if len(sys.argv) > 1 else "maintain"
+    if action == "maintain":
+        print(f"🧱 {ensure_partitions()} partitions created")
+    elif action == "retention":
+        apply_retention()
+    elif action == "list":
+        from .base import engine
+        with engine.connect() as list_conn:
+            for parent in PARTITIONED_TABLES:
+                print(f"{parent}:")
+                for part in list_partitions(list_conn, parent):
+                    print(f"  - {part['name']}: {part['bound']}")
+    else:
+        print("Usage: python -m db.partitions [maintain|retention|list]")
+        sys.exit(1)
@@ -4,7 +4,9 @@ from .models import (
     FloodData, EarthquakeData, LandslideData, 
     WeatherData, EmergencyProtocol
 )
+from .hazard_raster import lookup_hazard_risk, RASTER_MISS
 from datetime import datetime
+import json
 
 
 # ============================================================================
@@ -52,7 +54,10 @@ def get_flood_data_within_bounds(db: Session, bounds_wkt: str):
     """Get flood data within specified bounds using PostGIS ST_Intersects"""
     query = text("""
         SELECT * FROM flood_data 
-        WHERE ST_Intersects(geometry, ST_GeomFromText(:bounds_wkt, 4326))
+        WHERE id IN (
+            SELECT source_id FROM flood_data_subdivided
+            WHERE ST_Intersects(geometry, ST_GeomFromText(:bounds_wkt, 4326))
+        )
     """)
     result = db.execute(query, {"bounds_wkt": bounds_wkt})
     return result.fetchall()
@@ -75,7 +80,7 @@ def add_earthquake_data(db: Session, geometry_wkt: str, magnitude: float, depth:
         geometry=geometry_wkt,
         magnitude=magnitude,
         depth=depth,
-        event_time=event_time,
+        event_time=event_time or datetime.now(),  # partition key, cannot be NULL
         location_name=location_name,
         source=source,
         metadata=metadata
@@ -135,23 +140,28 @@ def get_landslide_data_by_risk(db: Session, min_risk: float = None, max_risk: fl
     return query.all()
 
 
-def get_landslide_data_nearby(db: Session, latitude: float, longitude: float, radius_km: float = 50.0, min_risk: float = None, max_risk: float = None):
-    """Get landslide data within radius_km of a point, optionally filtered by risk level"""
-    query = text(
-        """
+LANDSLIDE_NEARBY_SQL = """
         SELECT 
             id,
             risk_level,
             ST_AsGeoJSON(geometry) as geometry_json,
             ST_Distance(geometry::geography, ST_SetSRID(ST_Point(:lng, :lat), 4326)::geography) / 1000.0 AS distance_km
         FROM landslide_data
-        WHERE ST_DWithin(
-            geometry::geography, 
-            ST_SetSRID(ST_Point(:lng, :lat), 4326)::geography, 
-            :radius_meters
+        WHERE id IN (
+            SELECT source_id FROM landslide_data_subdivided
+            WHERE ST_DWithin(
+                geometry::geography, 
+                ST_SetSRID(ST_Point(:lng, :lat), 4326)::geography, 
+                :radius_meters
+            )
         )
         """
-    )
+
+
+def get_landslide_data_nearby(db: Session, latitude: float, longitude: float, radius_km: float = 50.0, min_risk: float = None, max_risk: float = None,
+                              limit: int = None):
+    """Get landslide data within radius_km of a point (nearest first, at most limit rows), optionally filtered by risk level"""
+    query = text(LANDSLIDE_NEARBY_SQL)
     
     # Add risk level filters if provided
     risk_conditions = []
@@ -175,11 +185,138 @@ def get_landslide_data_nearby(db: Session, latitude: float, longitude: float, ra
         query = text(query_text)
     
     query = text(str(query) + " ORDER BY distance_km ASC")
-    
+    if limit is not None:
+        query = text(str(query) + " LIMIT :limit")
+        params["limit"] = limit
+
     result = db.execute(query, params)
     return result.fetchall()
 
 
+# ============================================================================
+# HAZARD FEATURE PAGES (keyset pagination and streaming exports)
+# ============================================================================
+
+HAZARD_FEATURE_TABLES = {"flood": "flood_data", "landslide": "landslide_data"}
+
+
+def _hazard_feature_query(layer: str, min_risk: float = None, max_risk: float = None, paged: bool = True):
+    """SELECT id, risk_level, GeoJSON geometry ordered by id, resuming after :after_id"""
+    conditions = ["id > :after_id"]
+    if min_risk is not None:
+        conditions.append("risk_level >= :min_risk")
+    if max_risk is not None:
+        conditions.append("risk_level <= :max_risk")
+    return text(f"""
+        SELECT id, risk_level, ST_AsGeoJSON(geometry) AS geometry_json
+        FROM {HAZARD_FEATURE_TABLES[layer]}
+        WHERE {" AND ".join(conditions)}
+        ORDER BY id
+        {"LIMIT :page_size" if paged else ""}
+    """)
+
+
+def get_hazard_features_page(db: Session, layer: str, min_risk: float = None, max_risk: float = None,
+                             after_id: int = 0, page_size: int = 1000):
+    """One keyset page of hazard features: rows (id, risk_level, geometry_json) with id > after_id.
+
+    The primary-key index serves both the filter and the order, so each page costs the same
+    regardless of how deep into the table it is.
+    """
+    query = _hazard_feature_query(layer, min_risk, max_risk)
+    params = {"after_id": after_id, "page_size": page_size, "min_risk": min_risk, "max_risk": max_risk}
+    return db.execute(query, params).fetchall()
+
+
+def iter_hazard_features(conn, layer: str, min_risk: float = None, max_risk: float = None,
+                         after_id: int = 0, batch_size: int = 500):
+    """Yield every matching hazard feature row through a server-side cursor.
+
+    Rows arrive from PostgreSQL batch_size at a time, so a full export holds one batch in memory.
+    """
+    query = _hazard_feature_query(layer, min_risk, max_risk, paged=False)
+    params = {"after_id": after_id, "min_risk": min_risk, "max_risk": max_risk}
+    result = conn.execution_options(stream_results=True, max_row_buffer=batch_size).execute(query, params)
+    try:
+        while True:
+            rows = result.fetchmany(batch_size)
+            if not rows:
+                break
+            for row in rows:
+                yield row
+    finally:
+        result.close()
+
+
+# ============================================================================
+# SUBDIVIDED HAZARD TABLES
+# ============================================================================
+
+SUBDIVIDED_HAZARD_TABLES = {
+    "flood": ("flood_data", "flood_data_subdivided"),
+    "landslide": ("landslide_data", "landslide_data_subdivided"),
+}
+
+
+def rebuild_subdivided_hazard_table(db: Session, layer: str, max_vertices: int = 256):
+    """
+    Rebuild <layer>_data_subdivided from the source polygons with ST_Subdivide
+
+    Pieces have at most max_vertices vertices, so GiST candidates have tight bounding boxes and
+    the exact predicate runs against small polygons. The swap happens in one transaction with
+    DELETE (not TRUNCATE) so point queries keep reading the old pieces while it runs.
+
+    Returns:
+        Number of subdivided pieces written
+    """
+    if layer not in SUBDIVIDED_HAZARD_TABLES:
+        raise ValueError(f"Unknown hazard layer '{layer}'. Use one of: {list(SUBDIVIDED_HAZARD_TABLES)}")
+    source_table, subdivided_table = SUBDIVIDED_HAZARD_TABLES[layer]
+
+    db.execute(text(f"DELETE FROM {subdivided_table}"))
+    result = db.execute(text(f"""
+        INSERT INTO {subdivided_table} (source_id, risk_level, geometry)
+        SELECT src.id, src.risk_level, (ST_Dump(piece.geom)).geom
+        FROM {source_table} AS src
+        CROSS JOIN LATERAL ST_Subdivide(
+            CASE WHEN ST_IsValid(src.geometry) THEN src.geometry
+                 ELSE ST_CollectionExtract(ST_MakeValid(src.geometry), 3)
+            END,
+            :max_vertices
+        ) AS piece(geom)
+    """), {"max_vertices": max_vertices})
+    db.commit()
+
+    db.execute(text(f"ANALYZE {subdivided_table}"))
+    db.commit()
+    return result.rowcount
+
+
+def hazard_risk_at_point_sql(layer: str, point_sql: str) -> str:
+    """
+    Scalar SQL for the max risk_level of a layer at a point geometry expression
+
+    Reads <layer>_data_subdivided unless it is behind its source table (empty after a failed
+    rebuild, or missing polygons added without refresh_hazard_layer), then the source polygons.
+    The freshness check compares two index-backed MAX(id) lookups, evaluated once per statement.
+    """
+    source_table, subdivided_table = SUBDIVIDED_HAZARD_TABLES[layer]
+    return f"""(CASE
+        WHEN COALESCE((SELECT MAX(source_id) FROM {subdivided_table}), 0)
+             >= COALESCE((SELECT MAX(id) FROM {source_table}), 0)
+        THEN (SELECT MAX(risk_level) FROM {subdivided_table} WHERE ST_Intersects(geometry, {point_sql}))
+        ELSE (SELECT MAX(risk_level) FROM {source_table} WHERE ST_Intersects(geometry, {point_sql}))
+    END)"""
+
+
+def subdivided_hazard_table_is_stale(db: Session, layer: str) -> bool:
+    """True when the source table has rows but the subdivided table is empty"""
+    source_table, subdivided_table = SUBDIVIDED_HAZARD_TABLES[layer]
+    source_has_rows = db.execute(text(f"SELECT EXISTS (SELECT 1 FROM {source_table})")).scalar()
+    subdivided_has_rows = db.execute(text(f"SELECT EXISTS (SELECT 1 FROM {subdivided_table})")).scalar()
+    return bool(source_has_rows) and not subdivided_has_rows
+
+
 # ============================================================================
 # WEATHER DATA QUERIES
 # ============================================================================
@@ -199,16 +336,127 @@ def add_weather_data(db: Session, geometry_wkt: str, temperature: float = None,
         wind_direction=wind_direction,
         pressure=pressure,
         station_name=station_name,
-        recorded_at=recorded_at,
+        recorded_at=recorded_at or datetime.now(),  # partition key, cannot be NULL
         source=source,
         weather_metadata=weather_metadata
     )
     db.add(weather_data)
+    db.flush()
+    upsert_weather_latest(db, weather_data)
     db.commit()
     db.refresh(weather_data)
     return weather_data
 
 
+def upsert_weather_latest(db: Session, weather_data: WeatherData):
+    """
+    Record an observation in weather_latest if it is the newest for its station
+
+    Runs inside the caller's transaction so weather_data and weather_latest never disagree.
+    Observations without a station_name have no identity to key on and are skipped.
+    """
+    if not weather_data.station_name:
+        return
+    upsert_weather_latest_for_ids(db, [weather_data.id], weather_data.recorded_at, weather_data.recorded_at)
+
+
+def upsert_weather_latest_for_ids(db: Session, ids: list, min_recorded_at: datetime, max_recorded_at: datetime):
+    """
+    Fold a set of just-inserted weather_data rows into weather_latest (newest row per station wins)
+
+    The recorded_at range lets PostgreSQL prune weather_data partitions.
+    """
+    if not ids:
+        return
+    db.execute(text("""
+        INSERT INTO weather_latest (
+            station_name, weather_data_id, geometry, temperature, humidity, rainfall,
+            wind_speed, wind_direction, pressure, recorded_at, source, weather_metadata, updated_at
+        )
+        SELECT DISTINCT ON (station_name)
+               station_name, id, geometry, temperature, humidity, rainfall,
+               wind_speed, wind_direction, pressure, recorded_at, source, weather_metadata, NOW()
+        FROM weather_data
+        WHERE id = ANY(:ids)
+          AND recorded_at BETWEEN :min_recorded_at AND :max_recorded_at
+          AND station_name IS NOT NULL
+        ORDER BY station_name, recorded_at DESC, id DESC
+        ON CONFLICT (station_name) DO UPDATE SET
+            weather_data_id = EXCLUDED.weather_data_id,
+            geometry = EXCLUDED.geometry,
+            temperature = EXCLUDED.temperature,
+            humidity = EXCLUDED.humidity,
+            rainfall = EXCLUDED.rainfall,
+            wind_speed = EXCLUDED.wind_speed,
+            wind_direction = EXCLUDED.wind_direction,
+            pressure = EXCLUDED.pressure,
+            recorded_at = EXCLUDED.recorded_at,
+            source = EXCLUDED.source,
+            weather_metadata = EXCLUDED.weather_metadata,
+            updated_at = NOW()
+        WHERE weather_latest.recorded_at <= EXCLUDED.recorded_at
+    """), {"ids": list(ids), "min_recorded_at": min_recorded_at, "max_recorded_at": max_recorded_at})
+
+
+WEATHER_BATCH_COLUMNS = (
+    "temperature", "humidity", "rainfall", "wind_speed", "wind_direction",
+    "pressure", "station_name", "recorded_at", "source",
+)
+
+
+def add_weather_data_batch(db: Session, observations: list, chunk_size: int = 500) -> list:
+    """
+    Insert many weather observations in one transaction
+
+    Each observation is a dict with geometry_wkt plus the keyword arguments of add_weather_data().
+    Rows are written with multi-row INSERT ... RETURNING id (one statement per chunk_size rows),
+    weather_latest is updated once per chunk, and everything commits together; on error the whole
+    batch is rolled back and the exception re-raised.
+
+    Returns:
+        IDs of the inserted weather_data rows
+    """
+    if not observations:
+        return []
+
+    inserted_ids = []
+    try:
+        for start in range(0, len(observations), chunk_size):
+            chunk = observations[start:start + chunk_size]
+            params = {}
+            rows = []
+            for i, observation in enumerate(chunk):
+                recorded_at = observation.get("recorded_at") or datetime.now()  # partition key, cannot be NULL
+                params[f"geometry_{i}"] = observation["geometry_wkt"]
+                for column in WEATHER_BATCH_COLUMNS:
+                    params[f"{column}_{i}"] = observation.get(column)
+                params[f"recorded_at_{i}"] = recorded_at
+                metadata = observation.get("weather_metadata")
+                params[f"weather_metadata_{i}"] = json.dumps(metadata) if metadata is not None else None
+                rows.append(
+                    f"(ST_GeomFromText(:geometry_{i}, 4326), "
+                    + ", ".join(f":{column}_{i}" for column in WEATHER_BATCH_COLUMNS)
+                    + f", CAST(:weather_metadata_{i} AS json))"
+                )
+
+            returned = db.execute(text(f"""
+                INSERT INTO weather_data (geometry, {", ".join(WEATHER_BATCH_COLUMNS)}, weather_metadata)
+                VALUES {", ".join(rows)}
+                RETURNING id, recorded_at
+            """), params).fetchall()
+
+            chunk_ids = [row[0] for row in returned]
+            recorded = [row[1] for row in returned]
+            upsert_weather_latest_for_ids(db, chunk_ids, min(recorded), max(recorded))
+            inserted_ids.extend(chunk_ids)
+
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return inserted_ids
+
+
 def get_recent_weather_data(db: Session, hours: int = 1):
     """Get weather data from the last N hours"""
     from datetime import timedelta
@@ -223,17 +471,19 @@ def get_recent_weather_data(db: Session, hours: int = 1):
 # ============================================================================
 
 
+# Point geometry bound from :lat / :lng, for hazard_risk_at_point_sql()
+POINT_PARAM_SQL = "ST_SetSRID(ST_Point(:lng, :lat), 4326)"
+
+
 def get_flood_risk_at_point(db: Session, latitude: float, longitude: float):
     """Return the maximum flood risk_level at a given point, or None if outside flood zones."""
+    raster_risk = lookup_hazard_risk("flood", latitude, longitude)
+    if raster_risk is not RASTER_MISS:
+        return raster_risk
+
+    # Raster disabled, not built, or point on a zone boundary: run the exact query
     query = text(
-        """
-        SELECT MAX(risk_level) AS max_risk
-        FROM flood_data
-        WHERE ST_Intersects(
-            geometry,
-            ST_SetSRID(ST_Point(:lng, :lat), 4326)
-        )
-        """
+        f"SELECT {hazard_risk_at_point_sql('flood', POINT_PARAM_SQL)} AS max_risk"
     )
     result = db.execute(query, {"lat": latitude, "lng": longitude}).fetchone()
     return float(result[0]) if result and result[0] is not None else None
@@ -241,27 +491,19 @@ def get_flood_risk_at_point(db: Session, latitude: float, longitude: float):
 
 def get_landslide_risk_at_point(db: Session, latitude: float, longitude: float):
     """Return the maximum landslide risk_level at a given point, or None if outside zones."""
+    raster_risk = lookup_hazard_risk("landslide", latitude, longitude)
+    if raster_risk is not RASTER_MISS:
+        return raster_risk
+
+    # Raster disabled, not built, or point on a zone boundary: run the exact query
     query = text(
-        """
-        SELECT MAX(risk_level) AS max_risk
-        FROM landslide_data
-        WHERE ST_Intersects(
-            geometry,
-            ST_SetSRID(ST_Point(:lng, :lat), 4326)
-        )
-        """
+        f"SELECT {hazard_risk_at_point_sql('landslide', POINT_PARAM_SQL)} AS max_risk"
     )
     result = db.execute(query, {"lat": latitude, "lng": longitude}).fetchone()
     return float(result[0]) if result and result[0] is not None else None
 
 
-def get_recent_earthquakes_nearby(db: Session, latitude: float, longitude: float, hours: int = 24, max_km: float = 100.0):
-    """Return recent earthquakes within max_km of the point in the last N hours, with distance."""
-    from datetime import timedelta
-    cutoff_time = datetime.now() - timedelta(hours=hours)
-
-    query = text(
-        """
+RECENT_EARTHQUAKES_NEARBY_SQL = """
         SELECT 
             id,
             magnitude,
@@ -274,7 +516,14 @@ def get_recent_earthquakes_nearby(db: Session, latitude: float, longitude: float
           AND ST_DWithin(geometry::geography, ST_SetSRID(ST_Point(:lng, :lat), 4326)::geography, :max_meters)
         ORDER BY distance_km ASC, event_time DESC
         """
-    )
+
+
+def get_recent_earthquakes_nearby(db: Session, latitude: float, longitude: float, hours: int = 24, max_km: float = 100.0):
+    """Return recent earthquakes within max_km of the point in the last N hours, with distance."""
+    from datetime import timedelta
+    cutoff_time = datetime.now() - timedelta(hours=hours)
+
+    query = text(RECENT_EARTHQUAKES_NEARBY_SQL)
     rows = db.execute(query, {"lat": latitude, "lng": longitude, "cutoff": cutoff_time, "max_meters": max_km * 1000.0}).fetchall()
     return [
         {
@@ -288,15 +537,9 @@ def get_recent_earthquakes_nearby(db: Session, latitude: float, longitude: float
     ]
 
 
-def get_nearest_recent_weather(db: Session, latitude: float, longitude: float, hours: int = 3, max_km: float = 100.0):
-    """Return the nearest recent weather station data within max_km in the last N hours."""
-    from datetime import timedelta
-    cutoff_time = datetime.now() - timedelta(hours=hours)
-
-    query = text(
-        """
+NEAREST_RECENT_WEATHER_SQL = """
         SELECT 
-            id,
+            weather_data_id,
             temperature,
             humidity,
             rainfall,
@@ -306,14 +549,23 @@ def get_nearest_recent_weather(db: Session, latitude: float, longitude: float, h
             station_name,
             recorded_at,
             ST_Distance(geometry::geography, ST_SetSRID(ST_Point(:lng, :lat), 4326)::geography) / 1000.0 AS distance_km
-        FROM weather_data
-        WHERE recorded_at IS NOT NULL
-          AND recorded_at >= :cutoff
+        FROM weather_latest
+        WHERE recorded_at >= :cutoff
           AND ST_DWithin(geometry::geography, ST_SetSRID(ST_Point(:lng, :lat), 4326)::geography, :max_meters)
         ORDER BY distance_km ASC, recorded_at DESC
         LIMIT 1
         """
-    )
+
+
+def get_nearest_recent_weather(db: Session, latitude: float, longitude: float, hours: int = 3, max_km: float = 100.0):
+    """Return the nearest recent weather station data within max_km in the last N hours.
+
+    Reads weather_latest (one row per station) instead of scanning weather_data history.
+    """
+    from datetime import timedelta
+    cutoff_time = datetime.now() - timedelta(hours=hours)
+
+    query = text(NEAREST_RECENT_WEATHER_SQL)
     row = db.execute(query, {"lat": latitude, "lng": longitude, "cutoff": cutoff_time, "max_meters": max_km * 1000.0}).fetchone()
     if not row:
         return None
@@ -331,6 +583,128 @@ def get_nearest_recent_weather(db: Session, latitude: float, longitude: float, h
     }
 
 
+def get_point_risks_batch(db: Session, points: list, hours_earthquake: int = 24, eq_radius_km: float = 100.0,
+                          weather_hours: int = 3, weather_radius_km: float = 100.0):
+    """Hazard risk, recent earthquakes and nearest weather for many points in one query.
+
+    Same semantics as get_flood_risk_at_point / get_landslide_risk_at_point /
+    get_recent_earthquakes_nearby / get_nearest_recent_weather, but the points are unnested from
+    arrays and joined to each table once. Points the hazard raster already decides skip the
+    polygon test.
+
+    Args:
+        points: list of (latitude, longitude)
+
+    Returns:
+        list of dicts in input order: flood_risk, landslide_risk, earthquakes summary, weather
+    """
+    from datetime import timedelta
+    if not points:
+        return []
+
+    lats = [float(lat) for lat, _ in points]
+    lngs = [float(lng) for _, lng in points]
+    raster = {
+        layer: [lookup_hazard_risk(layer, lat, lng) for lat, lng in zip(lats, lngs)]
+        for layer in ("flood", "landslide")
+    }
+
+    query = text(
+        f"""
+        WITH pts AS (
+            SELECT t.idx, t.check_flood, t.check_landslide,
+                   ST_SetSRID(ST_Point(t.lng, t.lat), 4326) AS geom,
+                   ST_SetSRID(ST_Point(t.lng, t.lat), 4326)::geography AS geog
+            FROM unnest(
+                CAST(:lats AS double precision[]), CAST(:lngs AS double precision[]),
+                CAST(:check_flood AS boolean[]), CAST(:check_landslide AS boolean[])
+            ) WITH ORDINALITY AS t(lat, lng, check_flood, check_landslide, idx)
+        )
+        SELECT
+            pts.idx,
+            CASE WHEN pts.check_flood THEN {hazard_risk_at_point_sql("flood", "pts.geom")} END AS flood_risk,
+            CASE WHEN pts.check_landslide THEN {hazard_risk_at_point_sql("landslide", "pts.geom")} END AS landslide_risk,
+            eq.event_count,
+            eq.max_magnitude,
+            eq.nearest_km,
+            w.weather_data_id,
+            w.temperature,
+            w.humidity,
+            w.rainfall,
+            w.wind_speed,
+            w.station_name,
+            w.recorded_at,
+            w.distance_km
+        FROM pts
+        LEFT JOIN LATERAL (
+            SELECT
+                COUNT(*) AS event_count,
+                MAX(e.magnitude) AS max_magnitude,
+                MIN(ST_Distance(e.geometry::geography, pts.geog)) / 1000.0 AS nearest_km
+            FROM earthquake_data e
+            WHERE e.event_time IS NOT NULL
+              AND e.event_time >= :eq_cutoff
+              AND ST_DWithin(e.geometry::geography, pts.geog, :eq_meters)
+        ) eq ON TRUE
+        LEFT JOIN LATERAL (
+            SELECT
+                wl.weather_data_id, wl.temperature, wl.humidity, wl.rainfall, wl.wind_speed,
+                wl.station_name, wl.recorded_at,
+                ST_Distance(wl.geometry::geography, pts.geog) / 1000.0 AS distance_km
+            FROM weather_latest wl
+            WHERE wl.recorded_at >= :weather_cutoff
+              AND ST_DWithin(wl.geometry::geography, pts.geog, :weather_meters)
+            ORDER BY distance_km ASC, wl.recorded_at DESC
+            LIMIT 1
+        ) w ON TRUE
+        ORDER BY pts.idx
+        """
+    )
+    now = datetime.now()
+    rows = db.execute(query, {
+        "lats": lats,
+        "lngs": lngs,
+        "check_flood": [value is RASTER_MISS for value in raster["flood"]],
+        "check_landslide": [value is RASTER_MISS for value in raster["landslide"]],
+        "eq_cutoff": now - timedelta(hours=hours_earthquake),
+        "eq_meters": eq_radius_km * 1000.0,
+        "weather_cutoff": now - timedelta(hours=weather_hours),
+        "weather_meters": weather_radius_km * 1000.0,
+    }).fetchall()
+
+    results = []
+    for r in rows:
+        i = r[0] - 1
+        risks = {}
+        for layer, sql_value in (("flood", r[1]), ("landslide", r[2])):
+            value = raster[layer][i]
+            if value is RASTER_MISS:
+                value = sql_value
+            risks[layer] = float(value) if value is not None else None
+        results.append({
+            "lat": lats[i],
+            "lng": lngs[i],
+            "flood_risk": risks["flood"],
+            "landslide_risk": risks["landslide"],
+            "earthquakes": {
+                "count": int(r[3] or 0),
+                "max_magnitude": float(r[4]) if r[4] is not None else None,
+                "nearest_km": float(r[5]) if r[5] is not None else None,
+            },
+            "weather": {
+                "id": r[6],
+                "temperature": float(r[7]) if r[7] is not None else None,
+                "humidity": float(r[8]) if r[8] is not None else None,
+                "rainfall": float(r[9]) if r[9] is not None else None,
+                "wind_speed": float(r[10]) if r[10] is not None else None,
+                "station_name": r[11],
+                "recorded_at": r[12].isoformat() if r[12] else None,
+                "distance_km": float(r[13]) if r[13] is not None else None,
+            } if r[6] is not None else None,
+        })
+    return results
+
+
 # ============================================================================
 # EMERGENCY PROTOCOLS QUERIES
 # ============================================================================
@@ -0,0 +1,340 @@
+#!/usr/bin/env python3
+"""
+Incrementally maintained statistics for the dashboard stats endpoints
+
+- observation_rollups: hourly, daily and all-time aggregates of weather_data and earthquake_data.
+  A statement-level AFTER INSERT trigger on each parent table folds the inserted rows (via the
+  transition table) into the matching buckets, so a batch insert costs one upsert per bucket.
+  The upserts row-lock the all-time rows and the current hour/day buckets until the inserting
+  transaction commits, so concurrent writers to one table take turns. This assumes the current
+  setup of one ingester per table with short batch transactions (weather/batch_writer.py); more
+  parallel writers would need per-writer delta rows merged later instead.
+- layer_stats: one row per hazard polygon layer, recomputed after each flood/landslide ingestion.
+  Its updated_at is also the layer version behind the HTTP cache validators (http_cache.py) and
+  is bumped on its own (bump_layer_version) so a failed statistics refresh cannot keep old ETags.
+
+The stats endpoints read these tables instead of scanning the source tables on every refresh.
+
+Usage:
+    python -m db.rollups rebuild          # recompute observation rollups from the source tables
+    python -m db.rollups layers           # recompute layer_stats
+"""
+
+import sys
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from sqlalchemy import text
+
+GRANULARITIES = ("hour", "day", "all")
+
+MAGNITUDE_CATEGORY_SQL = """
+    CASE
+        WHEN magnitude < 2.0 THEN 'Micro'
+        WHEN magnitude < 4.0 THEN 'Minor'
+        WHEN magnitude < 5.0 THEN 'Light'
+        WHEN magnitude < 6.0 THEN 'Moderate'
+        WHEN magnitude < 7.0 THEN 'Strong'
+        WHEN magnitude < 8.0 THEN 'Major'
+        ELSE 'Great'
+    END
+"""
+
+MAGNITUDE_CATEGORIES = ["Micro", "Minor", "Light", "Moderate", "Strong", "Major", "Great"]
+
+# dataset -> source table, time column and (metric, dimension SQL, value SQL) tuples
+ROLLUP_DATASETS = {
+    "weather": {
+        "table": "weather_data",
+        "time": "recorded_at",
+        "metrics": [
+            ("rows", "''", "1.0"),
+            ("temperature", "''", "temperature"),
+            ("humidity", "''", "humidity"),
+            ("rainfall", "''", "rainfall"),
+            ("wind_speed", "''", "wind_speed"),
+        ],
+    },
+    "earthquake": {
+        "table": "earthquake_data",
+        "time": "event_time",
+        "metrics": [
+            ("rows", "''", "1.0"),
+            ("magnitude", "''", "magnitude"),
+            ("depth", "''", "depth"),
+            ("magnitude_category", MAGNITUDE_CATEGORY_SQL, "magnitude"),
+        ],
+    },
+}
+
+LAYER_TABLES = {
+    "flood": "flood_data",
+    "landslide": "landslide_data",
+}
+
+EPOCH = "'epoch'::timestamptz"
+
+
+def _aggregate_select(dataset: str, source: str, granularities=GRANULARITIES) -> str:
+    """SELECT producing observation_rollups rows for every row of `source`"""
+    spec = ROLLUP_DATASETS[dataset]
+    metric_values = ",\n                ".join(
+        f"('{metric}', {dimension}, ({value})::double precision)" for metric, dimension, value in spec["metrics"]
+    )
+    granularity_values = ", ".join(f"('{granularity}')" for granularity in granularities)
+    return f"""
+        SELECT
+            '{dataset}',
+            g.granularity,
+            CASE g.granularity
+                WHEN 'all' THEN {EPOCH}
+                ELSE date_trunc(g.granularity, src.{spec['time']} AT TIME ZONE 'UTC') AT TIME ZONE 'UTC'
+            END AS bucket_start,
+            m.metric,
+            m.dimension,
+            COUNT(m.value),
+            SUM(m.value),
+            MIN(m.value),
+            MAX(m.value),
+            now()
+        FROM {source} src
+        CROSS JOIN LATERAL (
+            VALUES
+                {metric_values}
+        ) AS m(metric, dimension, value)
+        CROSS JOIN (VALUES {granularity_values}) AS g(granularity)
+        WHERE m.value IS NOT NULL
+        GROUP BY g.granularity, bucket_start, m.metric, m.dimension
+    """
+
+
+_INSERT_COLUMNS = """
+    INSERT INTO observation_rollups AS r (
+        dataset, granularity, bucket_start, metric, dimension,
+        sample_count, value_sum, value_min, value_max, updated_at
+    )
+"""
+
+
+def trigger_ddl(dataset: str) -> List[str]:
+    """CREATE FUNCTION / CREATE TRIGGER statements that keep a dataset's rollups current"""
+    table = ROLLUP_DATASETS[dataset]["table"]
+    return [
+        f"""
+        CREATE OR REPLACE FUNCTION rollup_{table}() RETURNS trigger
+        LANGUAGE plpgsql AS $fn$
+        BEGIN
+            {_INSERT_COLUMNS}
+            {_aggregate_select(dataset, "new_rows")}
+            ON CONFLICT (dataset, granularity, bucket_start, metric, dimension) DO UPDATE SET
+                sample_count = r.sample_count + EXCLUDED.sample_count,
+                value_sum = COALESCE(r.value_sum, 0) + COALESCE(EXCLUDED.value_sum, 0),
+                value_min = LEAST(r.value_min, EXCLUDED.value_min),
+                value_max = GREATEST(r.value_max, EXCLUDED.value_max),
+                updated_at = now();
+            RETURN NULL;
+        END
+        $fn$
+        """,
+        f"DROP TRIGGER IF EXISTS {table}_rollup ON {table}",
+        f"""
+        CREATE TRIGGER {table}_rollup
+        AFTER INSERT ON {table}
+        REFERENCING NEW TABLE AS new_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION rollup_{table}()
+        """,
+    ]
+
+
+def drop_trigger_ddl(dataset: str) -> List[str]:
+    table = ROLLUP_DATASETS[dataset]["table"]
+    return [
+        f"DROP TRIGGER IF EXISTS {table}_rollup ON {table}",
+        f"DROP FUNCTION IF EXISTS rollup_{table}()",
+    ]
+
+
+def rebuild_rollups(conn, dataset: str, granularities=GRANULARITIES) -> int:
+    """
+    Recompute a dataset's rollups from its source table
+
+    Inserts into the source table are blocked for the duration (SHARE lock) so the trigger cannot
+    double count. Hourly/daily buckets older than the oldest remaining row are kept, since they
+    may describe partitions that retention has already dropped.
+
+    Returns:
+        Number of rollup rows written
+    """
+    spec = ROLLUP_DATASETS[dataset]
+    table, time_column = spec["table"], spec["time"]
+
+    conn.execute(text(f"LOCK TABLE {table} IN SHARE MODE"))
+    oldest = conn.execute(text(f"SELECT MIN({time_column}) FROM {table}")).scalar()
+
+    if "all" in granularities:
+        conn.execute(text("DELETE FROM observation_rollups WHERE dataset = :dataset AND granularity = 'all'"),
+                     {"dataset": dataset})
+    if oldest is not None:
+        conn.execute(text("""
+            DELETE FROM observation_rollups
+            WHERE dataset = :dataset
+              AND granularity = ANY(:granularities)
+              AND granularity <> 'all'
+              AND bucket_start >= date_trunc('day', CAST(:oldest AS timestamptz) AT TIME ZONE 'UTC') AT TIME ZONE 'UTC'
+        """), {"dataset": dataset, "granularities": list(granularities), "oldest": oldest})
+
+    result = conn.execute(text(_INSERT_COLUMNS + _aggregate_select(dataset, table, granularities)))
+    return result.rowcount or 0
+
+
+def refresh_rollup_totals(conn, dataset: str) -> int:
+    """Recompute only the all-time totals, e.g. after retention dropped partitions"""
+    return rebuild_rollups(conn, dataset, granularities=("all",))
+
+
+def get_observation_totals(conn, dataset: str) -> Dict[str, Dict]:
+    """
+    All-time aggregates for a dataset
+
+    Returns:
+        {metric: {"count", "sum", "min", "max", "avg"}} for plain metrics and
+        {metric: {dimension: {...}}} for dimensioned ones (e.g. magnitude_category)
+    """
+    rows = conn.execute(text("""
+        SELECT metric, dimension, sample_count, value_sum, value_min, value_max
+        FROM observation_rollups
+        WHERE dataset = :dataset AND granularity = 'all' AND bucket_start = 'epoch'::timestamptz
+    """), {"dataset": dataset}).fetchall()
+
+    totals: Dict[str, Dict] = {}
+    for metric, dimension, count, value_sum, value_min, value_max in rows:
+        entry = {
+            "count": int(count),
+            "sum": value_sum,
+            "min": value_min,
+            "max": value_max,
+            "avg": value_sum / count if count and value_sum is not None else None,
+        }
+        if dimension:
+            totals.setdefault(metric, {})[dimension] = entry
+        else:
+            totals[metric] = entry
+    return totals
+
+
+def get_observation_rollups(conn, dataset: str, granularity: str, since: datetime,
+                            metrics: Optional[List[str]] = None) -> List[Dict]:
+    """Hourly or daily buckets for a dataset since a point in time, oldest first"""
+    if granularity not in ("hour", "day"):
+        raise ValueError(f"Unknown granularity '{granularity}'. Use 'hour' or 'day'")
+
+    query = """
+        SELECT bucket_start, metric, dimension, sample_count, value_sum, value_min, value_max
+        FROM observation_rollups
+        WHERE dataset = :dataset AND granularity = :granularity AND bucket_start >= :since
+    """
+    params = {"dataset": dataset, "granularity": granularity, "since": since}
+    if metrics:
+        query += " AND metric = ANY(:metrics)"
+        params["metrics"] = list(metrics)
+    query += " ORDER BY bucket_start, metric, dimension"
+
+    buckets = []
+    for bucket_start, metric, dimension, count, value_sum, value_min, value_max in conn.execute(text(query), params):
+        buckets.append({
+            "bucket_start": bucket_start.isoformat(),
+            "metric": metric,
+            "dimension": dimension or None,
+            "count": int(count),
+            "sum": value_sum,
+            "min": value_min,
+            "max": value_max,
+            "avg": value_sum / count if count and value_sum is not None else None,
+        })
+    return buckets
+
+
+def bump_layer_version(conn, layer: str):
+    """Mark a hazard layer as changed (layer_stats.updated_at) without recomputing its statistics"""
+    conn.execute(text("UPDATE layer_stats SET updated_at = now() WHERE layer = :layer"), {"layer": layer})
+
+
+def refresh_layer_stats(conn, layer: str):
+    """Recompute layer_stats for a hazard polygon layer"""
+    if layer not in LAYER_TABLES:
+        raise ValueError(f"Unknown hazard layer '{layer}'. Use one of: {list(LAYER_TABLES)}")
+    table = LAYER_TABLES[layer]
+
+    conn.execute(text(f"""
+        INSERT INTO layer_stats (layer, total_count, min_risk, max_risk, avg_risk, risk_distribution, updated_at)
+        SELECT
+            :layer,
+            COUNT(*),
+            MIN(risk_level),
+            MAX(risk_level),
+            AVG(risk_level),
+            COALESCE((
+                SELECT json_agg(json_build_object('risk_level', risk_level, 'count', count) ORDER BY risk_level)
+                FROM (SELECT risk_level, COUNT(*) AS count FROM {table} GROUP BY risk_level) distribution
+            ), '[]'::json),
+            now()
+        FROM {table}
+        ON CONFLICT (layer) DO UPDATE SET
+            total_count = EXCLUDED.total_count,
+            min_risk = EXCLUDED.min_risk,
+            max_risk = EXCLUDED.max_risk,
+            avg_risk = EXCLUDED.avg_risk,
+            risk_distribution = EXCLUDED.risk_distribution,
+            updated_at = EXCLUDED.updated_at
+    """), {"layer": layer})
+
+
+def get_layer_stats(conn, layer: str, primary=None) -> Optional[Dict]:
+    """
+    layer_stats row for a layer, computing it on first use
+
+    Args:
+        conn: Connection to read from
+        layer: "flood" or "landslide"
+        primary: Engine for the first-use refresh when conn is read-only (a replica); default: conn
+    """
+    query = text("""
+        SELECT total_count, min_risk, max_risk, avg_risk, risk_distribution, updated_at
+        FROM layer_stats WHERE layer = :layer
+    """)
+    row = conn.execute(query, {"layer": layer}).fetchone()
+    if row is None and primary is not None:
+        with primary.begin() as write_conn:
+            refresh_layer_stats(write_conn, layer)
+            row = write_conn.execute(query, {"layer": layer}).fetchone()
+    elif row is None:
+        refresh_layer_stats(conn, layer)
+        row = conn.execute(query, {"layer": layer}).fetchone()
+    if row is None:
+        return None
+    return {
+        "total_count": int(row[0]),
+        "min_risk": row[1],
+        "max_risk": row[2],
+        "avg_risk": row[3],
+        "risk_distribution": row[4] or [],
+        "updated_at": row[5],
+    }
+
+
+if __name__ == "__main__":
+    from .base import engine
+
+    action = sys.argv[1] if len(sys.argv) > 1 else "rebuild"
+    if action == "rebuild":
+        for name in ROLLUP_DATASETS:
+            with engine.begin() as rebuild_conn:
+                print(f"📊 {name}: {rebuild_rollups(rebuild_conn, name)} rollup rows")
+    elif action == "layers":
+        for name in LAYER_TABLES:
+            with engine.begin() as layer_conn:
+                refresh_layer_stats(layer_conn, name)
+                print(f"📊 Refreshed layer_stats for {name}")
+    else:
+        print("Usage: python -m db.rollups [rebuild|layers]")
+        sys.exit(1)
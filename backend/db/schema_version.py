@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Schema version check and upgrade helpers
+The app only compares the database's Alembic revision against the migration head at startup;
+schema changes are applied with `alembic upgrade head` (or init_db.py), never on boot.
+"""
+
+import os
+import sys
+from typing import Optional
+
+from alembic import command
+from alembic.config import Config
+from alembic.script import ScriptDirectory
+from sqlalchemy import text
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def get_alembic_config() -> Config:
+    """Alembic config that works regardless of the current working directory"""
+    config = Config(os.path.join(BACKEND_DIR, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(BACKEND_DIR, "migrations"))
+    return config
+
+
+def get_head_revision() -> Optional[str]:
+    """Latest revision in migrations/versions (reads the scripts, no database access)"""
+    return ScriptDirectory.from_config(get_alembic_config()).get_current_head()
+
+
+def get_database_revision() -> Optional[str]:
+    """Revision recorded in alembic_version, or None for an unversioned database"""
+    from .base import engine
+
+    with engine.connect() as conn:
+        has_version_table = conn.execute(text("SELECT to_regclass('alembic_version') IS NOT NULL")).scalar()
+        if not has_version_table:
+            return None
+        return conn.execute(text("SELECT version_num FROM alembic_version")).scalar()
+
+
+def check_schema_version() -> bool:
+    """
+    Compare the database revision with the migration head
+
+    Returns:
+        True when the schema is up to date. Mismatches are reported but not fatal, matching how
+        the app previously carried on after a failed setup_database().
+    """
+    try:
+        head = get_head_revision()
+        current = get_database_revision()
+    except Exception as e:
+        print(f"⚠️ Could not check schema version: {e}")
+        return False
+
+    if current == head:
+        print(f"✅ Database schema at revision {current}")
+        return True
+
+    if current is None:
+        print("⚠️ Database schema is not versioned. Run: python init_db.py  (or: alembic upgrade head)")
+    else:
+        print(f"⚠️ Database schema at revision {current}, code expects {head}. Run: alembic upgrade head")
+    return False
+
+
+def upgrade_to_head():
+    """Apply all pending migrations"""
+    print("🗄️ Applying database migrations...")
+    command.upgrade(get_alembic_config(), "head")
+    print(f"✅ Database schema at revision {get_head_revision()}")
+
+
+if __name__ == "__main__":
+    """python -m db.schema_version [check|upgrade]"""
+    action = sys.argv[1] if len(sys.argv) > 1 else "check"
+    if action == "upgrade":
+        upgrade_to_head()
+    else:
+        sys.exit(0 if check_schema_version() else 1)
@@ -73,6 +73,25 @@ def enable_postgis_extension():
         raise
 
 
+def populate_stale_subdivided_tables():
+    """Build *_data_subdivided for any hazard layer that has polygons but no subdivided pieces"""
+    from .base import SessionLocal
+    from .queries import SUBDIVIDED_HAZARD_TABLES, rebuild_subdivided_hazard_table, subdivided_hazard_table_is_stale
+
+    db = SessionLocal()
+    try:
+        for layer in SUBDIVIDED_HAZARD_TABLES:
+            if subdivided_hazard_table_is_stale(db, layer):
+                print(f"✂️ Subdividing {layer} polygons (first run)...")
+                pieces = rebuild_subdivided_hazard_table(db, layer)
+                print(f"✅ {layer}_data_subdivided populated with {pieces} pieces")
+    except Exception as e:
+        db.rollback()
+        print(f"⚠️ Could not populate subdivided hazard tables: {e}")
+    finally:
+        db.close()
+
+
 def setup_database():
     """Complete database setup process"""
     print("🗄️ Setting up PostgreSQL database with PostGIS...")
@@ -84,9 +103,12 @@ def setup_database():
         # Step 2: Enable PostGIS extension
         enable_postgis_extension()
         
-        # Step 3: Create tables
-        from .base import create_tables
-        create_tables()
+        # Step 3: Create/upgrade tables and indexes through the versioned migrations
+        from .schema_version import upgrade_to_head
+        upgrade_to_head()
+        
+        # Step 4: Populate subdivided hazard tables for databases ingested before they existed
+        populate_stale_subdivided_tables()
         
         print("✅ Database setup completed successfully!")
         return True
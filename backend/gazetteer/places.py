@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+Philippine place gazetteer
+Loads a PSGC-style CSV of cities, municipalities and barangays once and serves two lookups:
+
+- find_place(text): place names mentioned in free text, matched on whole words by walking a token
+  trie built from every name and alias (one pass over the text, independent of gazetteer size)
+- nearest_place(lat, lng): reverse lookup through a KD-tree over the places' unit-sphere vectors
+
+CSV columns: psgc_code, name, level (City / Mun / Bgy), city_municipality (parent of a barangay),
+province, latitude, longitude, aliases ("|"-separated), featured (map order of the frontend cities).
+The bundled places.csv is a seed; point GAZETTEER_PATH at a full PSGC export for every barangay.
+"""
+
+import csv
+import math
+import os
+import re
+import sys
+import threading
+import time
+import unicodedata
+from typing import Dict, List, Optional, Sequence, Tuple
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import GAZETTEER_PATH
+
+DEFAULT_GAZETTEER_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "places.csv")
+EARTH_RADIUS_KM = 6371.0
+# Cities and municipalities win over barangays that share a name ("Poblacion" exists everywhere)
+LEVEL_RANK = {"city": 0, "mun": 1, "bgy": 2}
+_END = ""
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def name_tokens(name: str) -> List[str]:
+    """Lowercase words of a name with accents stripped (Parañaque -> paranaque)"""
+    if not name.isascii():  # most messages are plain ASCII and skip the Unicode decomposition
+        name = unicodedata.normalize("NFKD", name).encode("ascii", "ignore").decode("ascii")
+    return _TOKEN_RE.findall(name.lower())
+
+
+def normalize_name(name: str) -> str:
+    """Lowercase, strip accents (Parañaque -> paranaque) and collapse punctuation to single spaces"""
+    return " ".join(name_tokens(name))
+
+
+def _unit_vector(lat: float, lng: float) -> Tuple[float, float, float]:
+    lat, lng = math.radians(lat), math.radians(lng)
+    return (math.cos(lat) * math.cos(lng), math.cos(lat) * math.sin(lng), math.sin(lat))
+
+
+def _chord_to_km(chord_squared: float) -> float:
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(chord_squared) / 2))
+
+
+class _KDTree:
+    """Static 3-d tree over unit vectors; squared chord length orders points like great-circle distance"""
+
+    def __init__(self, points: Sequence[Tuple[float, float, float]]):
+        self._root = self._build(list(enumerate(points)), 0)
+
+    def _build(self, items: List, depth: int):
+        if not items:
+            return None
+        axis = depth % 3
+        items.sort(key=lambda item: item[1][axis])
+        middle = len(items) // 2
+        index, point = items[middle]
+        return (point, index, axis,
+                self._build(items[:middle], depth + 1), self._build(items[middle + 1:], depth + 1))
+
+    def nearest(self, target: Tuple[float, float, float]) -> Tuple[int, float]:
+        """(index, squared chord distance) of the closest point"""
+        best = [-1, float("inf")]
+
+        def search(node):
+            if node is None:
+                return
+            point, index, axis, left, right = node
+            distance = ((point[0] - target[0]) ** 2 + (point[1] - target[1]) ** 2
+                        + (point[2] - target[2]) ** 2)
+            if distance < best[1]:
+                best[0], best[1] = index, distance
+            diff = target[axis] - point[axis]
+            near, far = (left, right) if diff < 0 else (right, left)
+            search(near)
+            if diff * diff < best[1]:
+                search(far)
+
+        search(self._root)
+        return best[0], best[1]
+
+
+class Gazetteer:
+    """In-memory place index built from a gazetteer CSV"""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or GAZETTEER_PATH or DEFAULT_GAZETTEER_PATH
+        start = time.perf_counter()
+        self.places: List[Dict] = []
+        self._trie: Dict = {}
+        self._by_name: Dict[str, List[int]] = {}
+        with open(self.path, newline="", encoding="utf-8") as handle:
+            for row in csv.DictReader(handle):
+                self._add(row)
+        self._tree = _KDTree([_unit_vector(p["latitude"], p["longitude"]) for p in self.places])
+        self._name_keys = [normalize_name(p["name"]) for p in self.places]
+        self._ranks = [LEVEL_RANK.get(p["level"].lower(), LEVEL_RANK["bgy"]) for p in self.places]
+        self._parent_keys = [normalize_name(p["city_municipality"] or "") for p in self.places]
+        print(f"🗺️ Gazetteer loaded {len(self.places)} places from {self.path} "
+              f"in {(time.perf_counter() - start) * 1000:.0f}ms")
+
+    def _add(self, row: Dict) -> None:
+        try:
+            place = {
+                "psgc_code": (row.get("psgc_code") or "").strip() or None,
+                "name": row["name"].strip(),
+                "level": (row.get("level") or "").strip(),
+                "city_municipality": (row.get("city_municipality") or "").strip() or None,
+                "province": (row.get("province") or "").strip() or None,
+                "latitude": float(row["latitude"]),
+                "longitude": float(row["longitude"]),
+                "featured": int(row["featured"]) if (row.get("featured") or "").strip() else None,
+            }
+        except (KeyError, ValueError, AttributeError):
+            return  # rows without usable coordinates cannot be resolved or reverse-looked-up
+        index = len(self.places)
+        self.places.append(place)
+
+        names = {place["name"]}
+        names.update(alias for alias in (row.get("aliases") or "").split("|") if alias.strip())
+        # PSGC writes chartered cities as "City of X"
+        if place["name"].lower().startswith("city of "):
+            names.add(place["name"][8:])
+            names.add(place["name"][8:] + " City")
+        for name in names:
+            key = normalize_name(name)
+            if not key:
+                continue
+            self._by_name.setdefault(key, []).append(index)
+            node = self._trie
+            for token in key.split():
+                node = node.setdefault(token, {})
+            node.setdefault(_END, []).append(index)
+
+    def match(self, text: str) -> List[Tuple[int, int, int]]:
+        """
+        Every place name in text as (token_start, token_end, place_index); names inside a longer
+        matched name ("cebu" in "cebu city") are dropped
+        """
+        tokens = name_tokens(text)
+        trie = self._trie
+        if trie.keys().isdisjoint(tokens):  # no word starts a place name (one C-level pass)
+            return []
+        spans = []
+        # Most words start no place name; find the ones that do in one comprehension
+        for start in [i for i, token in enumerate(tokens) if token in trie]:
+            node = trie[tokens[start]]
+            longest = (start + 1, node[_END]) if _END in node else None
+            for end in range(start + 1, len(tokens)):
+                node = node.get(tokens[end])
+                if node is None:
+                    break
+                if _END in node:
+                    longest = (end + 1, node[_END])
+            if longest and (not spans or longest[0] > spans[-1][1]):
+                spans.append((start, longest[0], longest[1]))
+        return [(start, end, index) for start, end, indexes in spans for index in indexes]
+
+    def find_place(self, text: str) -> Optional[Dict]:
+        """
+        The place a message is about
+
+        A barangay wins when its city/municipality is mentioned too ("Lahug, Cebu City"); otherwise
+        the first city or municipality mentioned, then the first barangay.
+        """
+        matches = self.match(text)
+        if not matches:
+            return None
+        mentioned = {self._name_keys[index] for _, _, index in matches}
+        scoped = [index for _, _, index in matches
+                  if self._ranks[index] == LEVEL_RANK["bgy"] and self._parent_keys[index] in mentioned]
+        if scoped:
+            return self.places[scoped[0]]
+        best = min(matches, key=lambda match: (self._ranks[match[2]], match[0], match[2]))
+        return self.places[best[2]]
+
+    def lookup(self, name: str) -> Optional[Dict]:
+        """Place by exact name or alias (case/accent-insensitive), preferring cities"""
+        indexes = self._by_name.get(normalize_name(name))
+        if not indexes:
+            return None
+        return self.places[min(indexes, key=lambda index: (self._ranks[index], index))]
+
+    def nearest_place(self, lat: float, lng: float, max_km: Optional[float] = None) -> Optional[Dict]:
+        """
+        Closest place to a coordinate
+
+        Returns:
+            The place dict plus distance_km, or None if the gazetteer is empty or nothing is within max_km
+        """
+        if not self.places:
+            return None
+        index, chord_squared = self._tree.nearest(_unit_vector(lat, lng))
+        distance_km = _chord_to_km(chord_squared)
+        if max_km is not None and distance_km > max_km:
+            return None
+        return {**self.places[index], "distance_km": round(distance_km, 3)}
+
+    def featured(self) -> List[Dict]:
+        """Cities shown on the frontend map, in map order"""
+        return sorted((p for p in self.places if p["featured"] is not None), key=lambda p: p["featured"])
+
+
+_gazetteer: Optional[Gazetteer] = None
+_gazetteer_lock = threading.Lock()
+
+
+def get_gazetteer() -> Gazetteer:
+    """Process-wide gazetteer (loaded on first use)"""
+    global _gazetteer
+    if _gazetteer is None:  # lock only for the first load; every message calls this
+        with _gazetteer_lock:
+            if _gazetteer is None:
+                _gazetteer = Gazetteer()
+    return _gazetteer
+
+
+if __name__ == "__main__":
+    gazetteer = get_gazetteer()
+    if len(sys.argv) == 3:
+        print(gazetteer.nearest_place(float(sys.argv[1]), float(sys.argv[2])))
+    else:
+        print(gazetteer.find_place(" ".join(sys.argv[1:]) or "What is the weather in Cebu City?"))
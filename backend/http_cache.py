@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+Conditional, pre-compressed responses for hazard map data
+
+Each hazard layer's version is layer_stats.updated_at, which is bumped after every flood/landslide
+ingestion (ingest/post_ingestion.py). Responses carry an ETag built from that version and the
+request URL plus a matching Last-Modified, so a client revalidating an unchanged layer gets
+304 Not Modified without the body being rebuilt.
+
+Bodies are cached in process per (layer version, URL). Brotli and gzip variants are compressed once
+when the entry is filled, and each request gets the best variant its Accept-Encoding allows.
+A new ingestion changes the version, so stale entries are never served and age out of the LRU.
+
+Streamed full exports are too large to cache; they get the same validators and are gzip-compressed
+on the fly when the client accepts it.
+"""
+
+import gzip
+import hashlib
+import os
+import sys
+import threading
+import zlib
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+from flask import Response, request, stream_with_context
+from sqlalchemy import text
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from config import (
+    HTTP_CACHE_ENABLED, HTTP_CACHE_MAX_BYTES, HTTP_CACHE_MAX_AGE, HTTP_CACHE_BROTLI_QUALITY,
+    HTTP_CACHE_GZIP_LEVEL, HTTP_CACHE_MIN_COMPRESS_BYTES,
+)
+
+try:
+    import brotli
+except ImportError:  # optional: gzip only
+    brotli = None
+
+
+def _compress(body: bytes) -> Dict[str, bytes]:
+    """identity plus every encoding worth sending, compressed once"""
+    variants = {"identity": body}
+    if len(body) < HTTP_CACHE_MIN_COMPRESS_BYTES:
+        return variants
+    variants["gzip"] = gzip.compress(body, compresslevel=HTTP_CACHE_GZIP_LEVEL)
+    if brotli is not None:
+        variants["br"] = brotli.compress(body, quality=HTTP_CACHE_BROTLI_QUALITY)
+    return variants
+
+
+def choose_encoding(accept_encoding: str, available) -> str:
+    """Best of br / gzip / identity allowed by an Accept-Encoding header (q=0 excludes a coding)"""
+    accepted = {}
+    for part in (accept_encoding or "").split(","):
+        coding, _, params = part.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[coding] = q
+    for coding in ("br", "gzip"):
+        if coding in available and accepted.get(coding, accepted.get("*", 0.0)) > 0:
+            return coding
+    return "identity"
+
+
+class CompressedResponseCache:
+    """LRU of pre-compressed bodies bounded by total stored bytes"""
+
+    def __init__(self, max_bytes: int = HTTP_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Tuple, Dict[str, bytes]]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _entry_size(variants: Dict[str, bytes]) -> int:
+        return sum(len(body) for body in variants.values())
+
+    def get(self, key: Tuple) -> Optional[Dict[str, bytes]]:
+        with self._lock:
+            variants = self._entries.get(key)
+            if variants is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return variants
+
+    def put(self, key: Tuple, variants: Dict[str, bytes]) -> None:
+        size = self._entry_size(variants)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._size -= self._entry_size(old)
+            self._entries[key] = variants
+            self._size += size
+            while self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= self._entry_size(evicted)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {"entries": len(self._entries), "bytes": self._size, "max_bytes": self.max_bytes,
+                    "hits": self.hits, "misses": self.misses, "brotli": brotli is not None}
+
+
+response_cache = CompressedResponseCache()
+
+
+def get_layer_version(conn, layer: str):
+    """layer_stats.updated_at for a hazard layer (None before its first ingestion)"""
+    row = conn.execute(text("SELECT updated_at FROM layer_stats WHERE layer = :layer"),
+                       {"layer": layer}).fetchone()
+    return row[0] if row else None
+
+
+def _etag(layer: str, version) -> str:
+    # Same URL and same layer version -> same body
+    url_hash = hashlib.sha1(request.full_path.encode("utf-8")).hexdigest()[:16]
+    return f"{layer}-{int(version.timestamp() * 1_000_000)}-{url_hash}"
+
+
+def _is_not_modified(etag: str, version) -> bool:
+    if request.if_none_match:
+        return request.if_none_match.contains_weak(etag)
+    if request.if_modified_since is not None:
+        return version.replace(microsecond=0) <= request.if_modified_since
+    return False
+
+
+def _with_validators(response: Response, etag: str, version) -> Response:
+    response.set_etag(etag)
+    response.last_modified = version
+    response.headers["Cache-Control"] = f"public, max-age={HTTP_CACHE_MAX_AGE}, must-revalidate"
+    response.vary.add("Accept-Encoding")
+    return response
+
+
+def conditional_layer_response(conn, layer: str, build_body: Callable[[], bytes],
+                               mimetype: str = "application/json") -> Optional[Response]:
+    """
+    Serve a hazard-layer response with ETag/Last-Modified, 304 handling and negotiated compression
+
+    Args:
+        conn: Connection used to read the layer version
+        layer: "flood" or "landslide"
+        build_body: Builds the uncompressed JSON body (only called on a cache miss)
+
+    Returns:
+        The response (304 or full), or None when caching is off / the layer has no version yet
+    """
+    if not HTTP_CACHE_ENABLED:
+        return None
+    version = get_layer_version(conn, layer)
+    if version is None:
+        return None
+    etag = _etag(layer, version)
+
+    if _is_not_modified(etag, version):
+        print(f"♻️ {layer} unchanged since {version.isoformat()}, 304")
+        return _with_validators(Response(status=304), etag, version)
+
+    key = (layer, etag)
+    variants = response_cache.get(key)
+    if variants is None:
+        variants = _compress(build_body())
+        response_cache.put(key, variants)
+        sizes = ", ".join(f"{coding} {len(body) / 1024:.0f}KB" for coding, body in variants.items())
+        print(f"🗜️ Cached {layer} response ({sizes})")
+
+    encoding = choose_encoding(request.headers.get("Accept-Encoding", ""), variants)
+    response = Response(variants[encoding], mimetype=mimetype)
+    if encoding != "identity":
+        response.headers["Content-Encoding"] = encoding
+    return _with_validators(response, etag, version)
+
+
+def _gzip_stream(chunks: Iterable) -> Iterable[bytes]:
+    """gzip-compress a body incrementally as it is generated"""
+    compressor = zlib.compressobj(HTTP_CACHE_GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk.encode("utf-8") if isinstance(chunk, str) else chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def streamed_layer_response(conn, layer: str, chunks: Iterable,
+                            mimetype: str = "application/json") -> Response:
+    """
+    Stream a hazard-layer body with the layer's ETag/Last-Modified, 304 handling and gzip
+
+    Args:
+        conn: Connection used to read the layer version
+        layer: "flood" or "landslide"
+        chunks: Generator of str/bytes body chunks (not started on a 304)
+    """
+    version = get_layer_version(conn, layer) if HTTP_CACHE_ENABLED else None
+    if version is not None:
+        etag = _etag(layer, version)
+        if _is_not_modified(etag, version):
+            print(f"♻️ {layer} unchanged since {version.isoformat()}, 304")
+            return _with_validators(Response(status=304), etag, version)
+
+    gzipped = choose_encoding(request.headers.get("Accept-Encoding", ""), ("gzip",)) == "gzip"
+    response = Response(stream_with_context(_gzip_stream(chunks) if gzipped else chunks), mimetype=mimetype)
+    if gzipped:
+        response.headers["Content-Encoding"] = "gzip"
+    if version is not None:
+        return _with_validators(response, etag, version)
+    response.vary.add("Accept-Encoding")
+    return response
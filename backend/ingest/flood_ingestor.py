@@ -3,6 +3,7 @@ import pandas as pd
 from shapely.geometry import shape, MultiPolygon, Polygon
 from db.base import SessionLocal
 from db.queries import add_flood_data
+from ingest.post_ingestion import refresh_hazard_layer
 import math
 from typing import List, Tuple, Optional
 import logging
@@ -336,6 +337,8 @@ class FloodIngestor:
                     logger.info(f"  - Average risk: {risk_values.mean():.2f}")
                     logger.info(f"  - Unique values: {sorted(risk_values.unique())}")
             
+            refresh_hazard_layer("flood")
+            
         except Exception as e:
             logger.error(f"❌ Error ingesting shapefile: {e}")
             raise
@@ -3,6 +3,7 @@ import pandas as pd
 from shapely.geometry import shape, MultiPolygon, Polygon
 from db.base import SessionLocal
 from db.queries import add_landslide_data
+from ingest.post_ingestion import refresh_hazard_layer
 import math
 from typing import List, Tuple, Optional
 import logging
@@ -339,6 +340,8 @@ class LandslideIngestor:
                     for risk_level, count in risk_counts.items():
                         logger.info(f"    Risk {risk_level}: {count} areas")
             
+            refresh_hazard_layer("landslide")
+            
         except Exception as e:
             logger.error(f"❌ Error ingesting landslide shapefile: {e}")
             raise
@@ -0,0 +1,70 @@
+"""
+Post-ingestion maintenance for hazard layers
+Rebuilds the derived lookup structures, statistics and file exports after flood/landslide polygons change.
+"""
+
+import logging
+
+from config import HAZARD_EXPORTS_ENABLED, HAZARD_RASTER_ENABLED
+from db.base import SessionLocal, engine
+from db.queries import rebuild_subdivided_hazard_table
+from db.rollups import bump_layer_version, refresh_layer_stats
+
+logger = logging.getLogger(__name__)
+
+
+def refresh_hazard_layer(layer: str):
+    """
+    Rebuild derived data for a hazard layer after ingestion
+
+    Failures are logged but never raised so a finished ingestion is not reported as failed;
+    the derived structures can be rebuilt later from the CLI.
+
+    Args:
+        layer: "flood" or "landslide"
+    """
+    # New layer version first (HTTP cache validators), independent of the statistics refresh below
+    try:
+        with engine.begin() as conn:
+            bump_layer_version(conn, layer)
+    except Exception as e:
+        logger.error(f"❌ Failed to bump {layer} layer version: {e}")
+
+    db = SessionLocal()
+    try:
+        pieces = rebuild_subdivided_hazard_table(db, layer)
+        logger.info(f"✂️ Rebuilt {layer}_data_subdivided with {pieces} pieces")
+    except Exception as e:
+        db.rollback()
+        logger.error(f"❌ Failed to rebuild {layer}_data_subdivided: {e}")
+    finally:
+        db.close()
+
+    try:
+        with engine.begin() as conn:
+            refresh_layer_stats(conn, layer)
+        logger.info(f"📊 Refreshed {layer} layer statistics")
+    except Exception as e:
+        logger.error(f"❌ Failed to refresh {layer} layer statistics: {e}")
+
+    if HAZARD_RASTER_ENABLED:
+        try:
+            from db.hazard_raster import rebuild_hazard_raster
+            rebuild_hazard_raster(layer)
+        except Exception as e:
+            logger.error(f"❌ Failed to rebuild {layer} hazard raster: {e}")
+
+    if HAZARD_EXPORTS_ENABLED:
+        try:
+            from db.exports import rebuild_hazard_exports
+            rebuild_hazard_exports(layer)
+        except Exception as e:
+            logger.error(f"❌ Failed to export {layer} to FlatGeobuf/GeoParquet: {e}")
+
+
+if __name__ == "__main__":
+    """Rebuild derived hazard data: python -m ingest.post_ingestion [flood|landslide]"""
+    import sys
+    logging.basicConfig(level=logging.INFO)
+    for hazard_layer in ([sys.argv[1]] if len(sys.argv) > 1 else ["flood", "landslide"]):
+        refresh_hazard_layer(hazard_layer)
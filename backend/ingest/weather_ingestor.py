@@ -3,10 +3,13 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from weather.google_weather_api import GoogleWeatherAPI
+from weather.async_collector import fetch_weather_concurrently
+from weather.batch_writer import WeatherBatchWriter, observation_from_weather_data
+from weather.weather_cache import mark_weather_stored
+from gazetteer.places import get_gazetteer
 from db.base import SessionLocal
 from db.queries import add_weather_data
 from datetime import datetime
-import time
 
 
 class WeatherIngestor:
@@ -30,13 +33,26 @@ class WeatherIngestor:
         try:
             print(f"🌤️ Fetching weather data for location: ({lat:.4f}, {lng:.4f})")
             
-            # Get weather data from API
-            weather_data = self.weather_api.get_weather_data(lat, lng)
+            # Fresh observations only: this records history
+            weather_data = self.weather_api.get_weather_data(lat, lng, allow_stale=False)
+            return self._store_weather_data(weather_data, lat, lng, station_name)
             
+        except Exception as e:
+            print(f"❌ Error ingesting weather data: {e}")
+            return False
+
+    def _store_weather_data(self, weather_data: dict, lat: float, lng: float, station_name: str = None):
+        """Save one fetched weather dictionary to the database"""
+        try:
             if not weather_data:
                 print(f"❌ Failed to get weather data for location ({lat}, {lng})")
                 return False
             
+            # A cached observation that is already stored is not stored again
+            if weather_data.get('weather_data_id'):
+                print(f"🗃️ Reusing weather_data {weather_data['weather_data_id']} for ({lat:.4f}, {lng:.4f})")
+                return True
+            
             # Extract data
             current = weather_data['current']
             location = weather_data['location']
@@ -45,7 +61,7 @@ class WeatherIngestor:
             geometry_wkt = f"POINT({lng} {lat})"
             
             # Add to database
-            add_weather_data(
+            record = add_weather_data(
                 db=self.db,
                 geometry_wkt=geometry_wkt,
                 temperature=current['temperature'],
@@ -58,6 +74,7 @@ class WeatherIngestor:
                 recorded_at=datetime.fromisoformat(current['timestamp']),
                 source=weather_data['source']
             )
+            mark_weather_stored(weather_data, record.id)
             
             print(f"✅ Successfully ingested weather data for {location['name']}")
             print(f"   Temperature: {current['temperature']}°C")
@@ -84,22 +101,34 @@ class WeatherIngestor:
         successful_ingestions = 0
         failed_ingestions = 0
         
-        for i, location_data in enumerate(locations):
-            if len(location_data) == 2:
-                lat, lng = location_data
-                station_name = None
-            else:
-                lat, lng, station_name = location_data
-            
-            print(f"\n📍 Processing location {i+1}/{len(locations)}: ({lat:.4f}, {lng:.4f})")
-            
-            if self.ingest_weather_for_location(lat, lng, station_name):
-                successful_ingestions += 1
-            else:
-                failed_ingestions += 1
-            
-            # Add delay to avoid overwhelming the API
-            time.sleep(1)
+        coordinates = [(location_data[0], location_data[1]) for location_data in locations]
+        # Fresh cache entries are not refetched; those already stored are referenced, not stored again
+        weather_data_list = fetch_weather_concurrently(self.weather_api, coordinates)
+        
+        # Buffered multi-row writes, one transaction per batch
+        with WeatherBatchWriter(self.db) as writer:
+            for index, (location_data, weather_data) in enumerate(zip(locations, weather_data_list)):
+                lat, lng = location_data[0], location_data[1]
+                station_name = location_data[2] if len(location_data) > 2 else None
+                if not weather_data:
+                    print(f"❌ Failed to get weather data for location ({lat}, {lng})")
+                    failed_ingestions += 1
+                    continue
+                if weather_data.get('weather_data_id'):
+                    successful_ingestions += 1
+                    continue
+                try:
+                    writer.add(observation_from_weather_data(weather_data, station_name), tag=index)
+                except Exception as e:
+                    # A malformed payload fails this location only
+                    print(f"❌ Skipping ({lat:.4f}, {lng:.4f}): {e}")
+                    failed_ingestions += 1
+        
+        for index, weather_data_id in writer.outcomes:
+            if weather_data_id:
+                mark_weather_stored(weather_data_list[index], weather_data_id)
+        successful_ingestions += len(writer.inserted_ids)
+        failed_ingestions += writer.failed
         
         print(f"\n📊 Ingestion Summary:")
         print(f"  ✅ Successful: {successful_ingestions}")
@@ -108,27 +137,16 @@ class WeatherIngestor:
 
     def ingest_weather_for_major_cities(self):
         """Ingest weather data for major Philippine cities"""
+        city_names = [
+            "Manila", "Cebu City", "Davao City", "Baguio", "Tarlac City", "Angeles", "San Fernando",
+            "Antipolo", "Quezon City", "Makati", "Cavite City", "Daet", "Lucena", "Legazpi",
+            "Puerto Princesa", "Tacloban", "Iloilo City", "Tagbilaran", "Ozamiz", "General Santos",
+        ]
+        # Coordinates come from the gazetteer so every collector agrees on them
+        gazetteer = get_gazetteer()
         major_cities = [
-            (14.5995, 120.9842, "Manila"),
-            (10.3157, 123.8854, "Cebu City"),
-            (7.1907, 125.4553, "Davao City"),
-            (16.4023, 120.5960, "Baguio City"),
-            (15.4700, 120.9600, "Tarlac City"),
-            (14.8448, 120.8105, "Angeles City"),
-            (15.1448, 120.5977, "San Fernando"),
-            (14.4791, 121.0433, "Antipolo"),
-            (14.6091, 121.0223, "Quezon City"),
-            (14.5547, 121.0244, "Makati"),
-            (14.4500, 120.9500, "Cavite City"),
-            (14.1016, 122.9550, "Daet"),
-            (13.9318, 121.6157, "Lucena"),
-            (13.1587, 123.7304, "Legazpi"),
-            (12.8797, 121.7740, "Puerto Princesa"),
-            (11.2404, 125.0058, "Tacloban"),
-            (10.7203, 122.5621, "Iloilo City"),
-            (9.6498, 123.8505, "Tagbilaran"),
-            (8.5379, 123.3754, "Ozamiz"),
-            (7.0734, 125.6140, "General Santos"),
+            (place["latitude"], place["longitude"], place["name"])
+            for place in map(gazetteer.lookup, city_names) if place
         ]
         
         print("🏙️ Major Cities Weather Ingestion")
@@ -0,0 +1,121 @@
+"""Baseline schema
+
+Creates the tables from db/models.py when they are missing, so the revision can be applied both
+to an empty database and to one previously built by create_all / init_db.py. Also folds in the
+weather_metadata column that update_weather_table.py used to add by hand.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+import geoalchemy2
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def _has_table(name):
+    return sa.inspect(op.get_bind()).has_table(name)
+
+
+def _has_column(table, column):
+    return column in {c["name"] for c in sa.inspect(op.get_bind()).get_columns(table)}
+
+
+def _geometry(geometry_type):
+    # Spatial GiST indexes are created explicitly (and concurrently) in 0002
+    return geoalchemy2.Geometry(geometry_type, srid=4326, spatial_index=False)
+
+
+def upgrade():
+    op.execute("CREATE EXTENSION IF NOT EXISTS postgis")
+
+    if not _has_table("flood_data"):
+        op.create_table(
+            "flood_data",
+            sa.Column("id", sa.Integer, primary_key=True, autoincrement=True),
+            sa.Column("geometry", _geometry("MULTIPOLYGON"), nullable=False),
+            sa.Column("risk_level", sa.Float, nullable=False),
+        )
+
+    if not _has_table("flood_data_subdivided"):
+        op.create_table(
+            "flood_data_subdivided",
+            sa.Column("id", sa.Integer, primary_key=True, autoincrement=True),
+            sa.Column("source_id", sa.Integer, nullable=False),
+            sa.Column("geometry", _geometry("POLYGON"), nullable=False),
+            sa.Column("risk_level", sa.Float, nullable=False),
+        )
+
+    if not _has_table("landslide_data"):
+        op.create_table(
+            "landslide_data",
+            sa.Column("id", sa.Integer, primary_key=True, autoincrement=True),
+            sa.Column("geometry", _geometry("MULTIPOLYGON"), nullable=False),
+            sa.Column("risk_level", sa.Float, nullable=False),
+        )
+
+    if not _has_table("landslide_data_subdivided"):
+        op.create_table(
+            "landslide_data_subdivided",
+            sa.Column("id", sa.Integer, primary_key=True, autoincrement=True),
+            sa.Column("source_id", sa.Integer, nullable=False),
+            sa.Column("geometry", _geometry("POLYGON"), nullable=False),
+            sa.Column("risk_level", sa.Float, nullable=False),
+        )
+
+    if not _has_table("earthquake_data"):
+        op.create_table(
+            "earthquake_data",
+            sa.Column("id", sa.Integer, primary_key=True, autoincrement=True),
+            sa.Column("geometry", _geometry("POINT"), nullable=False),
+            sa.Column("magnitude", sa.Float, nullable=False),
+            sa.Column("depth", sa.Float, nullable=True),
+            sa.Column("event_time", sa.DateTime(timezone=True), nullable=True),
+            sa.Column("location_name", sa.String(255), nullable=True),
+            sa.Column("source", sa.String(100), nullable=True),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        )
+
+    if not _has_table("weather_data"):
+        op.create_table(
+            "weather_data",
+            sa.Column("id", sa.Integer, primary_key=True, autoincrement=True),
+            sa.Column("geometry", _geometry("POINT"), nullable=False),
+            sa.Column("temperature", sa.Float, nullable=True),
+            sa.Column("humidity", sa.Float, nullable=True),
+            sa.Column("rainfall", sa.Float, nullable=True),
+            sa.Column("wind_speed", sa.Float, nullable=True),
+            sa.Column("wind_direction", sa.Float, nullable=True),
+            sa.Column("pressure", sa.Float, nullable=True),
+            sa.Column("station_name", sa.String(255), nullable=True),
+            sa.Column("recorded_at", sa.DateTime(timezone=True), nullable=True),
+            sa.Column("source", sa.String(100), nullable=True),
+            sa.Column("weather_metadata", sa.JSON, nullable=True),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        )
+    elif not _has_column("weather_data", "weather_metadata"):
+        # Adding a nullable column without a default is a catalog-only change
+        op.add_column("weather_data", sa.Column("weather_metadata", sa.JSON, nullable=True))
+
+    if not _has_table("emergency_protocol"):
+        op.create_table(
+            "emergency_protocol",
+            sa.Column("id", sa.Integer, primary_key=True, autoincrement=True),
+            sa.Column("protocol_name", sa.String(255), nullable=False),
+            sa.Column("description", sa.Text, nullable=True),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        )
+
+
+def downgrade():
+    for table in (
+        "emergency_protocol", "weather_data", "earthquake_data",
+        "landslide_data_subdivided", "landslide_data",
+        "flood_data_subdivided", "flood_data",
+    ):
+        op.execute(f"DROP TABLE IF EXISTS {table}")
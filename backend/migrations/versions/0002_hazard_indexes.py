@@ -0,0 +1,48 @@
+"""Spatial, temporal and filter indexes
+
+Builds the indexes declared on the models with CREATE INDEX CONCURRENTLY so the migration can run
+against a live database without blocking ingestion or weather collection.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19
+"""
+from db.migration_utils import create_index_concurrently, drop_index_concurrently
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+# (name, table, expression, using)
+INDEXES = [
+    ("idx_flood_data_geometry", "flood_data", "geometry", "gist"),
+    ("idx_landslide_data_geometry", "landslide_data", "geometry", "gist"),
+    ("idx_earthquake_data_geometry", "earthquake_data", "geometry", "gist"),
+    ("idx_weather_data_geometry", "weather_data", "geometry", "gist"),
+    ("idx_flood_data_subdivided_geometry", "flood_data_subdivided", "geometry", "gist"),
+    ("idx_landslide_data_subdivided_geometry", "landslide_data_subdivided", "geometry", "gist"),
+    ("ix_flood_data_risk_level", "flood_data", "risk_level", None),
+    ("ix_landslide_data_risk_level", "landslide_data", "risk_level", None),
+    ("ix_flood_data_subdivided_source_id", "flood_data_subdivided", "source_id", None),
+    ("ix_landslide_data_subdivided_source_id", "landslide_data_subdivided", "source_id", None),
+    ("ix_flood_data_subdivided_geography", "flood_data_subdivided", "(geometry::geography)", "gist"),
+    ("ix_landslide_data_subdivided_geography", "landslide_data_subdivided", "(geometry::geography)", "gist"),
+    ("ix_earthquake_data_event_time_brin", "earthquake_data", "event_time", "brin"),
+    ("ix_earthquake_data_magnitude_event_time", "earthquake_data", "magnitude, event_time", None),
+    ("ix_earthquake_data_geography", "earthquake_data", "(geometry::geography)", "gist"),
+    ("ix_weather_data_recorded_at_brin", "weather_data", "recorded_at", "brin"),
+    ("ix_weather_data_created_at_brin", "weather_data", "created_at", "brin"),
+    ("ix_weather_data_station_recorded_at", "weather_data", "station_name, recorded_at DESC", None),
+    ("ix_weather_data_geography", "weather_data", "(geometry::geography)", "gist"),
+]
+
+
+def upgrade():
+    for name, table, expression, using in INDEXES:
+        create_index_concurrently(name, table, expression, using=using)
+
+
+def downgrade():
+    for name, _, _, _ in reversed(INDEXES):
+        drop_index_concurrently(name)
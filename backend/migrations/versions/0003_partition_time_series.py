@@ -0,0 +1,246 @@
+"""Monthly RANGE partitioning for weather_data and earthquake_data
+
+The partition key (recorded_at / event_time) becomes NOT NULL and joins the primary key, which
+PostgreSQL requires for partitioned tables. Each table is swapped in place:
+
+1. rename the table to <table>_legacy and create the partitioned parent under the original name
+   (brief lock; new writes go to the partitioned table right away and reuse the id sequence)
+2. backfill NULL partition keys on the legacy table from created_at, in batches
+3. copy legacy rows across in id-ordered committed batches
+4. drop the legacy table
+
+Also creates weather_data_hourly, the downsample target used by the retention policy.
+
+Self-contained on purpose: the partition DDL and batch helpers are inlined with fixed parameters,
+so later changes to db/partitions.py, db/migration_utils.py or .env do not change this revision.
+Partitions after the initial range come from `python -m db.partitions maintain`.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19
+"""
+from datetime import datetime, timezone
+
+from alembic import op
+import sqlalchemy as sa
+import geoalchemy2
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+MONTHS_AHEAD = 3  # monthly partitions created past the current month
+BACKFILL_BATCH_SIZE = 5000
+COPY_BATCH_SIZE = 10000
+
+TABLES = {
+    "weather_data": {
+        "key": "recorded_at",
+        "columns": """
+            id integer NOT NULL DEFAULT nextval('{sequence}'),
+            geometry geometry(POINT, 4326) NOT NULL,
+            temperature double precision,
+            humidity double precision,
+            rainfall double precision,
+            wind_speed double precision,
+            wind_direction double precision,
+            pressure double precision,
+            station_name varchar(255),
+            recorded_at timestamptz NOT NULL DEFAULT now(),
+            source varchar(100),
+            weather_metadata json,
+            created_at timestamptz DEFAULT now()
+        """,
+        "column_list": "id, geometry, temperature, humidity, rainfall, wind_speed, wind_direction, "
+                       "pressure, station_name, recorded_at, source, weather_metadata, created_at",
+        "indexes": [
+            ("idx_weather_data_geometry", "USING gist (geometry)"),
+            ("ix_weather_data_recorded_at_brin", "USING brin (recorded_at)"),
+            ("ix_weather_data_created_at_brin", "USING brin (created_at)"),
+            ("ix_weather_data_station_recorded_at", "(station_name, recorded_at DESC)"),
+            ("ix_weather_data_geography", "USING gist ((geometry::geography))"),
+        ],
+    },
+    "earthquake_data": {
+        "key": "event_time",
+        "columns": """
+            id integer NOT NULL DEFAULT nextval('{sequence}'),
+            geometry geometry(POINT, 4326) NOT NULL,
+            magnitude double precision NOT NULL,
+            depth double precision,
+            event_time timestamptz NOT NULL DEFAULT now(),
+            location_name varchar(255),
+            source varchar(100),
+            created_at timestamptz DEFAULT now()
+        """,
+        "column_list": "id, geometry, magnitude, depth, event_time, location_name, source, created_at",
+        "indexes": [
+            ("idx_earthquake_data_geometry", "USING gist (geometry)"),
+            ("ix_earthquake_data_event_time_brin", "USING brin (event_time)"),
+            ("ix_earthquake_data_magnitude_event_time", "(magnitude, event_time)"),
+            ("ix_earthquake_data_geography", "USING gist ((geometry::geography))"),
+        ],
+    },
+}
+
+
+def _month_start(value):
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc).replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def _next_month(value):
+    return value.replace(year=value.year + value.month // 12, month=value.month % 12 + 1)
+
+
+def _create_partitions(table, oldest):
+    """DEFAULT partition plus one partition per month from oldest to MONTHS_AHEAD past now"""
+    op.execute(f"CREATE TABLE {table}_default PARTITION OF {table} DEFAULT")
+    start = _month_start(oldest)
+    last = _month_start(datetime.now(timezone.utc))
+    for _ in range(MONTHS_AHEAD):
+        last = _next_month(last)
+    while start <= last:
+        end = _next_month(start)
+        op.execute(f"CREATE TABLE {table}_p{start:%Y%m} PARTITION OF {table} "
+                   f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')")
+        start = end
+
+
+def _batched_backfill(table, set_clause, where_clause):
+    """UPDATE in committed batches of BACKFILL_BATCH_SIZE rows"""
+    total = 0
+    with op.get_context().autocommit_block():
+        bind = op.get_bind()
+        while True:
+            updated = bind.execute(sa.text(f"""
+                UPDATE {table} SET {set_clause}
+                WHERE id IN (
+                    SELECT id FROM {table}
+                    WHERE {where_clause}
+                    LIMIT :batch_size
+                    FOR UPDATE SKIP LOCKED
+                )
+            """), {"batch_size": BACKFILL_BATCH_SIZE}).rowcount or 0
+            if updated == 0:
+                return total
+            total += updated
+            print(f"  🔄 Backfilled {total} rows in {table}...")
+
+
+def _batched_copy(source_table, target_table, columns):
+    """INSERT ... SELECT in id-ordered committed batches of COPY_BATCH_SIZE rows"""
+    total = 0
+    last_id = None
+    with op.get_context().autocommit_block():
+        bind = op.get_bind()
+        while True:
+            id_filter = "WHERE id > :last_id" if last_id is not None else ""
+            copied, max_id = bind.execute(sa.text(f"""
+                WITH batch AS (
+                    SELECT {columns} FROM {source_table}
+                    {id_filter}
+                    ORDER BY id
+                    LIMIT :batch_size
+                ), inserted AS (
+                    INSERT INTO {target_table} ({columns})
+                    SELECT {columns} FROM batch
+                    RETURNING id
+                )
+                SELECT COUNT(*), MAX(id) FROM inserted
+            """), {"batch_size": COPY_BATCH_SIZE, "last_id": last_id}).fetchone()
+            if not copied:
+                return total
+            total += copied
+            last_id = max_id
+            print(f"  🔄 Copied {total} rows from {source_table} to {target_table}...")
+
+
+def _sequence_for(table):
+    return op.get_bind().execute(sa.text("SELECT pg_get_serial_sequence(:table, 'id')"),
+                                 {"table": table}).scalar()
+
+
+def _rename_indexes(table, suffix):
+    """Free the index/constraint names so the new table can reuse them"""
+    names = op.get_bind().execute(sa.text(
+        "SELECT indexname FROM pg_indexes WHERE schemaname = current_schema() AND tablename = :table"
+    ), {"table": table}).scalars().all()
+    for name in names:
+        op.execute(f"ALTER INDEX {name} RENAME TO {name[:63 - len(suffix)]}{suffix}")
+
+
+def _swap_in_partitioned(table, spec):
+    legacy = f"{table}_legacy"
+    sequence = _sequence_for(table)
+
+    # Keep the sequence alive when the legacy table is dropped
+    op.execute(f"ALTER SEQUENCE {sequence} OWNED BY NONE")
+    op.execute(f"ALTER TABLE {table} RENAME TO {legacy}")
+    _rename_indexes(legacy, "_legacy")
+
+    op.execute(f"""
+        CREATE TABLE {table} (
+            {spec['columns'].format(sequence=sequence)},
+            PRIMARY KEY (id, {spec['key']})
+        ) PARTITION BY RANGE ({spec['key']})
+    """)
+
+    oldest = op.get_bind().execute(sa.text(
+        f"SELECT MIN(COALESCE({spec['key']}, created_at)) FROM {legacy}"
+    )).scalar()
+    _create_partitions(table, oldest or datetime.now(timezone.utc))
+
+    # Indexes on the (still empty) parent cascade to every partition
+    for name, definition in spec["indexes"]:
+        op.execute(f"CREATE INDEX {name} ON {table} {definition}")
+    return legacy, sequence
+
+
+def upgrade():
+    for table, spec in TABLES.items():
+        legacy, sequence = _swap_in_partitioned(table, spec)
+
+        _batched_backfill(legacy, f"{spec['key']} = COALESCE(created_at, now())", f"{spec['key']} IS NULL")
+        _batched_copy(legacy, table, spec["column_list"])
+
+        op.execute(f"DROP TABLE {legacy}")
+        op.execute(f"ALTER SEQUENCE {sequence} OWNED BY {table}.id")
+
+    op.create_table(
+        "weather_data_hourly",
+        sa.Column("station_name", sa.String(255), primary_key=True),
+        sa.Column("bucket_start", sa.DateTime(timezone=True), primary_key=True),
+        sa.Column("geometry", geoalchemy2.Geometry("POINT", srid=4326, spatial_index=False), nullable=False),
+        sa.Column("avg_temperature", sa.Float),
+        sa.Column("avg_humidity", sa.Float),
+        sa.Column("total_rainfall", sa.Float),
+        sa.Column("max_rainfall", sa.Float),
+        sa.Column("avg_wind_speed", sa.Float),
+        sa.Column("max_wind_speed", sa.Float),
+        sa.Column("avg_pressure", sa.Float),
+        sa.Column("sample_count", sa.Integer, nullable=False),
+    )
+    op.execute("CREATE INDEX ix_weather_data_hourly_bucket_start_brin ON weather_data_hourly USING brin (bucket_start)")
+
+
+def downgrade():
+    op.drop_table("weather_data_hourly")
+
+    for table, spec in TABLES.items():
+        legacy = f"{table}_partitioned"
+        sequence = _sequence_for(table)
+        op.execute(f"ALTER SEQUENCE {sequence} OWNED BY NONE")
+        op.execute(f"ALTER TABLE {table} RENAME TO {legacy}")
+        _rename_indexes(legacy, "_part")
+
+        columns = spec["columns"].format(sequence=sequence).replace(" NOT NULL DEFAULT now()", " DEFAULT now()")
+        op.execute(f"CREATE TABLE {table} ({columns}, PRIMARY KEY (id))")
+        for name, definition in spec["indexes"]:
+            op.execute(f"CREATE INDEX {name} ON {table} {definition}")
+
+        _batched_copy(legacy, table, spec["column_list"])
+        op.execute(f"DROP TABLE {legacy} CASCADE")
+        op.execute(f"ALTER SEQUENCE {sequence} OWNED BY {table}.id")
@@ -0,0 +1,60 @@
+"""weather_latest: one row per station with its most recent observation
+
+Populated by add_weather_data() in the same transaction as the weather_data insert; this revision
+creates the table and backfills it from the existing history with a single DISTINCT ON pass.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+import geoalchemy2
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "weather_latest",
+        sa.Column("station_name", sa.String(255), primary_key=True),
+        sa.Column("weather_data_id", sa.Integer, nullable=False),
+        sa.Column("geometry", geoalchemy2.Geometry("POINT", srid=4326, spatial_index=False), nullable=False),
+        sa.Column("temperature", sa.Float),
+        sa.Column("humidity", sa.Float),
+        sa.Column("rainfall", sa.Float),
+        sa.Column("wind_speed", sa.Float),
+        sa.Column("wind_direction", sa.Float),
+        sa.Column("pressure", sa.Float),
+        sa.Column("recorded_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("source", sa.String(100)),
+        sa.Column("weather_metadata", sa.JSON),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+
+    # Served by ix_weather_data_station_recorded_at
+    op.execute("""
+        INSERT INTO weather_latest (
+            station_name, weather_data_id, geometry, temperature, humidity, rainfall,
+            wind_speed, wind_direction, pressure, recorded_at, source, weather_metadata
+        )
+        SELECT DISTINCT ON (station_name)
+            station_name, id, geometry, temperature, humidity, rainfall,
+            wind_speed, wind_direction, pressure, recorded_at, source, weather_metadata
+        FROM weather_data
+        WHERE station_name IS NOT NULL
+        ORDER BY station_name, recorded_at DESC, id DESC
+    """)
+
+    # Small table, so plain (non-concurrent) builds after the backfill are fine
+    op.execute("CREATE INDEX idx_weather_latest_geometry ON weather_latest USING gist (geometry)")
+    op.execute("CREATE INDEX ix_weather_latest_geography ON weather_latest USING gist ((geometry::geography))")
+    op.execute("CREATE INDEX ix_weather_latest_recorded_at ON weather_latest (recorded_at)")
+    op.execute("ANALYZE weather_latest")
+
+
+def downgrade():
+    op.drop_table("weather_latest")
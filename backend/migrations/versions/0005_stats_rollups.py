@@ -0,0 +1,64 @@
+"""Incrementally maintained statistics: observation_rollups and layer_stats
+
+Creates the tables, installs the statement-level insert triggers on weather_data and
+earthquake_data, and backfills everything. The triggers are created before the backfill inside the
+same transaction: CREATE TRIGGER holds a lock that blocks concurrent inserts until commit, so no
+row is counted twice or missed.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from db.rollups import (
+    ROLLUP_DATASETS, LAYER_TABLES, trigger_ddl, drop_trigger_ddl, rebuild_rollups, refresh_layer_stats,
+)
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "observation_rollups",
+        sa.Column("dataset", sa.String(32), primary_key=True),
+        sa.Column("granularity", sa.String(8), primary_key=True),
+        sa.Column("bucket_start", sa.DateTime(timezone=True), primary_key=True),
+        sa.Column("metric", sa.String(64), primary_key=True),
+        sa.Column("dimension", sa.String(64), primary_key=True, server_default=""),
+        sa.Column("sample_count", sa.BigInteger, nullable=False),
+        sa.Column("value_sum", sa.Float),
+        sa.Column("value_min", sa.Float),
+        sa.Column("value_max", sa.Float),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    op.create_table(
+        "layer_stats",
+        sa.Column("layer", sa.String(32), primary_key=True),
+        sa.Column("total_count", sa.BigInteger, nullable=False),
+        sa.Column("min_risk", sa.Float),
+        sa.Column("max_risk", sa.Float),
+        sa.Column("avg_risk", sa.Float),
+        sa.Column("risk_distribution", sa.JSON, nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+
+    conn = op.get_bind()
+    for dataset in ROLLUP_DATASETS:
+        for statement in trigger_ddl(dataset):
+            op.execute(statement)
+        rebuild_rollups(conn, dataset)
+    for layer in LAYER_TABLES:
+        refresh_layer_stats(conn, layer)
+
+
+def downgrade():
+    for dataset in ROLLUP_DATASETS:
+        for statement in drop_trigger_ddl(dataset):
+            op.execute(statement)
+    op.drop_table("layer_stats")
+    op.drop_table("observation_rollups")
@@ -2,8 +2,9 @@
 """
 Database refresh script - drops all tables and recreates them with fresh sample data
 """
-from db.base import engine, Base
+from db.base import engine
 from db.setup import setup_database
+from db.schema_version import upgrade_to_head
 from db.base import SessionLocal
 from db.queries import (
     add_flood_data, add_earthquake_data, add_landslide_data, add_weather_data
@@ -60,8 +61,8 @@ def create_fresh_tables():
     print("\n🏗️ Creating fresh tables...")
     
     try:
-        # This will create all tables defined in models
-        Base.metadata.create_all(engine)
+        # Rebuild the schema through the versioned migrations (alembic_version was dropped above)
+        upgrade_to_head()
         print("✅ All tables created successfully")
         
         # Verify tables were created
@@ -8,6 +8,7 @@ from ingest.flood_ingestor import FloodIngestor
 from ingest.landslide_ingestor import LandslideIngestor
 from ingest.weather_ingestor import WeatherIngestor
 from ingest.seismic_ingestor import SeismicIngestor
+from db.partitions import maintain_partitions
 
 # TODO: make weather data use the actual api
 
@@ -203,6 +204,9 @@ def main():
                 elif arg == "--api-key" and i + 1 < len(sys.argv):
                     api_key = sys.argv[i + 1]
             
+            # Make sure this month's weather_data partition exists before inserting
+            maintain_partitions()
+            
             # Initialize weather ingestor
             ingestor = WeatherIngestor(api_key=api_key)
             
@@ -239,6 +243,7 @@ def main():
                     validate_only = True
             
             print(f"🌋 Ingesting seismic data with date format: {date_format}")
+            maintain_partitions()
             ingestor = SeismicIngestor()
             
             if validate_only:
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Fast JSON serialization for API responses
+Encodes responses with orjson when it is installed (stdlib json otherwise) and lets pre-serialized
+JSON, such as ST_AsGeoJSON output, pass through untouched instead of being parsed into Python
+lists and encoded again. Datetimes, dates, Decimals and NumPy values are encoded natively.
+
+Installed on the Flask app with install_json_provider(app); JSON_ENCODER=json forces the stdlib.
+"""
+
+import json
+import os
+import re
+import sys
+from datetime import date, datetime, time as dt_time
+from decimal import Decimal
+from typing import Any, List
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from config import JSON_ENCODER
+
+try:
+    import orjson
+except ImportError:  # optional: falls back to the stdlib encoder
+    orjson = None
+
+ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS if orjson else 0
+
+
+class RawJSON:
+    """An already-encoded JSON value (e.g. a GeoJSON geometry string) embedded verbatim"""
+
+    __slots__ = ("text",)
+
+    def __init__(self, text):
+        self.text = text.decode("utf-8") if isinstance(text, bytes) else text
+
+
+def geojson_fragment(geojson):
+    """Wrap ST_AsGeoJSON output for embedding in a response; None stays null"""
+    return None if geojson is None else RawJSON(geojson)
+
+
+def _default(obj: Any):
+    """Types neither encoder handles by itself"""
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, (datetime, date, dt_time)):
+        return obj.isoformat()
+    if hasattr(obj, "tolist"):  # NumPy scalars/arrays under the stdlib encoder
+        return obj.tolist()
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _orjson_fragment_default(obj: Any):
+    if isinstance(obj, RawJSON):
+        return orjson.Fragment(obj.text)
+    return _default(obj)
+
+
+class _FragmentCollector:
+    """
+    Encoder `default` hook that swaps each RawJSON for a unique placeholder string; the encoded
+    placeholders are replaced with the raw text in one regex pass afterwards.
+    """
+
+    def __init__(self):
+        self.nonce = os.urandom(6).hex()
+        self.fragments: List[str] = []
+
+    def __call__(self, obj: Any):
+        if isinstance(obj, RawJSON):
+            self.fragments.append(obj.text)
+            return f"__rawjson_{self.nonce}_{len(self.fragments) - 1}__"
+        return _default(obj)
+
+    def splice(self, encoded: bytes) -> bytes:
+        if not self.fragments:
+            return encoded
+        pattern = re.compile(b'"__rawjson_' + self.nonce.encode() + rb'_(\d+)__"')
+        fragments = [fragment.encode("utf-8") for fragment in self.fragments]
+        return pattern.sub(lambda match: fragments[int(match.group(1))], encoded)
+
+
+def dumps(obj: Any, encoder: str = None) -> bytes:
+    """
+    Serialize a response body to UTF-8 JSON bytes
+
+    Args:
+        obj: Response data; may contain RawJSON fragments, datetimes, Decimals and NumPy values
+        encoder: "orjson" or "json" (defaults to JSON_ENCODER, stdlib when orjson is missing)
+    """
+    encoder = encoder or JSON_ENCODER
+    if encoder == "orjson" and orjson is not None:
+        if hasattr(orjson, "Fragment"):  # orjson >= 3.9 embeds raw JSON itself
+            return orjson.dumps(obj, default=_orjson_fragment_default, option=ORJSON_OPTIONS)
+        collector = _FragmentCollector()
+        return collector.splice(orjson.dumps(obj, default=collector, option=ORJSON_OPTIONS))
+    collector = _FragmentCollector()
+    encoded = json.dumps(obj, default=collector, ensure_ascii=False, separators=(",", ":"))
+    return collector.splice(encoded.encode("utf-8"))
+
+
+def install_json_provider(app) -> None:
+    """Make jsonify() and app.json use dumps() (Flask >= 2.2 JSON providers)"""
+    from flask.json.provider import DefaultJSONProvider
+
+    class FastJSONProvider(DefaultJSONProvider):
+        def dumps(self, obj: Any, **kwargs) -> str:
+            return dumps(obj).decode("utf-8")
+
+        def response(self, *args, **kwargs):
+            obj = self._prepare_response_obj(args, kwargs)
+            return self._app.response_class(dumps(obj), mimetype=self.mimetype)
+
+    app.json = FastJSONProvider(app)
+    backend = "orjson" if JSON_ENCODER == "orjson" and orjson is not None else "json"
+    print(f"⚡ JSON responses encoded with {backend}")
+
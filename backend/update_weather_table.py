@@ -1,7 +1,8 @@
 #!/usr/bin/env python3
 """
 Update Weather Table Script
-Adds metadata column to weather_data table for storing Filipino weather conditions
+Applies pending migrations (weather_metadata column for Filipino weather conditions) and prints
+the weather_data structure. Kept as a wrapper around the versioned migrations in migrations/.
 """
 
 import os
@@ -13,36 +14,17 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from db.base import engine
 from db.setup import setup_database
+from db.schema_version import upgrade_to_head
 
 
 def update_weather_table():
-    """Add weather_metadata column to weather_data table if it doesn't exist"""
+    """Bring weather_data up to date (weather_metadata column is added by migration 0001)"""
     print("🗄️ Updating weather_data table...")
     
     try:
+        upgrade_to_head()
+        
         with engine.connect() as conn:
-            # Check if weather_metadata column exists
-            result = conn.execute(text("""
-                SELECT column_name 
-                FROM information_schema.columns 
-                WHERE table_name = 'weather_data' 
-                AND column_name = 'weather_metadata'
-            """))
-            
-            if result.fetchone():
-                print("✅ weather_metadata column already exists in weather_data table")
-            else:
-                print("📝 Adding weather_metadata column to weather_data table...")
-                
-                # Add weather_metadata column
-                conn.execute(text("""
-                    ALTER TABLE weather_data 
-                    ADD COLUMN weather_metadata JSON
-                """))
-                conn.commit()
-                
-                print("✅ Successfully added weather_metadata column to weather_data table")
-            
             # Verify table structure
             print("\n📋 Current weather_data table structure:")
             result = conn.execute(text("""
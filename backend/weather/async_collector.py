@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Concurrent weather collection for many locations
+Fetches current conditions over a shared HTTP/2 keep-alive connection pool with a concurrency
+limit, a token-bucket rate limiter and retries with jittered exponential backoff.
+"""
+
+import asyncio
+import os
+import random
+import sys
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import httpx
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import (
+    WEATHER_FETCH_CONCURRENCY, WEATHER_FETCH_RATE, WEATHER_FETCH_BURST,
+    WEATHER_FETCH_RETRIES, WEATHER_FETCH_TIMEOUT,
+)
+from weather.weather_cache import get_weather_cache
+
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+BACKOFF_BASE = 0.5  # seconds
+BACKOFF_CAP = 8.0  # seconds
+
+
+class TokenBucket:
+    """Async token bucket: `rate` tokens per second, bursts up to `capacity`"""
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = max(1, capacity)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        if self.rate <= 0:
+            return
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+def backoff_delay(attempt: int, retry_after: Optional[str] = None) -> float:
+    """Full-jitter exponential backoff, honouring a numeric Retry-After header"""
+    if retry_after:
+        try:
+            return min(BACKOFF_CAP, float(retry_after))
+        except ValueError:
+            pass
+    return random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * (2 ** attempt)))
+
+
+class AsyncWeatherCollector:
+    """Fetch weather for many locations concurrently through a GoogleWeatherAPI instance"""
+
+    def __init__(self, weather_api, concurrency: int = WEATHER_FETCH_CONCURRENCY,
+                 rate: float = WEATHER_FETCH_RATE, burst: int = WEATHER_FETCH_BURST,
+                 max_retries: int = WEATHER_FETCH_RETRIES, timeout: float = WEATHER_FETCH_TIMEOUT,
+                 use_cache: bool = True):
+        self.weather_api = weather_api
+        self.use_cache = use_cache
+        self.concurrency = max(1, concurrency)
+        self.rate = rate
+        self.burst = burst
+        self.max_retries = max_retries
+        self.timeout = timeout
+
+    async def _fetch_one(self, client: httpx.AsyncClient, semaphore: asyncio.Semaphore,
+                         bucket: TokenBucket, lat: float, lng: float) -> Dict:
+        """Fetch one location; falls back to mock data like GoogleWeatherAPI.get_weather_data"""
+        if not self.weather_api.uses_live_api:
+            return self.weather_api._get_enhanced_mock_weather_data(lat, lng)
+
+        params = {
+            'location.latitude': lat,
+            'location.longitude': lng,
+            'key': self.weather_api.api_key,
+        }
+        url = f"{self.weather_api.base_url}/currentConditions:lookup"
+
+        async with semaphore:
+            for attempt in range(self.max_retries + 1):
+                await bucket.acquire()
+                retry_after = None
+                try:
+                    response = await client.get(url, params=params)
+                    if response.status_code == 200:
+                        return self.weather_api._parse_google_weather_response(response.json(), lat, lng)
+                    if response.status_code not in RETRYABLE_STATUS:
+                        print(f"❌ Google Weather API error {response.status_code} for ({lat:.4f}, {lng:.4f})")
+                        break
+                    retry_after = response.headers.get("Retry-After")
+                    reason = f"HTTP {response.status_code}"
+                except (httpx.TransportError, ValueError) as e:
+                    reason = str(e) or type(e).__name__
+
+                if attempt < self.max_retries:
+                    delay = backoff_delay(attempt, retry_after)
+                    print(f"⚠️ ({lat:.4f}, {lng:.4f}) failed ({reason}), retry {attempt + 1}/{self.max_retries} in {delay:.2f}s")
+                    await asyncio.sleep(delay)
+
+        print(f"🔄 Falling back to mock data for ({lat:.4f}, {lng:.4f})")
+        return self.weather_api._get_enhanced_mock_weather_data(lat, lng)
+
+    async def fetch_all(self, locations: Sequence[Tuple[float, float]]) -> List[Dict]:
+        """
+        Weather dictionaries for each (lat, lng), in input order
+
+        Fetched results are always written to the weather cache. With use_cache, locations that
+        have a fresh cache entry are not requested at all (stale entries are refetched); an entry
+        that was already stored carries "weather_data_id", so collectors can reference that row
+        instead of storing the observation twice.
+        """
+        cache = get_weather_cache()
+        results: List[Optional[Dict]] = [None] * len(locations)
+        pending = []
+        for index, (lat, lng) in enumerate(locations):
+            cached = cache.get_fresh(lat, lng) if cache and self.use_cache else None
+            if cached is not None:
+                results[index] = self.weather_api._relocate(cached, lat, lng)
+            else:
+                pending.append(index)
+
+        if pending:
+            semaphore = asyncio.Semaphore(self.concurrency)
+            bucket = TokenBucket(self.rate, self.burst)
+            limits = httpx.Limits(max_connections=self.concurrency, max_keepalive_connections=self.concurrency)
+            headers = dict(self.weather_api.session.headers)
+
+            async with httpx.AsyncClient(http2=True, limits=limits, timeout=self.timeout, headers=headers) as client:
+                fetched = await asyncio.gather(*[
+                    self._fetch_one(client, semaphore, bucket, *locations[index]) for index in pending
+                ])
+
+            for index, weather_data in zip(pending, fetched):
+                results[index] = weather_data
+                if cache and weather_data and self.weather_api.is_cacheable(weather_data):
+                    cache.put(*locations[index], weather_data)
+
+        if cache and len(pending) < len(locations):
+            print(f"🗃️ {len(locations) - len(pending)}/{len(locations)} locations served from weather cache")
+        return results
+
+    def fetch(self, locations: Sequence[Tuple[float, float]]) -> List[Dict]:
+        """Synchronous entry point for the collectors and ingestors"""
+        started = time.perf_counter()
+        print(f"🌤️ Fetching weather for {len(locations)} locations "
+              f"(concurrency={self.concurrency}, rate={self.rate}/s)")
+        results = asyncio.run(self.fetch_all(locations))
+        print(f"✅ Fetched {len(results)} locations in {time.perf_counter() - started:.2f}s")
+        return results
+
+
+def fetch_weather_concurrently(weather_api, locations: Sequence[Tuple[float, float]], **kwargs) -> List[Dict]:
+    """Fetch weather for (lat, lng) pairs with the configured concurrency and rate limit"""
+    return AsyncWeatherCollector(weather_api, **kwargs).fetch(locations)
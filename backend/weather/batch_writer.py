@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Batched weather writes
+Buffers observations and flushes them with add_weather_data_batch() (multi-row INSERT, one
+transaction per batch) when the buffer reaches a size or age threshold.
+"""
+
+import os
+import sys
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import WEATHER_WRITE_BATCH_SIZE, WEATHER_WRITE_FLUSH_SECONDS
+from db.queries import add_weather_data_batch
+
+
+def observation_from_weather_data(weather_data: Dict, station_name: Optional[str] = None) -> Dict:
+    """
+    Convert a GoogleWeatherAPI dictionary into add_weather_data() keyword arguments
+
+    Raises:
+        ValueError: if the location has no lat/lng
+    """
+    location = weather_data.get('location', {})
+    current = weather_data.get('current', {})
+
+    lat = location.get('lat')
+    lng = location.get('lng')
+    if lat is None or lng is None:
+        raise ValueError("Invalid location data: lat/lng missing")
+
+    timestamp_str = current.get('timestamp')
+    recorded_at = datetime.now()
+    if timestamp_str:
+        try:
+            recorded_at = datetime.fromisoformat(timestamp_str.replace('Z', '+00:00'))
+        except ValueError:
+            pass
+
+    source = weather_data.get('source', 'google_weather_api')
+    return {
+        'geometry_wkt': f"POINT({lng} {lat})",
+        'temperature': current.get('temperature'),
+        'humidity': current.get('humidity'),
+        'rainfall': current.get('rainfall', 0.0),
+        'wind_speed': current.get('wind_speed'),
+        'wind_direction': current.get('wind_direction'),
+        'pressure': current.get('pressure'),
+        'station_name': station_name or weather_data.get('station_name', f"Station_{int(lat*1000)}_{int(lng*1000)}"),
+        'recorded_at': recorded_at,
+        'source': source,
+        'weather_metadata': {
+            'description': current.get('description', 'Unknown'),
+            'location_name': location.get('name', f"Location ({lat:.4f}, {lng:.4f})"),
+            'data_source': source,
+            'collection_time': datetime.now().isoformat()
+        },
+    }
+
+
+class WeatherBatchWriter:
+    """
+    Buffer weather observations and write them in batches
+
+    Use as a context manager so the final partial batch is flushed:
+
+        with WeatherBatchWriter(db) as writer:
+            for weather_data in results:
+                writer.add(observation_from_weather_data(weather_data))
+        print(writer.inserted_ids)
+    """
+
+    def __init__(self, db, batch_size: int = WEATHER_WRITE_BATCH_SIZE,
+                 flush_interval: float = WEATHER_WRITE_FLUSH_SECONDS):
+        self.db = db
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.buffer: List[Dict] = []
+        self.tags: List = []
+        self.oldest_buffered: Optional[float] = None
+        self.inserted_ids: List[int] = []
+        self.outcomes: List[Tuple] = []  # (tag, weather_data id or None) per observation, in write order
+        self.failed = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.flush()
+
+    def add(self, observation: Dict, tag=None):
+        """
+        Buffer one observation, flushing if the batch is full or old enough
+
+        Args:
+            observation: add_weather_data() keyword arguments (see observation_from_weather_data)
+            tag: Optional caller value reported back in self.outcomes
+        """
+        if not self.buffer:
+            self.oldest_buffered = time.monotonic()
+        self.buffer.append(observation)
+        self.tags.append(tag)
+        if len(self.buffer) >= self.batch_size or time.monotonic() - self.oldest_buffered >= self.flush_interval:
+            self.flush()
+
+    def flush(self) -> List[int]:
+        """
+        Write the buffered observations in one transaction
+
+        A failed batch is rolled back, counted in self.failed and reported, not raised, so a
+        collection run keeps going.
+
+        Returns:
+            IDs inserted by this flush
+        """
+        if not self.buffer:
+            return []
+
+        batch, tags = self.buffer, self.tags
+        self.buffer, self.tags, self.oldest_buffered = [], [], None
+        try:
+            ids = add_weather_data_batch(self.db, batch)
+        except Exception as e:
+            self.failed += len(batch)
+            self.outcomes.extend((tag, None) for tag in tags)
+            print(f"❌ Failed to write batch of {len(batch)} weather observations: {e}")
+            return []
+
+        self.inserted_ids.extend(ids)
+        self.outcomes.extend(zip(tags, ids))
+        print(f"🗄️ Wrote {len(ids)} weather observations")
+        return ids
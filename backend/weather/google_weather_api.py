@@ -7,7 +7,6 @@ import requests
 import json
 from datetime import datetime
 from typing import Dict, List, Optional, Tuple
-import time
 import os
 import random
 
@@ -150,19 +149,59 @@ class GoogleWeatherAPI:
             'Accept': 'application/json'
         })
     
-    def get_weather_data(self, lat: float, lng: float) -> Dict:
+    @property
+    def uses_live_api(self) -> bool:
+        return bool(self.api_key) and self.api_key != "mock_key"
+    
+    def is_cacheable(self, weather_data: Dict) -> bool:
+        """Don't cache mock fallbacks for a failed live request, so the next call retries upstream"""
+        return not (self.uses_live_api and 'mock' in weather_data.get('source', ''))
+    
+    def get_weather_data(self, lat: float, lng: float, use_cache: bool = True,
+                         allow_stale: bool = True) -> Dict:
         """
         Get weather data for a specific location using Google's Weather API
         
+        Observations are served from the location-quantized cache while fresh
+        (see weather/weather_cache.py); a cached observation that was already stored
+        carries its row id as "weather_data_id".
+        
         Args:
             lat: Latitude
             lng: Longitude
+            use_cache: Set False to always call upstream
+            allow_stale: Set False to never get a stale entry (collectors recording history)
             
         Returns:
             Dictionary containing weather data with Filipino conditions
         """
+        from weather.weather_cache import get_weather_cache
+        
+        cache = get_weather_cache() if use_cache else None
+        if cache is None:
+            return self._get_weather_data_uncached(lat, lng)
+        
+        weather_data = cache.get_or_fetch(
+            lat, lng, lambda: self._get_weather_data_uncached(lat, lng), should_cache=self.is_cacheable,
+            allow_stale=allow_stale
+        )
+        return self._relocate(weather_data, lat, lng) if weather_data else weather_data
+    
+    def _relocate(self, weather_data: Dict, lat: float, lng: float) -> Dict:
+        """Point a (possibly shared) cached observation at the requested coordinates"""
+        weather_data['location'] = {
+            **weather_data.get('location', {}),
+            "lat": lat,
+            "lng": lng,
+            "name": f"Weather Station at ({lat:.4f}, {lng:.4f})"
+        }
+        weather_data['station_name'] = f"Station_{int(lat*1000)}_{int(lng*1000)}"
+        return weather_data
+    
+    def _get_weather_data_uncached(self, lat: float, lng: float) -> Dict:
+        """Fetch from Google, falling back to mock data"""
         try:
-            if self.api_key and self.api_key != "mock_key":
+            if self.uses_live_api:
                 # Try Google Weather API first
                 try:
                     return self._fetch_from_google_api(lat, lng)
@@ -338,25 +377,18 @@ class GoogleWeatherAPI:
         """
         Get weather data for multiple locations
         
+        Requests run concurrently with the limits from config.py (see weather/async_collector.py)
+        
         Args:
             locations: List of (lat, lng) tuples
             
         Returns:
-            List of weather data dictionaries
+            List of weather data dictionaries, in the same order as locations
         """
-        weather_data_list = []
-        
-        for i, (lat, lng) in enumerate(locations):
-            print(f"🌤️ Fetching weather data for location {i+1}/{len(locations)}: ({lat:.4f}, {lng:.4f})")
-            
-            weather_data = self.get_weather_data(lat, lng)
-            if weather_data:
-                weather_data_list.append(weather_data)
-            
-            # Add delay to avoid rate limiting
-            time.sleep(0.5)
+        from weather.async_collector import fetch_weather_concurrently
         
-        return weather_data_list
+        weather_data_list = fetch_weather_concurrently(self, locations)
+        return [weather_data for weather_data in weather_data_list if weather_data]
 
 
 def main():
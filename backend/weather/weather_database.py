@@ -6,7 +6,6 @@ Handles saving weather data from Google Weather API to PostgreSQL using WeatherD
 
 import sys
 import os
-from datetime import datetime
 from typing import Dict, List, Optional, Tuple
 import traceback
 
@@ -16,6 +15,10 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from db.base import SessionLocal
 from db.queries import add_weather_data
 from weather.google_weather_api import GoogleWeatherAPI
+from weather.async_collector import fetch_weather_concurrently
+from weather.batch_writer import WeatherBatchWriter, observation_from_weather_data
+from weather.weather_cache import mark_weather_stored
+from gazetteer.places import get_gazetteer
 
 
 class WeatherDatabaseManager:
@@ -50,73 +53,13 @@ class WeatherDatabaseManager:
             if not self.db:
                 raise ValueError("Database connection not established. Use context manager.")
             
-            location = weather_data.get('location', {})
-            current = weather_data.get('current', {})
+            observation = observation_from_weather_data(weather_data)
+            result = add_weather_data(db=self.db, **observation)
+            mark_weather_stored(weather_data, result.id)
             
-            # Extract location data
-            lat = location.get('lat')
-            lng = location.get('lng')
-            
-            if lat is None or lng is None:
-                raise ValueError("Invalid location data: lat/lng missing")
-            
-            # Create geometry WKT string for PostgreSQL/PostGIS
-            geometry_wkt = f"POINT({lng} {lat})"
-            
-            # Extract weather measurements
-            temperature = current.get('temperature')
-            humidity = current.get('humidity')
-            rainfall = current.get('rainfall', 0.0)
-            wind_speed = current.get('wind_speed')
-            wind_direction = current.get('wind_direction')
-            pressure = current.get('pressure')
-            
-            # Parse timestamp
-            timestamp_str = current.get('timestamp')
-            if timestamp_str:
-                try:
-                    recorded_at = datetime.fromisoformat(timestamp_str.replace('Z', '+00:00'))
-                except ValueError:
-                    recorded_at = datetime.now()
-            else:
-                recorded_at = datetime.now()
-            
-            # Get source and station info
-            source = weather_data.get('source', 'google_weather_api')
-            station_name = weather_data.get('station_name', f"Station_{int(lat*1000)}_{int(lng*1000)}")
-            
-            # Build metadata with Filipino weather condition
-            metadata = {
-                'description': current.get('description', 'Unknown'),
-                'location_name': location.get('name', f"Location ({lat:.4f}, {lng:.4f})"),
-                'data_source': source,
-                'collection_time': datetime.now().isoformat()
-            }
-            
-            # Save to database using the queries module
-            result = add_weather_data(
-                db=self.db,
-                geometry_wkt=geometry_wkt,
-                temperature=temperature,
-                humidity=humidity,
-                rainfall=rainfall,
-                wind_speed=wind_speed,
-                wind_direction=wind_direction,
-                pressure=pressure,
-                station_name=station_name,
-                recorded_at=recorded_at,
-                source=source,
-                weather_metadata=metadata
-            )
-            
-            print(f"✅ Weather data saved to database:")
-            print(f"   📍 Location: {lat:.4f}, {lng:.4f}")
-            print(f"   🌡️ Temperature: {temperature}°C")
-            print(f"   🌤️ Condition: {current.get('description', 'Unknown')}")
-            print(f"   💧 Humidity: {humidity}%")
-            print(f"   🌧️ Rainfall: {rainfall}mm/h")
-            print(f"   💨 Wind: {wind_speed}km/h")
-            print(f"   🗄️ Database ID: {result.id}")
+            print(f"✅ Saved {observation['station_name']} "
+                  f"({observation['temperature']}°C, {observation['weather_metadata']['description']}) "
+                  f"as weather_data {result.id}")
             
             return True
             
@@ -140,13 +83,18 @@ class WeatherDatabaseManager:
         try:
             print(f"🌤️ Collecting weather data for ({lat:.4f}, {lng:.4f})...")
             
-            # Get weather data from Google API
-            weather_data = self.weather_api.get_weather_data(lat, lng)
+            # Fresh observations only: this records history
+            weather_data = self.weather_api.get_weather_data(lat, lng, allow_stale=False)
             
             if not weather_data:
                 print(f"❌ Failed to get weather data for location ({lat}, {lng})")
                 return False
             
+            # A cached observation that is already stored is not stored again
+            if weather_data.get('weather_data_id'):
+                print(f"🗃️ Reusing weather_data {weather_data['weather_data_id']} for ({lat:.4f}, {lng:.4f})")
+                return True
+            
             # Override station name if provided
             if station_name:
                 weather_data['station_name'] = station_name
@@ -175,27 +123,38 @@ class WeatherDatabaseManager:
         failed = 0
         results = []
         
-        for i, location_data in enumerate(locations):
-            if len(location_data) == 2:
-                lat, lng = location_data
-                station_name = None
-            else:
-                lat, lng, station_name = location_data
-            
-            print(f"\n📍 Processing location {i+1}/{len(locations)}: ({lat:.4f}, {lng:.4f})")
-            
-            success = self.collect_and_save_weather(lat, lng, station_name)
-            
-            if success:
+        coordinates = [(location_data[0], location_data[1]) for location_data in locations]
+        # Fresh cache entries are not refetched; those already stored are referenced, not stored again
+        weather_data_list = fetch_weather_concurrently(self.weather_api, coordinates)
+        
+        # Buffered multi-row writes, one transaction per batch
+        with WeatherBatchWriter(self.db) as writer:
+            for index, (location_data, weather_data) in enumerate(zip(locations, weather_data_list)):
+                lat, lng = location_data[0], location_data[1]
+                station_name = location_data[2] if len(location_data) > 2 else None
+                try:
+                    if not weather_data:
+                        raise ValueError("no weather data returned")
+                    if weather_data.get('weather_data_id'):
+                        successful += 1
+                        results.append({'location': (lat, lng), 'status': 'success',
+                                        'weather_data_id': weather_data['weather_data_id']})
+                        continue
+                    writer.add(observation_from_weather_data(weather_data, station_name), tag=index)
+                except Exception as e:
+                    print(f"❌ Skipping ({lat:.4f}, {lng:.4f}): {e}")
+                    failed += 1
+                    results.append({'location': (lat, lng), 'status': 'failed'})
+        
+        for index, weather_data_id in writer.outcomes:
+            if weather_data_id:
+                mark_weather_stored(weather_data_list[index], weather_data_id)
                 successful += 1
-                results.append({'location': (lat, lng), 'status': 'success'})
+                results.append({'location': coordinates[index], 'status': 'success',
+                                'weather_data_id': weather_data_id})
             else:
                 failed += 1
-                results.append({'location': (lat, lng), 'status': 'failed'})
-            
-            # Small delay to avoid overwhelming the API
-            import time
-            time.sleep(0.5)
+                results.append({'location': coordinates[index], 'status': 'failed'})
         
         summary = {
             'total_locations': len(locations),
@@ -216,23 +175,15 @@ class WeatherDatabaseManager:
 def collect_philippine_cities_weather():
     """Collect weather data for major Philippine cities"""
     
-    # Major Philippine cities with coordinates
+    # Major Philippine cities, coordinates from the gazetteer
+    city_names = [
+        "Manila", "Quezon City", "Cebu City", "Davao City", "Iloilo City", "Baguio", "Zamboanga City",
+        "Cagayan de Oro", "General Santos", "Tarlac City", "Angeles", "Legazpi", "Tacloban", "Tagbilaran"
+    ]
+    gazetteer = get_gazetteer()
     philippine_cities = [
-        (14.5995, 120.9842, "Manila Weather Station"),
-        (14.6760, 121.0437, "Quezon City Weather Station"),
-        (10.3157, 123.8854, "Cebu City Weather Station"),
-        (7.1907, 125.4553, "Davao City Weather Station"),
-        (10.7202, 122.5621, "Iloilo City Weather Station"),
-        (16.4023, 120.5960, "Baguio Weather Station"),
-        (6.9214, 122.0790, "Zamboanga City Weather Station"),
-        (8.4542, 124.6319, "Cagayan de Oro Weather Station"),
-        (6.1164, 125.1716, "General Santos Weather Station"),
-        (15.4700, 120.9600, "Tarlac City Weather Station"),
-        (14.8448, 120.8105, "Angeles City Weather Station"),
-        (13.1587, 123.7304, "Legazpi Weather Station"),
-        (11.2404, 125.0058, "Tacloban Weather Station"),
-        (9.6498, 123.8505, "Tagbilaran Weather Station"),
-        (7.0734, 125.6140, "General Santos Weather Station 2")
+        (place["latitude"], place["longitude"], f"{place['name']} Weather Station")
+        for place in map(gazetteer.lookup, city_names) if place
     ]
     
     api_key = os.getenv('GOOGLE_MAPS_API_KEY')